@@ -0,0 +1,76 @@
+"""
+Compare journal commit strategies for durable audit logging.
+
+Concurrent threads log durable audit entries (AuditLogger.log(durable=True))
+through a Journal that commits every record on its own (max_batch=1, no
+commit wait) and through one that group-commits, and prints entries/s and
+fsyncs issued.
+
+Usage:
+    python benchmarks/bench_journal.py [--entries N] [--threads N] [--interval S]
+"""
+
+import argparse
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Tuple
+
+from parent_ai_safety.monitoring.audit import AuditEventType, AuditLogger
+from parent_ai_safety.monitoring.journal import Journal
+
+
+def run(
+    path: Path, entries: int, threads: int, max_batch: int, interval: float
+) -> Tuple[float, int]:
+    """Log entries durably from threads; return (seconds, commits)."""
+    journal = Journal(path, commit_interval=interval, max_batch=max_batch)
+    logger = AuditLogger(journal=journal)
+    per_thread = entries // threads
+
+    def work(thread: int) -> None:
+        for _ in range(per_thread):
+            logger.log(
+                AuditEventType.USER_ACTION, "ai_request", user_id=f"user_{thread}", durable=True
+            )
+
+    workers = [threading.Thread(target=work, args=(t,)) for t in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    journal.close()
+    return elapsed, journal.commits
+
+
+def main() -> None:
+    """Run both commit strategies."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=4_000)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--interval", type=float, default=0.002)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for label, max_batch, interval in (
+            ("per entry", 1, 0.0),
+            ("group", 1024, args.interval),
+        ):
+            elapsed, commits = run(
+                Path(directory) / f"{max_batch}.wal",
+                args.entries,
+                args.threads,
+                max_batch,
+                interval,
+            )
+            print(
+                f"{label:>9}: {args.entries / elapsed:>9,.0f} entries/s  "
+                f"fsyncs {commits:>6}  ({args.entries / commits:.1f} entries/fsync)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark interpreted vs compiled SafetyPolicy enforcement.
+
+The interpreted baseline re-sorts the rules and re-reads every rule's
+conditions dict on each call, as enforce() did before policies were compiled
+into a PolicyPlan.
+
+Usage:
+    python benchmarks/bench_policy.py [--rules N] [--calls N]
+"""
+
+import argparse
+import re
+import timeit
+from typing import Any, Dict, List
+
+from parent_ai_safety.core.policy import SafetyPolicy, SafetyRule
+
+SAMPLES = [
+    "Can you help me with my math homework about fractions?",
+    "Tell me a scary story with a sword fight",
+    "What is the capital of France? Please visit http://example.com",
+    "Write a poem about the ocean and the stars at night " * 4,
+]
+
+
+def build_policy(rule_count: int) -> SafetyPolicy:
+    """Build a policy mixing keyword, pattern, length and age rules."""
+    rules = []
+    for index in range(rule_count):
+        kind = index % 4
+        if kind == 0:
+            conditions: Dict[str, Any] = {"keywords": [f"word{index}", f"term{index}"]}
+        elif kind == 1:
+            conditions = {"patterns": [rf"\bpattern{index}\d+"]}
+        elif kind == 2:
+            conditions = {"min_length": 500 + index, "keywords": [f"long{index}"]}
+        else:
+            conditions = {"max_age": 8, "keywords": [f"age{index}"]}
+        rules.append(
+            SafetyRule(
+                name=f"rule{index}", description="bench", priority=index % 7, conditions=conditions
+            )
+        )
+    rules.append(
+        SafetyRule(name="teens", description="bench", conditions={"min_age": 13, "action": "allow"})
+    )
+    return SafetyPolicy(name="bench", rules=rules)
+
+
+def interpreted_enforce(rules: List[SafetyRule], content: str, context: Dict[str, Any]) -> bool:
+    """Baseline: interpret every rule's conditions on every call."""
+    ordered = sorted(
+        (rule for rule in rules if rule.enabled),
+        key=lambda rule: (-rule.priority, rule.conditions.get("action", "block") != "block"),
+    )
+    for rule in ordered:
+        conditions = rule.conditions
+        if "keywords" in conditions and not any(
+            keyword.lower() in content.lower() for keyword in conditions["keywords"]
+        ):
+            continue
+        if "patterns" in conditions and not any(
+            re.search(pattern, content, re.IGNORECASE) for pattern in conditions["patterns"]
+        ):
+            continue
+        if "min_length" in conditions and len(content) < conditions["min_length"]:
+            continue
+        if "max_length" in conditions and len(content) > conditions["max_length"]:
+            continue
+        if "min_age" in conditions or "max_age" in conditions:
+            age = context.get("age")
+            if age is None:
+                continue
+            if "min_age" in conditions and age < conditions["min_age"]:
+                continue
+            if "max_age" in conditions and age > conditions["max_age"]:
+                continue
+        return conditions.get("action", "block") == "allow"
+    return True
+
+
+def main() -> None:
+    """Run the benchmark and print calls per second for both strategies."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rules", type=int, default=50)
+    parser.add_argument("--calls", type=int, default=20_000)
+    args = parser.parse_args()
+
+    policy = build_policy(args.rules)
+    context = {"age": 10}
+    for content in SAMPLES:
+        assert interpreted_enforce(policy.rules, content, context) == policy.enforce(
+            content, context
+        )
+
+    def run_interpreted() -> None:
+        for content in SAMPLES:
+            interpreted_enforce(policy.rules, content, context)
+
+    def run_compiled() -> None:
+        for content in SAMPLES:
+            policy.enforce(content, context)
+
+    calls = args.calls // len(SAMPLES)
+    results = {}
+    for label, func in (("interpreted", run_interpreted), ("compiled", run_compiled)):
+        seconds = min(timeit.repeat(func, number=calls, repeat=3))
+        results[label] = calls * len(SAMPLES) / seconds
+        print(f"{label:>12}: {results[label]:>12,.0f} enforce() calls/s")
+    print(f"{'speedup':>12}: {results['compiled'] / results['interpreted']:>12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Load-test the completion path offline against MockProviderServer.
+
+Runs requests through AsyncAISafetyWrapper.complete() with a shared
+keep-alive ConnectionPool and with connection reuse disabled (a new
+connection per call), and prints latency percentiles and connections opened.
+
+Usage:
+    python benchmarks/bench_providers.py [--requests N] [--concurrency N] [--latency S]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+from parent_ai_safety.core.ai_wrapper import AIRequest
+from parent_ai_safety.core.async_wrapper import AsyncAISafetyWrapper
+from parent_ai_safety.core.filter import ContentCategory, ContentFilter, FilterAction, FilterRule
+from parent_ai_safety.core.policy import SafetyPolicy
+from parent_ai_safety.core.providers import (
+    ConnectionPool,
+    MockProviderServer,
+    OpenAIChatProvider,
+    ProviderRouter,
+)
+
+
+async def run_load(wrapper: AsyncAISafetyWrapper, requests: int, concurrency: int) -> List[float]:
+    """Send requests with bounded concurrency; return per-request latencies in ms."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one(index: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await wrapper.complete(AIRequest(prompt=f"question {index}", user_id="child"))
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    await asyncio.gather(*(one(index) for index in range(requests)))
+    return latencies
+
+
+def main() -> None:
+    """Run the load test with and without connection reuse."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.005)
+    args = parser.parse_args()
+
+    content_filter = ContentFilter(
+        rules=[
+            FilterRule(
+                name="violence",
+                category=ContentCategory.VIOLENCE,
+                action=FilterAction.BLOCK,
+                keywords={"fight"},
+            )
+        ]
+    )
+    with MockProviderServer(latency=args.latency) as server:
+        for label, max_idle in (("pooled", args.concurrency), ("no reuse", 0)):
+            pool = ConnectionPool(max_idle_per_host=max_idle)
+            provider = OpenAIChatProvider(
+                pool, model="mock", url=server.url, max_concurrency=args.concurrency
+            )
+            wrapper = AsyncAISafetyWrapper(
+                SafetyPolicy(name="bench"), content_filter, router=ProviderRouter([provider])
+            )
+            started = time.perf_counter()
+            latencies = asyncio.run(run_load(wrapper, args.requests, args.concurrency))
+            elapsed = time.perf_counter() - started
+            quantiles = statistics.quantiles(latencies, n=100)
+            print(
+                f"{label:>9}: {args.requests / elapsed:>8,.0f} req/s  "
+                f"p50 {quantiles[49]:6.2f} ms  p99 {quantiles[98]:6.2f} ms  "
+                f"connections {pool.connections_opened}"
+            )
+            provider.close()
+            pool.close()
+
+
+if __name__ == "__main__":
+    main()
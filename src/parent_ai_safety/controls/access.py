@@ -1,21 +1,34 @@
 """
 Access Control - Authentication and permission management for parental oversight.
 
+Parents authenticate with a password, stored as a salted hash (see
+controls/passwords.py). Sessions expire after a timeout and are evicted in
+bulk; recently used devices can resume a session with a short-lived token.
+Permission checks test a per-user bitmask derived from the user's role.
+
 TODO: Implement the following functionality:
-- Parent authentication (password, 2FA, etc.)
+- Two-factor authentication
 - Child profile management
-- Permission levels (parent, child, restricted)
-- Session management and timeout
 - PIN-based quick access
 - Emergency override mechanisms
 """
 
-from datetime import datetime
+import asyncio
+import hashlib
+import heapq
+import secrets
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from enum import Enum
-from typing import Optional
+from typing import Dict, FrozenSet, List, Optional, Tuple
 
 from pydantic import BaseModel, Field
 
+from parent_ai_safety.controls.passwords import PasswordHasher
+
 
 class UserRole(str, Enum):
     """User roles in the system."""
@@ -35,6 +48,27 @@ class Permission(str, Enum):
     EXPORT_DATA = "export_data"
 
 
+ROLE_PERMISSIONS: Dict[UserRole, FrozenSet[Permission]] = {
+    UserRole.PARENT: frozenset(Permission),
+    UserRole.CHILD: frozenset({Permission.USE_AI}),
+    UserRole.RESTRICTED: frozenset(),
+}
+
+# One bit per permission; a role's permissions as a bitmask.
+PERMISSION_BITS: Dict[Permission, int] = {
+    permission: 1 << position for position, permission in enumerate(Permission)
+}
+ROLE_MASKS: Dict[UserRole, int] = {
+    role: sum(PERMISSION_BITS[permission] for permission in permissions)
+    for role, permissions in ROLE_PERMISSIONS.items()
+}
+
+DEFAULT_SESSION_TTL = timedelta(hours=2)
+DEFAULT_RESUME_TTL = timedelta(hours=12)
+DEFAULT_KDF_WORKERS = 4
+EPOCH = datetime(1970, 1, 1)
+
+
 class User(BaseModel):
     """User profile."""
 
@@ -59,29 +93,72 @@ class AccessControl:
     """
     Access control and authentication system.
 
+    Permission checks run against a compact session table (session id ->
+    expiry timestamp and user id) and per-user permission bitmasks, without
+    touching the Session and User models. Session expiries are also kept in a
+    min-heap, so expired sessions are evicted in bulk and memory stays bounded
+    as sessions churn. Sessions must be ended with revoke_session().
+
+    Password verification is deliberately expensive, so it runs on a bounded
+    thread pool: at most kdf_workers hashes are computed at once, and
+    aauthenticate() does not block the event loop. Devices that logged in
+    recently can resume with a short-lived token instead of the password.
+
     TODO: Implement:
-    - authenticate() method for user login
-    - create_session() / revoke_session() for session management
-    - check_permission() to verify user permissions
     - get_user_profile() to retrieve user information
     - update_user_role() for role management
-    - Secure password storage (hashing, salting)
     - Two-factor authentication support
     """
 
-    def __init__(self) -> None:
-        """Initialize access control system."""
+    def __init__(
+        self,
+        hasher: Optional[PasswordHasher] = None,
+        kdf_workers: int = DEFAULT_KDF_WORKERS,
+    ) -> None:
+        """
+        Initialize access control system.
+
+        Args:
+            hasher: Password hasher (scrypt with default cost if None)
+            kdf_workers: Maximum concurrent password hash computations
+        """
         self.users: dict[str, User] = {}
         self.sessions: dict[str, Session] = {}
+        self.hasher = hasher or PasswordHasher()
+        self.kdf_workers = kdf_workers
+        self._usernames: Dict[str, str] = {}
+        self._password_hashes: Dict[str, str] = {}
+        self._dummy_hash: Optional[str] = None
+        self._kdf_pool: Optional[ThreadPoolExecutor] = None
+        self._kdf_lock = threading.Lock()
+        # sha256(token) -> (expiry as a Unix timestamp, user id, device id)
+        self._resume_tokens: Dict[bytes, Tuple[float, str, str]] = {}
+        self._resume_expiries: List[Tuple[float, bytes]] = []
+        # session id -> (expiry as a Unix timestamp, user id)
+        self._session_table: Dict[str, Tuple[float, str]] = {}
+        self._user_masks: Dict[str, int] = {}
+        self._expiries: List[Tuple[float, str]] = []
 
     def authenticate(self, username: str, password: str) -> Optional[Session]:
         """
         Authenticate user and create session.
 
-        TODO: Implement authentication logic
-        - Verify credentials (password hashing)
-        - Create new session
-        - Set appropriate timeout based on role
+        The password is verified on the KDF pool. A hash made with outdated
+        cost parameters is replaced after a successful login.
+
+        Args:
+            username: Username
+            password: Password
+
+        Returns:
+            Session if authenticated, None otherwise
+        """
+        user_id = self._executor().submit(self._verify_password, username, password).result()
+        return self.create_session(user_id) if user_id is not None else None
+
+    async def aauthenticate(self, username: str, password: str) -> Optional[Session]:
+        """
+        Authenticate user and create session without blocking the event loop.
 
         Args:
             username: Username
@@ -90,16 +167,165 @@ class AccessControl:
         Returns:
             Session if authenticated, None otherwise
         """
-        raise NotImplementedError("Authentication not yet implemented")
+        loop = asyncio.get_running_loop()
+        user_id = await loop.run_in_executor(
+            self._executor(), self._verify_password, username, password
+        )
+        return self.create_session(user_id) if user_id is not None else None
+
+    def set_password(self, user_id: str, password: str) -> None:
+        """
+        Set a registered user's password and revoke their resume tokens.
+
+        Args:
+            user_id: User identifier
+            password: New plain-text password
+
+        Raises:
+            KeyError: If the user is not registered
+        """
+        if user_id not in self.users:
+            raise KeyError(user_id)
+        self._password_hashes[user_id] = self.hasher.hash(password)
+        self.revoke_resume_tokens(user_id)
+
+    def issue_resume_token(
+        self, session_id: str, device_id: str, ttl: timedelta = DEFAULT_RESUME_TTL
+    ) -> str:
+        """
+        Issue a token letting a device start new sessions without the password.
+
+        Only a hash of the token is stored.
+
+        Args:
+            session_id: Active session of the user logging in on the device
+            device_id: Device the token is bound to
+            ttl: Token lifetime
+
+        Returns:
+            The resume token
+
+        Raises:
+            KeyError: If the session is unknown or expired
+        """
+        entry = self._session_table.get(session_id)
+        now = time.time()
+        if entry is None or entry[0] <= now:
+            raise KeyError(session_id)
+        self._evict_resume_tokens(now)
+        token = secrets.token_urlsafe(32)
+        digest = hashlib.sha256(token.encode("ascii")).digest()
+        expires = now + ttl.total_seconds()
+        self._resume_tokens[digest] = (expires, entry[1], device_id)
+        heapq.heappush(self._resume_expiries, (expires, digest))
+        return token
+
+    def resume_session(self, token: str, device_id: str) -> Optional[Session]:
+        """
+        Create a session from a resume token, skipping password verification.
+
+        Args:
+            token: Token from issue_resume_token()
+            device_id: Device presenting the token
+
+        Returns:
+            New session, or None if the token is unknown, expired or for another device
+        """
+        digest = hashlib.sha256(token.encode("utf-8")).digest()
+        entry = self._resume_tokens.get(digest)
+        if entry is None or entry[0] <= time.time() or entry[2] != device_id:
+            return None
+        if entry[1] not in self.users:
+            return None
+        return self.create_session(entry[1])
+
+    def revoke_resume_tokens(self, user_id: str) -> None:
+        """Revoke every resume token of a user (e.g. after a password change)."""
+        self._resume_tokens = {
+            digest: entry for digest, entry in self._resume_tokens.items() if entry[1] != user_id
+        }
+
+    def close(self) -> None:
+        """Shut down the password hashing pool."""
+        with self._kdf_lock:
+            if self._kdf_pool is not None:
+                self._kdf_pool.shutdown()
+                self._kdf_pool = None
+
+    def add_user(self, user: User) -> None:
+        """Register a user profile, or replace it (e.g. to change the role)."""
+        previous = self.users.get(user.user_id)
+        if previous is not None and self._usernames.get(previous.username) == user.user_id:
+            del self._usernames[previous.username]
+        self.users[user.user_id] = user
+        self._usernames[user.username] = user.user_id
+        self._user_masks[user.user_id] = ROLE_MASKS[user.role]
+
+    def create_session(self, user_id: str, ttl: timedelta = DEFAULT_SESSION_TTL) -> Session:
+        """
+        Create a new session for a registered user.
+
+        Args:
+            user_id: User identifier
+            ttl: Session lifetime
+
+        Returns:
+            The new session
+
+        Raises:
+            KeyError: If the user is not registered
+        """
+        if user_id not in self.users:
+            raise KeyError(user_id)
+        now = datetime.utcnow()
+        self.evict_expired(now)
+        session = Session(
+            session_id=uuid.uuid4().hex, user_id=user_id, created_at=now, expires_at=now + ttl
+        )
+        expires = (session.expires_at - EPOCH).total_seconds()
+        self.sessions[session.session_id] = session
+        self._session_table[session.session_id] = (expires, user_id)
+        heapq.heappush(self._expiries, (expires, session.session_id))
+        return session
+
+    def revoke_session(self, session_id: str) -> None:
+        """Revoke a session; unknown sessions are ignored."""
+        session = self.sessions.pop(session_id, None)
+        self._session_table.pop(session_id, None)
+        if session is not None:
+            session.is_active = False
+
+    def evict_expired(self, now: Optional[datetime] = None) -> int:
+        """
+        Remove every expired session.
+
+        Called on each create_session(); each session is evicted once, so the
+        cost is amortized over session creation.
+
+        Args:
+            now: Reference time (defaults to current UTC time)
+
+        Returns:
+            Number of sessions evicted
+        """
+        cutoff = ((now or datetime.utcnow()) - EPOCH).total_seconds()
+        expiries = self._expiries
+        evicted = 0
+        while expiries and expiries[0][0] <= cutoff:
+            _, session_id = heapq.heappop(expiries)
+            # Revoked sessions are already gone from the table.
+            if self._session_table.pop(session_id, None) is not None:
+                session = self.sessions.pop(session_id, None)
+                if session is not None:
+                    session.is_active = False
+                evicted += 1
+        return evicted
 
     def check_permission(self, session_id: str, permission: Permission) -> bool:
         """
         Check if user has specified permission.
 
-        TODO: Implement permission checking
-        - Verify session is valid and active
-        - Check user role permissions
-        - Log access attempts
+        TODO: Log access attempts
 
         Args:
             session_id: Session identifier
@@ -108,4 +334,39 @@ class AccessControl:
         Returns:
             True if user has permission, False otherwise
         """
-        raise NotImplementedError("Permission checking not yet implemented")
+        entry = self._session_table.get(session_id)
+        if entry is None or entry[0] <= time.time():
+            return False
+        return bool(self._user_masks.get(entry[1], 0) & PERMISSION_BITS[permission])
+
+    def _verify_password(self, username: str, password: str) -> Optional[str]:
+        """Return the user id if the password matches; runs on the KDF pool."""
+        user_id = self._usernames.get(username)
+        encoded = self._password_hashes.get(user_id) if user_id is not None else None
+        if user_id is None or encoded is None:
+            # Spend as long as for a real user so usernames cannot be probed.
+            if self._dummy_hash is None:
+                self._dummy_hash = self.hasher.hash(secrets.token_hex(16))
+            self.hasher.verify(password, self._dummy_hash)
+            return None
+        if not self.hasher.verify(password, encoded):
+            return None
+        if self.hasher.needs_rehash(encoded):
+            self._password_hashes[user_id] = self.hasher.hash(password)
+        return user_id
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._kdf_lock:
+            if self._kdf_pool is None:
+                self._kdf_pool = ThreadPoolExecutor(
+                    max_workers=self.kdf_workers, thread_name_prefix="password-kdf"
+                )
+            return self._kdf_pool
+
+    def _evict_resume_tokens(self, now: float) -> None:
+        expiries = self._resume_expiries
+        while expiries and expiries[0][0] <= now:
+            _, digest = heapq.heappop(expiries)
+            entry = self._resume_tokens.get(digest)
+            if entry is not None and entry[0] <= now:
+                del self._resume_tokens[digest]
@@ -0,0 +1,298 @@
+"""
+Usage Backends - Where UsageLimits keeps its quota counters.
+
+Counters are per user and per UTC day (days are date ordinals) and hold the
+usage seconds and request count of that day. A backend shared by all worker
+processes (RedisUsageBackend) keeps quotas exact across workers and hosts;
+InMemoryUsageBackend is for a single process.
+
+reserve() is the atomic check-and-increment used for request quotas: of any
+number of concurrent callers, only those that fit within the limit succeed.
+LeasedUsageBackend wraps a shared backend and reserves quota in blocks, so
+most requests are granted locally without a round trip.
+"""
+
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Tuple
+
+# Days of usage kept per user; enough for a week.
+COUNTER_DAYS = 7
+
+
+class UsageBackend(ABC):
+    """Interface of per-user, per-day usage counters."""
+
+    @abstractmethod
+    def add(self, user_id: str, day: int, seconds: int, requests: int) -> None:
+        """
+        Add usage to a user's counters for a day.
+
+        Args:
+            user_id: User identifier
+            day: Date ordinal (UTC)
+            seconds: Usage seconds to add
+            requests: Request count to add (may be negative to return quota)
+        """
+
+    @abstractmethod
+    def totals(self, user_id: str, first_day: int, last_day: int) -> Tuple[int, int]:
+        """
+        Sum a user's usage over an inclusive range of days.
+
+        Args:
+            user_id: User identifier
+            first_day: First date ordinal
+            last_day: Last date ordinal
+
+        Returns:
+            (seconds, requests)
+        """
+
+    @abstractmethod
+    def reserve(self, user_id: str, day: int, requests: int, limit: int) -> bool:
+        """
+        Atomically add requests to a day's count if it stays within a limit.
+
+        Args:
+            user_id: User identifier
+            day: Date ordinal (UTC)
+            requests: Requests to add
+            limit: Maximum request count for the day
+
+        Returns:
+            True if the requests were added, False if they would exceed the limit
+        """
+
+    def flush(self) -> None:
+        """Send buffered increments to shared storage (no-op by default)."""
+        return None
+
+
+class _DailyUsage:
+    """Ring buffer of one user's usage totals for the last COUNTER_DAYS days."""
+
+    __slots__ = ("days", "seconds", "requests")
+
+    def __init__(self) -> None:
+        self.days = [-1] * COUNTER_DAYS
+        self.seconds = [0] * COUNTER_DAYS
+        self.requests = [0] * COUNTER_DAYS
+
+    def slot(self, day: int) -> int:
+        """Return the slot holding a day, recycling it if it held an older day; -1 if too old."""
+        slot = day % COUNTER_DAYS
+        if self.days[slot] != day:
+            if self.days[slot] > day:
+                return -1
+            self.days[slot] = day
+            self.seconds[slot] = 0
+            self.requests[slot] = 0
+        return slot
+
+    def total(self, first_day: int, last_day: int) -> Tuple[int, int]:
+        seconds = requests = 0
+        for day in range(max(first_day, last_day - COUNTER_DAYS + 1), last_day + 1):
+            slot = day % COUNTER_DAYS
+            if self.days[slot] == day:
+                seconds += self.seconds[slot]
+                requests += self.requests[slot]
+        return seconds, requests
+
+
+class InMemoryUsageBackend(UsageBackend):
+    """
+    Process-local counters in per-user ring buffers of COUNTER_DAYS days.
+
+    Every operation costs the same however much usage was recorded. Usage for
+    days older than the ring is dropped.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty counters."""
+        self._usage: Dict[str, _DailyUsage] = {}
+        self._lock = threading.Lock()
+
+    def add(self, user_id: str, day: int, seconds: int, requests: int) -> None:
+        """Add usage to a user's counters for a day."""
+        with self._lock:
+            usage = self._user(user_id)
+            slot = usage.slot(day)
+            if slot >= 0:
+                usage.seconds[slot] += seconds
+                usage.requests[slot] += requests
+
+    def totals(self, user_id: str, first_day: int, last_day: int) -> Tuple[int, int]:
+        """Sum a user's usage over an inclusive range of days."""
+        with self._lock:
+            usage = self._usage.get(user_id)
+            return usage.total(first_day, last_day) if usage is not None else (0, 0)
+
+    def reserve(self, user_id: str, day: int, requests: int, limit: int) -> bool:
+        """Atomically add requests to a day's count if it stays within a limit."""
+        with self._lock:
+            usage = self._user(user_id)
+            slot = usage.slot(day)
+            if slot < 0 or usage.requests[slot] + requests > limit:
+                return False
+            usage.requests[slot] += requests
+            return True
+
+    def _user(self, user_id: str) -> _DailyUsage:
+        usage = self._usage.get(user_id)
+        if usage is None:
+            usage = self._usage[user_id] = _DailyUsage()
+        return usage
+
+
+class RedisUsageBackend(UsageBackend):
+    """
+    Counters shared through a Redis-protocol server.
+
+    ``client`` is a redis-py compatible client (``redis.Redis`` or anything
+    providing incrby, decrby, mget and pipeline). Each user and day has a
+    seconds key and a requests key, expiring after COUNTER_DAYS + 1 days.
+
+    add() buffers increments locally and sends them in one pipeline once
+    ``batch_size`` of them are pending, on flush() and before reads, so a
+    worker always reads its own writes. reserve() is never buffered: it
+    increments and rolls back if the limit was exceeded, which is atomic
+    across workers because every caller sees its own post-increment value.
+    """
+
+    def __init__(self, client: Any, prefix: str = "parent_ai_safety:usage", batch_size: int = 1):
+        """
+        Initialize Redis backend.
+
+        Args:
+            client: redis-py compatible client
+            prefix: Key prefix
+            batch_size: Pending increments that trigger a pipelined flush
+        """
+        self.client = client
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.ttl_seconds = (COUNTER_DAYS + 1) * 86400
+        self._pending: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def key(self, user_id: str, day: int, counter: str) -> str:
+        """Return the key of a user's seconds or requests counter for a day."""
+        return f"{self.prefix}:{user_id}:{day}:{counter}"
+
+    def add(self, user_id: str, day: int, seconds: int, requests: int) -> None:
+        """Buffer usage increments; flush when batch_size are pending."""
+        with self._lock:
+            for counter, amount in (("seconds", seconds), ("requests", requests)):
+                if amount:
+                    key = self.key(user_id, day, counter)
+                    self._pending[key] = self._pending.get(key, 0) + amount
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+
+    def flush(self) -> None:
+        """Send buffered increments in one pipeline."""
+        with self._lock:
+            self._flush()
+
+    def totals(self, user_id: str, first_day: int, last_day: int) -> Tuple[int, int]:
+        """Sum a user's usage over an inclusive range of days in one round trip."""
+        self.flush()
+        days = range(max(first_day, last_day - COUNTER_DAYS + 1), last_day + 1)
+        keys: List[str] = []
+        for day in days:
+            keys += [self.key(user_id, day, "seconds"), self.key(user_id, day, "requests")]
+        values = [int(value or 0) for value in self.client.mget(keys)]
+        return sum(values[0::2]), sum(values[1::2])
+
+    def reserve(self, user_id: str, day: int, requests: int, limit: int) -> bool:
+        """Increment a day's request count, rolling back if it exceeds the limit."""
+        key = self.key(user_id, day, "requests")
+        pipeline = self.client.pipeline()
+        pipeline.incrby(key, requests)
+        pipeline.expire(key, self.ttl_seconds)
+        count = int(pipeline.execute()[0])
+        if count > limit:
+            self.client.decrby(key, requests)
+            return False
+        return True
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        pipeline = self.client.pipeline()
+        for key, amount in self._pending.items():
+            pipeline.incrby(key, amount)
+            pipeline.expire(key, self.ttl_seconds)
+        pipeline.execute()
+        self._pending.clear()
+
+
+class LeasedUsageBackend(UsageBackend):
+    """
+    Pre-allocates request quota from a shared backend in blocks.
+
+    reserve() takes ``lease_size`` requests from the shared counter at once
+    and grants later requests from the local remainder, so only one request
+    in lease_size makes a round trip. Near the limit, when a whole lease no
+    longer fits, single requests are reserved directly. Leased but unused
+    requests count as used for other workers until release() returns them,
+    so a limit may deny up to (workers x lease_size) requests early but is
+    never exceeded.
+    """
+
+    def __init__(self, backend: UsageBackend, lease_size: int = 10) -> None:
+        """
+        Initialize leased backend.
+
+        Args:
+            backend: Shared backend to lease from
+            lease_size: Requests reserved per round trip
+        """
+        self.backend = backend
+        self.lease_size = lease_size
+        self._leases: Dict[Tuple[str, int], int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, user_id: str, day: int, seconds: int, requests: int) -> None:
+        """Add usage to the shared backend."""
+        self.backend.add(user_id, day, seconds, requests)
+
+    def totals(self, user_id: str, first_day: int, last_day: int) -> Tuple[int, int]:
+        """Sum usage from the shared backend, excluding this worker's unused leases."""
+        seconds, requests = self.backend.totals(user_id, first_day, last_day)
+        with self._lock:
+            unused = sum(
+                remaining
+                for (lease_user, day), remaining in self._leases.items()
+                if lease_user == user_id and first_day <= day <= last_day
+            )
+        return seconds, requests - unused
+
+    def reserve(self, user_id: str, day: int, requests: int, limit: int) -> bool:
+        """Grant requests from the local lease, taking a new lease when it runs out."""
+        key = (user_id, day)
+        with self._lock:
+            remaining = self._leases.get(key, 0)
+            if remaining >= requests:
+                self._leases[key] = remaining - requests
+                return True
+        amount = max(self.lease_size, requests)
+        if self.backend.reserve(user_id, day, amount, limit):
+            with self._lock:
+                self._leases[key] = self._leases.get(key, 0) + amount - requests
+            return True
+        return amount != requests and self.backend.reserve(user_id, day, requests, limit)
+
+    def flush(self) -> None:
+        """Flush the shared backend."""
+        self.backend.flush()
+
+    def release(self) -> None:
+        """Return unused leased requests to the shared backend."""
+        with self._lock:
+            leases, self._leases = self._leases, {}
+        for (user_id, day), remaining in leases.items():
+            if remaining:
+                self.backend.add(user_id, day, 0, -remaining)
+        self.backend.flush()
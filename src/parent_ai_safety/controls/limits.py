@@ -1,21 +1,32 @@
 """
 Usage Limits - Time-based restrictions and usage quotas.
 
+Daily/weekly time limits and request count quotas are checked against
+per-user, per-day usage counters kept in a UsageBackend, which can be shared
+between processes; consume() checks and counts a request in one atomic step.
+
+Schedule-based restrictions (school hours, bedtime, etc.) are compiled into a
+ScheduleIndex per user, so checking a schedule does not scan every window.
+
 TODO: Implement the following functionality:
-- Daily/weekly usage time limits
-- Request count quotas
-- Schedule-based restrictions (school hours, bedtime, etc.)
 - Temporary limit overrides (parental approval)
-- Usage tracking and reporting
+- Usage reporting
 - Limit violation notifications
 """
 
+from collections import deque
 from datetime import datetime, time
 from enum import Enum
-from typing import Dict, List, Optional
+from typing import Deque, Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
+from parent_ai_safety.controls.backends import InMemoryUsageBackend, UsageBackend
+from parent_ai_safety.controls.schedule import ScheduleIndex
+
+# Recent UsageRecords kept in memory for reporting.
+DEFAULT_MAX_RECORDS = 10_000
+
 
 class LimitType(str, Enum):
     """Types of usage limits."""
@@ -41,6 +52,9 @@ class UsageLimit(BaseModel):
     value: int = Field(..., description="Limit value (minutes, count, etc.)")
     enabled: bool = Field(default=True, description="Whether limit is active")
     metadata: Dict[str, str] = Field(default_factory=dict, description="Additional metadata")
+    time_windows: List[TimeWindow] = Field(
+        default_factory=list, description="Allowed time windows (SCHEDULE limits only)"
+    )
 
 
 class UsageRecord(BaseModel):
@@ -56,67 +70,204 @@ class UsageLimits:
     """
     Usage limits and quota management system.
 
+    DAILY_TIME and REQUEST_COUNT cover the current UTC day, WEEKLY_TIME the
+    current UTC week (starting Monday). Limit values are minutes for time
+    limits and a count for REQUEST_COUNT. SCHEDULE limits allow use only inside
+    their time windows.
+
+    Quotas are checked against per-user daily counters kept by a UsageBackend,
+    so checks cost the same however much usage there was. usage_records only
+    keeps the most recent records passed to record_usage(); requests counted
+    by consume() live in the backend counters alone. Limit
+    configuration is per process; with a shared backend such as
+    RedisUsageBackend, usage is shared by all workers. Use consume() to check
+    and count a request atomically. SCHEDULE
+    limits are compiled per user into a ScheduleIndex on first use; call
+    invalidate() after modifying a user's limits in place.
+
     TODO: Implement:
-    - check_limit() to verify if action is within limits
-    - record_usage() to track usage
-    - get_remaining() to show remaining quota
     - get_usage_stats() for reporting
     - reset_limits() for daily/weekly resets
     - override_limit() for temporary parental overrides
     """
 
-    def __init__(self) -> None:
-        """Initialize usage limits system."""
+    def __init__(
+        self, backend: Optional[UsageBackend] = None, max_records: int = DEFAULT_MAX_RECORDS
+    ) -> None:
+        """
+        Initialize usage limits system.
+
+        Args:
+            backend: Usage counter storage (process-local in memory if None)
+            max_records: Number of recent usage records kept in usage_records
+        """
         self.limits: Dict[str, List[UsageLimit]] = {}
-        self.usage_records: List[UsageRecord] = []
+        self.usage_records: Deque[UsageRecord] = deque(maxlen=max_records)
+        self.backend = backend or InMemoryUsageBackend()
+        self._schedules: Dict[str, Optional[ScheduleIndex]] = {}
+
+    def add_limit(self, user_id: str, limit: UsageLimit) -> None:
+        """Add a usage limit for a user."""
+        self.limits.setdefault(user_id, []).append(limit)
+        self.invalidate(user_id)
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        """
+        Drop compiled schedules after limits were modified in place.
+
+        Args:
+            user_id: User whose limits changed; all users if None
+        """
+        if user_id is None:
+            self._schedules.clear()
+        else:
+            self._schedules.pop(user_id, None)
+
+    def schedule(self, user_id: str) -> Optional[ScheduleIndex]:
+        """
+        Return the compiled SCHEDULE restrictions of a user.
+
+        Args:
+            user_id: User identifier
+
+        Returns:
+            Index allowing only times every enabled SCHEDULE limit allows, or
+            None if the user has no SCHEDULE limit
+        """
+        if user_id not in self._schedules:
+            index = None
+            for limit in self._active_limits(user_id, LimitType.SCHEDULE):
+                compiled = ScheduleIndex(limit.time_windows)
+                index = compiled if index is None else index & compiled
+            self._schedules[user_id] = index
+        return self._schedules[user_id]
+
+    def next_schedule_change(
+        self, user_id: str, now: Optional[datetime] = None
+    ) -> Optional[datetime]:
+        """
+        Return when the user's SCHEDULE check result next changes.
+
+        Clients can cache check_limit(user_id, LimitType.SCHEDULE) until then.
+
+        Args:
+            user_id: User identifier
+            now: Evaluation time (defaults to the current UTC time)
+
+        Returns:
+            Time of the next allowed/blocked transition, or None if there is none
+        """
+        index = self.schedule(user_id)
+        if index is None:
+            return None
+        return index.next_transition(now or datetime.utcnow())
 
-    def check_limit(self, user_id: str, limit_type: LimitType) -> bool:
+    def check_limit(
+        self, user_id: str, limit_type: LimitType, now: Optional[datetime] = None
+    ) -> bool:
         """
         Check if user is within specified limit.
 
-        TODO: Implement limit checking
-        - Calculate current usage for period
-        - Compare against configured limits
-        - Check schedule-based restrictions
-        - Return whether action is allowed
+        Users without an enabled limit of the given type are always allowed.
 
         Args:
             user_id: User identifier
             limit_type: Type of limit to check
+            now: Evaluation time (defaults to the current UTC time)
 
         Returns:
             True if within limits, False otherwise
         """
-        raise NotImplementedError("Limit checking not yet implemented")
+        now = now or datetime.utcnow()
+        if limit_type == LimitType.SCHEDULE:
+            index = self.schedule(user_id)
+            return index is None or index.allows(now)
+        limits = self._active_limits(user_id, limit_type)
+        if not limits:
+            return True
+        usage = self._current_usage(user_id, limit_type, now)
+        return all(usage < limit.value for limit in limits)
 
     def record_usage(self, record: UsageRecord) -> None:
         """
         Record usage for tracking.
 
-        TODO: Implement usage recording
-        - Store usage record
-        - Update aggregated statistics
-        - Trigger notifications if approaching limits
+        TODO: Trigger notifications if approaching limits
 
         Args:
             record: Usage record to store
         """
-        raise NotImplementedError("Usage recording not yet implemented")
+        self.usage_records.append(record)
+        self.backend.add(
+            record.user_id,
+            record.timestamp.toordinal(),
+            record.duration_seconds,
+            record.request_count,
+        )
 
-    def get_remaining(self, user_id: str, limit_type: LimitType) -> int:
+    def consume(self, user_id: str, requests: int = 1, now: Optional[datetime] = None) -> bool:
         """
-        Get remaining quota for user.
+        Atomically check the REQUEST_COUNT quota and count requests against it.
 
-        TODO: Implement quota calculation
-        - Calculate total limit
-        - Calculate current usage
-        - Return difference
+        Unlike check_limit() followed by record_usage(), concurrent callers
+        (also in other workers sharing the backend) cannot together exceed
+        the quota.
 
         Args:
             user_id: User identifier
-            limit_type: Type of limit
+            requests: Number of requests to count
+            now: Request time (defaults to the current UTC time)
 
         Returns:
-            Remaining quota (minutes, count, etc.)
+            True if the requests were within the quota and were counted
         """
-        raise NotImplementedError("Remaining quota calculation not yet implemented")
+        now = now or datetime.utcnow()
+        limits = self._active_limits(user_id, LimitType.REQUEST_COUNT)
+        day = now.toordinal()
+        if not limits:
+            self.backend.add(user_id, day, 0, requests)
+        elif not self.backend.reserve(user_id, day, requests, min(limit.value for limit in limits)):
+            return False
+        return True
+
+    def get_remaining(
+        self, user_id: str, limit_type: LimitType, now: Optional[datetime] = None
+    ) -> int:
+        """
+        Get remaining quota for user.
+
+        Args:
+            user_id: User identifier
+            limit_type: Type of limit (not SCHEDULE)
+            now: Evaluation time (defaults to the current UTC time)
+
+        Returns:
+            Remaining quota (minutes, count, etc.); -1 if the user has no such limit
+
+        Raises:
+            ValueError: If limit_type is SCHEDULE
+        """
+        if limit_type == LimitType.SCHEDULE:
+            raise ValueError("SCHEDULE limits have no remaining quota")
+        now = now or datetime.utcnow()
+        limits = self._active_limits(user_id, limit_type)
+        if not limits:
+            return -1
+        usage = self._current_usage(user_id, limit_type, now)
+        return max(min(limit.value for limit in limits) - usage, 0)
+
+    def _active_limits(self, user_id: str, limit_type: LimitType) -> List[UsageLimit]:
+        return [
+            limit
+            for limit in self.limits.get(user_id, [])
+            if limit.enabled and limit.limit_type == limit_type
+        ]
+
+    def _current_usage(self, user_id: str, limit_type: LimitType, now: datetime) -> int:
+        """Usage in the limit's unit (minutes or requests) for the current period."""
+        day = now.toordinal()
+        first_day = day - now.weekday() if limit_type == LimitType.WEEKLY_TIME else day
+        seconds, requests = self.backend.totals(user_id, first_day, day)
+        if limit_type == LimitType.REQUEST_COUNT:
+            return requests
+        return seconds // 60
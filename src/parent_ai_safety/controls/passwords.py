@@ -0,0 +1,103 @@
+"""
+Password Hashing - Salted scrypt hashes with tunable cost.
+
+Hashes are stored as self-describing strings
+``scrypt$<n>$<r>$<p>$<salt>$<key>`` (salt and key base64-encoded), so the cost
+parameters can be raised later: needs_rehash() tells whether a stored hash
+was made with different parameters, and AccessControl rehashes it on the next
+successful login.
+"""
+
+import base64
+import os
+from typing import Tuple
+
+from cryptography.exceptions import InvalidKey
+from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+
+SCHEME = "scrypt"
+# OWASP-recommended scrypt cost (N=2^17, r=8, p=1) is ~128 MiB per hash; the
+# default here trades some strength for login throughput at 16 MiB.
+DEFAULT_N = 2**14
+DEFAULT_R = 8
+DEFAULT_P = 1
+SALT_SIZE = 16
+KEY_LENGTH = 32
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+class PasswordHasher:
+    """scrypt password hasher with configurable cost parameters."""
+
+    def __init__(self, n: int = DEFAULT_N, r: int = DEFAULT_R, p: int = DEFAULT_P) -> None:
+        """
+        Initialize password hasher.
+
+        Args:
+            n: CPU/memory cost (a power of two)
+            r: Block size
+            p: Parallelization
+        """
+        self.n = n
+        self.r = r
+        self.p = p
+
+    def hash(self, password: str) -> str:
+        """
+        Hash a password with a fresh random salt.
+
+        Args:
+            password: Plain-text password
+
+        Returns:
+            Encoded hash
+        """
+        salt = os.urandom(SALT_SIZE)
+        key = self._kdf(salt, self.n, self.r, self.p).derive(password.encode("utf-8"))
+        return "$".join(
+            (SCHEME, str(self.n), str(self.r), str(self.p), _b64encode(salt), _b64encode(key))
+        )
+
+    def verify(self, password: str, encoded: str) -> bool:
+        """
+        Check a password against an encoded hash in constant time.
+
+        Args:
+            password: Plain-text password
+            encoded: Hash from hash()
+
+        Returns:
+            True if the password matches; False otherwise or if the hash is malformed
+        """
+        try:
+            (n, r, p), salt, key = self._decode(encoded)
+        except ValueError:
+            return False
+        try:
+            self._kdf(salt, n, r, p, len(key)).verify(password.encode("utf-8"), key)
+        except InvalidKey:
+            return False
+        return True
+
+    def needs_rehash(self, encoded: str) -> bool:
+        """Return True if a hash was made with other cost parameters than this hasher's."""
+        try:
+            params, _, _ = self._decode(encoded)
+        except ValueError:
+            return True
+        return params != (self.n, self.r, self.p)
+
+    @staticmethod
+    def _decode(encoded: str) -> Tuple[Tuple[int, int, int], bytes, bytes]:
+        parts = encoded.split("$")
+        if len(parts) != 6 or parts[0] != SCHEME:
+            raise ValueError("Not a scrypt password hash")
+        n, r, p = (int(value) for value in parts[1:4])
+        return (n, r, p), base64.b64decode(parts[4]), base64.b64decode(parts[5])
+
+    @staticmethod
+    def _kdf(salt: bytes, n: int, r: int, p: int, length: int = KEY_LENGTH) -> Scrypt:
+        return Scrypt(salt=salt, length=length, n=n, r=r, p=p)
@@ -0,0 +1,97 @@
+"""
+Schedule Index - Precompiled SCHEDULE restrictions.
+
+A ScheduleIndex compiles TimeWindows into a bitmap with one entry per minute
+of the week (Monday 00:00 to Sunday 23:59, UTC), so checking whether a user
+may use AI right now is a single lookup. Windows may overlap and may cross
+midnight, including from Sunday into Monday. The minutes at which the answer
+changes are kept sorted, so clients can cache a decision until the next
+transition instead of polling.
+
+Resolution is one minute: a minute is allowed when its first second is.
+"""
+
+import math
+from bisect import bisect_right
+from datetime import datetime, time, timedelta
+from typing import TYPE_CHECKING, Iterable, List, Optional
+
+if TYPE_CHECKING:
+    from parent_ai_safety.controls.limits import TimeWindow
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+
+def week_minute(moment: datetime) -> int:
+    """Return the minute of the week (0 = Monday 00:00) of a datetime."""
+    return moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+
+def _first_minute(moment: time) -> int:
+    """Return the first whole minute of the day at or after a time."""
+    seconds = moment.hour * 3600 + moment.minute * 60 + moment.second
+    return math.ceil((seconds + moment.microsecond / 1_000_000) / 60)
+
+
+class ScheduleIndex:
+    """Week-minute bitmap of allowed times with its sorted transitions."""
+
+    def __init__(self, windows: Iterable["TimeWindow"] = ()) -> None:
+        """
+        Compile allowed time windows.
+
+        Args:
+            windows: Allowed windows; with none, no time is allowed
+        """
+        bitmap = bytearray(MINUTES_PER_WEEK)
+        for window in windows:
+            start = _first_minute(window.start_time)
+            end = _first_minute(window.end_time)
+            if window.start_time >= window.end_time:
+                # Crosses midnight into the next day.
+                end += MINUTES_PER_DAY
+            for day in window.days_of_week:
+                offset = day * MINUTES_PER_DAY
+                for minute in range(offset + start, offset + end):
+                    bitmap[minute % MINUTES_PER_WEEK] = 1
+        self._set_bitmap(bitmap)
+
+    def __and__(self, other: "ScheduleIndex") -> "ScheduleIndex":
+        """Return the index allowing only times both indexes allow."""
+        combined = ScheduleIndex()
+        combined._set_bitmap(bytearray(a & b for a, b in zip(self._bitmap, other._bitmap)))
+        return combined
+
+    def allows(self, moment: datetime) -> bool:
+        """Return True if the schedule allows use at the given time."""
+        return bool(self._bitmap[week_minute(moment)])
+
+    def next_transition(self, moment: datetime) -> Optional[datetime]:
+        """
+        Return when the answer of allows() next changes.
+
+        Args:
+            moment: Current time
+
+        Returns:
+            Start of the first minute after moment with a different answer,
+            or None if the answer never changes
+        """
+        if not self._transitions:
+            return None
+        minute = week_minute(moment)
+        position = bisect_right(self._transitions, minute)
+        if position < len(self._transitions):
+            target = self._transitions[position]
+        else:
+            target = self._transitions[0] + MINUTES_PER_WEEK
+        current = moment.replace(second=0, microsecond=0)
+        return current + timedelta(minutes=target - minute)
+
+    def _set_bitmap(self, bitmap: bytearray) -> None:
+        self._bitmap = bytes(bitmap)
+        # Minutes whose state differs from the previous minute (wrapping around the week).
+        self._transitions: List[int] = [
+            minute for minute in range(MINUTES_PER_WEEK) if bitmap[minute] != bitmap[minute - 1]
+        ]
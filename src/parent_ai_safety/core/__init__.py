@@ -1,7 +1,15 @@
 """Core safety framework components."""
 
-from parent_ai_safety.core.policy import SafetyPolicy
-from parent_ai_safety.core.filter import ContentFilter
 from parent_ai_safety.core.ai_wrapper import AISafetyWrapper
+from parent_ai_safety.core.async_wrapper import AsyncAISafetyWrapper
+from parent_ai_safety.core.filter import ContentFilter
+from parent_ai_safety.core.policy import SafetyPolicy
+from parent_ai_safety.core.policy_registry import PolicyRegistry
 
-__all__ = ["SafetyPolicy", "ContentFilter", "AISafetyWrapper"]
+__all__ = [
+    "SafetyPolicy",
+    "PolicyRegistry",
+    "ContentFilter",
+    "AISafetyWrapper",
+    "AsyncAISafetyWrapper",
+]
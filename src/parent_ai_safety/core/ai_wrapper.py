@@ -1,21 +1,31 @@
 """
 AI Safety Wrapper - Wraps AI API calls with safety checks and monitoring.
 
-TODO: Implement the following functionality:
-- Pre-processing: filter user inputs before sending to AI
-- Post-processing: filter AI responses before returning
-- Rate limiting and usage quotas
-- Request/response logging
-- Integration with various AI APIs (OpenAI, Anthropic, etc.)
-- Fallback mechanisms for blocked content
+Responses can be filtered whole (process_response) or incrementally as the AI
+streams them (stream_response / astream_response).
+
+With a ProviderRouter (see core/providers.py), acomplete() runs the whole
+round trip: screen the prompt, call the AI providers, screen the answer. An
+answer blocked by the filter falls back to the next provider.
 """
 
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, Optional
 
 from pydantic import BaseModel, Field
 
-from parent_ai_safety.core.filter import ContentFilter, FilterResult
+from parent_ai_safety.core.cache import DecisionCache
+from parent_ai_safety.core.filter import ContentFilter, FilterAction, FilterResult
 from parent_ai_safety.core.policy import SafetyPolicy
+from parent_ai_safety.core.providers import ProviderRouter
+from parent_ai_safety.core.streaming import (
+    DEFAULT_WINDOW,
+    StreamingFilter,
+    afilter_stream,
+    filter_stream,
+)
+
+BLOCKED_RESPONSE_MESSAGE = "This response was blocked by your safety settings."
+BLOCKED_REQUEST_MESSAGE = "This request was blocked by your safety settings."
 
 
 class AIRequest(BaseModel):
@@ -34,22 +44,27 @@ class AIResponse(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict, description="Additional metadata")
 
 
+def request_context(request: AIRequest) -> Dict[str, Any]:
+    """Build the filter/policy evaluation context for a request."""
+    return {**request.metadata, "user_id": request.user_id}
+
+
 class AISafetyWrapper:
     """
     Wrapper for AI API calls with integrated safety mechanisms.
 
-    TODO: Implement:
-    - process_request() to validate and filter user input
-    - process_response() to validate and filter AI output
-    - Integration with ContentFilter and SafetyPolicy
-    - Usage tracking and rate limiting
-    - Audit logging of all interactions
+    Prompts and responses are screened by the content filter and the safety
+    policy. Access control, usage limits and logging are orchestrated by
+    AsyncAISafetyWrapper (see core/async_wrapper.py).
     """
 
     def __init__(
         self,
         policy: SafetyPolicy,
         content_filter: ContentFilter,
+        stream_window: int = DEFAULT_WINDOW,
+        decision_cache: Optional[DecisionCache] = None,
+        router: Optional[ProviderRouter] = None,
     ) -> None:
         """
         Initialize AI safety wrapper.
@@ -57,38 +72,38 @@ class AISafetyWrapper:
         Args:
             policy: Safety policy to enforce
             content_filter: Content filter to use
+            stream_window: Characters held back between streamed chunks so that
+                matches spanning chunk boundaries are still caught
+            decision_cache: Cache of screening decisions for repeated content
+            router: AI providers used by acomplete() and generate()
         """
         self.policy = policy
         self.content_filter = content_filter
+        self.stream_window = stream_window
+        self.decision_cache = decision_cache
+        self.router = router
 
     def process_request(self, request: AIRequest) -> Optional[AIRequest]:
         """
         Process and validate AI request before sending to AI system.
 
-        TODO: Implement:
-        - Apply content filtering to prompt
-        - Check against safety policy
-        - Log request for audit
-        - Return None if request should be blocked
-
         Args:
             request: The AI request to process
 
         Returns:
-            Processed request or None if blocked
+            Processed request (with a sanitized prompt if needed) or None if blocked
         """
-        raise NotImplementedError("Request processing not yet implemented")
+        result = self.screen(request.prompt, request_context(request))
+        if not result.passed:
+            return None
+        if result.sanitized_content is not None:
+            return request.model_copy(update={"prompt": result.sanitized_content})
+        return request
 
     def process_response(self, response: str, request: AIRequest) -> AIResponse:
         """
         Process and validate AI response before returning to user.
 
-        TODO: Implement:
-        - Apply content filtering to response
-        - Check against safety policy
-        - Sanitize if needed
-        - Log response for audit
-
         Args:
             response: Raw AI response
             request: Original request for context
@@ -96,4 +111,162 @@ class AISafetyWrapper:
         Returns:
             Processed AI response
         """
-        raise NotImplementedError("Response processing not yet implemented")
+        result = self.screen(response, request_context(request))
+        return self._build_response(response, result)
+
+    async def acomplete(self, request: AIRequest) -> AIResponse:
+        """
+        Screen a prompt, get the AI's answer and screen the answer.
+
+        Args:
+            request: The AI request
+
+        Returns:
+            Processed AI response; a blocked prompt is answered with
+            BLOCKED_REQUEST_MESSAGE without calling any provider
+
+        Raises:
+            RuntimeError: If the wrapper has no router
+            ProviderError: If every provider failed
+        """
+        processed = self.process_request(request)
+        if processed is None:
+            return AIResponse(
+                content=BLOCKED_REQUEST_MESSAGE, filtered=True, metadata={"blocked": "prompt"}
+            )
+        return await self.generate(processed)
+
+    async def generate(self, request: AIRequest) -> AIResponse:
+        """
+        Send an already screened request to the AI providers and screen the answer.
+
+        Answers blocked by the filter fall back to the next provider; only
+        if every provider's answer is blocked is the response blocked.
+
+        Args:
+            request: Screened request
+
+        Returns:
+            Processed AI response, with the answering provider in its metadata
+
+        Raises:
+            RuntimeError: If the wrapper has no router
+            ProviderError: If every provider failed
+        """
+        if self.router is None:
+            raise RuntimeError("AISafetyWrapper has no provider router")
+        context = request_context(request)
+        results: Dict[str, FilterResult] = {}
+
+        def accept(text: str) -> bool:
+            results[text] = self.screen(text, context)
+            return results[text].passed
+
+        completion = await self.router.complete(request.prompt, accept)
+        response = self._build_response(completion.text, results[completion.text])
+        response.metadata["provider"] = completion.provider
+        response.metadata["latency_ms"] = completion.latency_ms
+        return response
+
+    def screen(self, content: str, context: Dict[str, Any]) -> FilterResult:
+        """
+        Run content through the content filter and the safety policy.
+
+        A policy denial is reported as a BLOCK result. Decisions are served from
+        the decision cache when one is configured.
+
+        Args:
+            content: Prompt or response text
+            context: Evaluation context (user_id, age, ...)
+
+        Returns:
+            Combined filtering decision
+        """
+        if self.decision_cache is None:
+            return self._screen(content, context)
+        key = self.decision_cache.make_key(content, context)
+        epoch = (self.content_filter.version, self.policy.version)
+        result = self.decision_cache.get(key, epoch)
+        if result is None:
+            result = self._screen(content, context)
+            self.decision_cache.put(key, epoch, result)
+        return result
+
+    def _screen(self, content: str, context: Dict[str, Any]) -> FilterResult:
+        result = self.content_filter.filter(content, context)
+        if not result.passed or self.policy.enforce(content, context):
+            return result
+        return FilterResult(
+            passed=False,
+            action=FilterAction.BLOCK,
+            matched_rules=result.matched_rules,
+            metadata={**result.metadata, "policy": self.policy.name},
+        )
+
+    def stream_response(self, chunks: Iterable[str], request: AIRequest) -> Iterator[str]:
+        """
+        Filter a streamed AI response chunk by chunk.
+
+        The stream is screened in the request's context, like a whole
+        response: the filter rules of the user's age profile apply and every
+        released segment must pass the safety policy. Safe text is yielded
+        as soon as it can no longer be part of a match. If a BLOCK rule
+        fires or the policy denies a segment, the stream is cut and
+        BLOCKED_RESPONSE_MESSAGE is yielded in place of the rest of the
+        response.
+
+        Args:
+            chunks: Response chunks as produced by the AI system
+            request: Original request for context
+
+        Yields:
+            Filtered response text
+        """
+        stream = self.open_stream(request)
+        yield from filter_stream(self.content_filter, chunks, stream=stream)
+        if stream.blocked:
+            yield BLOCKED_RESPONSE_MESSAGE
+
+    async def astream_response(
+        self, chunks: AsyncIterable[str], request: AIRequest
+    ) -> AsyncIterator[str]:
+        """
+        Filter an asynchronously streamed AI response chunk by chunk.
+
+        Async counterpart of stream_response().
+
+        Args:
+            chunks: Response chunks as produced by the AI system
+            request: Original request for context
+
+        Yields:
+            Filtered response text
+        """
+        stream = self.open_stream(request)
+        async for text in afilter_stream(self.content_filter, chunks, stream=stream):
+            yield text
+        if stream.blocked:
+            yield BLOCKED_RESPONSE_MESSAGE
+
+    def open_stream(self, request: Optional[AIRequest] = None) -> StreamingFilter:
+        """
+        Create a StreamingFilter using this wrapper's filter, policy and window.
+
+        Args:
+            request: Request whose response is streamed; its context selects
+                the age profile and is passed to the policy
+
+        Returns:
+            New streaming filter
+        """
+        context = request_context(request) if request is not None else None
+        return StreamingFilter(self.content_filter, self.stream_window, context, self.policy)
+
+    @staticmethod
+    def _build_response(content: str, result: FilterResult) -> AIResponse:
+        metadata: Dict[str, Any] = {"filter": result.model_dump(mode="json")}
+        if not result.passed:
+            return AIResponse(content=BLOCKED_RESPONSE_MESSAGE, filtered=True, metadata=metadata)
+        if result.sanitized_content is not None:
+            return AIResponse(content=result.sanitized_content, filtered=True, metadata=metadata)
+        return AIResponse(content=content, metadata=metadata)
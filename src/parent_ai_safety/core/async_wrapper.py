@@ -0,0 +1,464 @@
+"""
+Async AI Safety Wrapper - asyncio-native request pipeline.
+
+AsyncAISafetyWrapper runs the independent pre-checks of a request
+concurrently instead of one after another:
+- Session permission (AccessControl.check_permission)
+- Usage quotas (UsageLimits.check_limit for time and request limits)
+- Schedule restrictions (UsageLimits.check_limit for SCHEDULE)
+- Content filtering and policy enforcement of the prompt
+- External moderators (e.g. a moderation API), if configured
+
+The first failing check cancels the rest. Audit and activity writes are queued
+and performed by a background task so they never sit on the critical path.
+complete() runs the checks and then the AI providers (see core/providers.py).
+
+For low-risk requests complete() can speculate: once the local content filter
+has found nothing in the prompt, the prompt goes upstream while the slower
+checks (policy, permissions, quotas, moderation) run, and the answer is
+released only after every check passed. A denied request cancels the upstream
+call and its answer is discarded. Prompts the filter would block or sanitize
+are never sent speculatively.
+"""
+
+import asyncio
+import inspect
+import logging
+import time
+import uuid
+from concurrent.futures import Executor
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    cast,
+)
+
+from pydantic import BaseModel, Field
+
+from parent_ai_safety.controls.access import AccessControl, Permission
+from parent_ai_safety.controls.limits import LimitType, UsageLimits
+from parent_ai_safety.core.ai_wrapper import (
+    BLOCKED_REQUEST_MESSAGE,
+    AIRequest,
+    AIResponse,
+    AISafetyWrapper,
+    request_context,
+)
+from parent_ai_safety.core.cache import DecisionCache
+from parent_ai_safety.core.filter import ContentFilter, FilterResult
+from parent_ai_safety.core.policy import SafetyPolicy
+from parent_ai_safety.core.providers import ProviderRouter
+from parent_ai_safety.core.streaming import DEFAULT_WINDOW
+from parent_ai_safety.monitoring.activity import (
+    Activity,
+    ActivityMonitor,
+    ActivitySeverity,
+    ActivityType,
+)
+from parent_ai_safety.monitoring.audit import AuditEventType, AuditLogger
+
+logger = logging.getLogger(__name__)
+
+QUOTA_LIMITS = (LimitType.DAILY_TIME, LimitType.WEEKLY_TIME, LimitType.REQUEST_COUNT)
+
+CheckOutcome = Tuple[str, bool]
+
+# Returns True if a prompt may be sent (awaitable results are awaited).
+Moderator = Callable[[str, Dict[str, Any]], Any]
+
+T = TypeVar("T")
+
+
+class RequestDecision(BaseModel):
+    """Outcome of running a request through the async pipeline."""
+
+    allowed: bool = Field(..., description="Whether the request may be sent to the AI")
+    request: Optional[AIRequest] = Field(None, description="Request to send if allowed")
+    denied_by: List[str] = Field(default_factory=list, description="Checks that denied it")
+    filter_result: Optional[FilterResult] = Field(None, description="Prompt filtering result")
+
+
+class AsyncAISafetyWrapper:
+    """
+    asyncio-native wrapper for AI API calls.
+
+    Components other than the policy and content filter are optional; checks
+    for missing components are skipped. Synchronous component methods run
+    inline by default, or on ``executor`` when one is given. Component methods
+    that return awaitables are awaited, so async backends plug in directly.
+
+    The session to authorize is taken from ``request.metadata["session_id"]``.
+
+    Requests for which ``speculate`` returns True are completed speculatively
+    (see complete()). The counters speculative_requests, speculation_discarded
+    and speculation_saved_ms track how often that paid off.
+    """
+
+    def __init__(
+        self,
+        policy: SafetyPolicy,
+        content_filter: ContentFilter,
+        access_control: Optional[AccessControl] = None,
+        usage_limits: Optional[UsageLimits] = None,
+        audit_logger: Optional[AuditLogger] = None,
+        activity_monitor: Optional[ActivityMonitor] = None,
+        executor: Optional[Executor] = None,
+        stream_window: int = DEFAULT_WINDOW,
+        decision_cache: Optional[DecisionCache] = None,
+        max_pending_writes: int = 10_000,
+        router: Optional[ProviderRouter] = None,
+        moderators: Optional[List[Moderator]] = None,
+        speculate: Optional[Callable[[AIRequest], bool]] = None,
+    ) -> None:
+        """
+        Initialize async AI safety wrapper.
+
+        Args:
+            policy: Safety policy to enforce
+            content_filter: Content filter to use
+            access_control: Access control for session permission checks
+            usage_limits: Usage limits for quota and schedule checks
+            audit_logger: Audit logger for background audit writes
+            activity_monitor: Activity monitor for background activity writes
+            executor: Executor for synchronous checks and writes (inline if None)
+            stream_window: Carry-over window for streamed responses
+            decision_cache: Cache of screening decisions for repeated prompts
+            max_pending_writes: Bound of the background write queue
+            router: AI providers used by complete()
+            moderators: Extra prompt checks, called with the prompt and context
+            speculate: Selects requests (e.g. low-risk profiles) whose prompt is
+                sent upstream while the checks run; never speculates if None
+        """
+        self.wrapper = AISafetyWrapper(
+            policy,
+            content_filter,
+            stream_window=stream_window,
+            decision_cache=decision_cache,
+            router=router,
+        )
+        self.access_control = access_control
+        self.usage_limits = usage_limits
+        self.audit_logger = audit_logger
+        self.activity_monitor = activity_monitor
+        self.executor = executor
+        self.max_pending_writes = max_pending_writes
+        self.moderators = list(moderators or [])
+        self.speculate = speculate
+        self.speculative_requests = 0
+        self.speculation_discarded = 0
+        self.speculation_saved_ms = 0.0
+        self._writes: Optional[asyncio.Queue[Callable[[], Any]]] = None
+        self._writer: Optional[asyncio.Task[None]] = None
+
+    async def __aenter__(self) -> "AsyncAISafetyWrapper":
+        """Start the background writer."""
+        self._ensure_writer()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        """Flush pending writes and stop the background writer."""
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Wait for pending background writes and stop the writer task."""
+        if self._writer is None or self._writes is None:
+            return
+        await self._writes.join()
+        self._writer.cancel()
+        try:
+            await self._writer
+        except asyncio.CancelledError:
+            pass
+        self._writer = None
+        self._writes = None
+
+    async def flush(self) -> None:
+        """Wait until all queued audit and activity writes have completed."""
+        if self._writes is not None:
+            await self._writes.join()
+
+    async def evaluate_request(self, request: AIRequest) -> RequestDecision:
+        """
+        Run all pre-checks for a request concurrently.
+
+        Args:
+            request: The AI request to evaluate
+
+        Returns:
+            Decision including the (possibly sanitized) request if allowed
+        """
+        filter_results: List[FilterResult] = []
+        checks = [self._screen_prompt(request, filter_results)]
+        if self.access_control is not None:
+            session_id = request.metadata.get("session_id")
+            checks.append(
+                self._check(
+                    "permission",
+                    self.access_control.check_permission,
+                    session_id or "",
+                    Permission.USE_AI,
+                )
+            )
+        if self.usage_limits is not None:
+            for limit_type in (*QUOTA_LIMITS, LimitType.SCHEDULE):
+                checks.append(
+                    self._check(
+                        limit_type.value,
+                        self.usage_limits.check_limit,
+                        request.user_id,
+                        limit_type,
+                    )
+                )
+        if self.moderators:
+            context = request_context(request)
+            for moderator in self.moderators:
+                checks.append(self._check("moderation", moderator, request.prompt, context))
+
+        denied_by = await self._first_denial(checks)
+        if not denied_by and self.usage_limits is not None:
+            # Counting the request is an atomic check-and-increment, so
+            # concurrent requests cannot overrun the quota together.
+            if not await self._call(self.usage_limits.consume, request.user_id):
+                denied_by = [LimitType.REQUEST_COUNT.value]
+        filter_result = filter_results[0] if filter_results else None
+        if denied_by:
+            decision = RequestDecision(
+                allowed=False, denied_by=denied_by, filter_result=filter_result
+            )
+        else:
+            allowed = request
+            if filter_result is not None and filter_result.sanitized_content is not None:
+                allowed = request.model_copy(update={"prompt": filter_result.sanitized_content})
+            decision = RequestDecision(allowed=True, request=allowed, filter_result=filter_result)
+
+        self._record(request, decision)
+        return decision
+
+    async def process_request(self, request: AIRequest) -> Optional[AIRequest]:
+        """
+        Process and validate AI request before sending to AI system.
+
+        Args:
+            request: The AI request to process
+
+        Returns:
+            Processed request or None if blocked
+        """
+        decision = await self.evaluate_request(request)
+        return decision.request if decision.allowed else None
+
+    async def complete(self, request: AIRequest) -> AIResponse:
+        """
+        Run all pre-checks, then get and screen the AI's answer.
+
+        Speculative requests are first run through the local content filter.
+        Only if no rule matches is the prompt sent upstream while the other
+        checks run; otherwise the request takes the regular path, so blocked
+        or unsanitized text never leaves the process early. The speculative
+        answer is held back until every check passed; if one fails, the
+        upstream call is cancelled and its answer discarded. The latency
+        saved is reported as ``speculation_saved_ms`` in the response metadata.
+
+        Args:
+            request: The AI request
+
+        Returns:
+            Processed AI response; a denied request is answered with
+            BLOCKED_REQUEST_MESSAGE
+
+        Raises:
+            RuntimeError: If the wrapper has no router
+            ProviderError: If every provider failed
+        """
+        if not await self._speculative(request):
+            decision = await self.evaluate_request(request)
+            if not decision.allowed or decision.request is None:
+                return self._denied_response(decision)
+            return await self.wrapper.generate(decision.request)
+
+        self.speculative_requests += 1
+        started = time.perf_counter()
+        upstream = asyncio.ensure_future(_timed(self.wrapper.generate(request)))
+        try:
+            decision = await self.evaluate_request(request)
+        except BaseException:
+            _discard(upstream)
+            raise
+        checks_ms = (time.perf_counter() - started) * 1000
+        if not decision.allowed or decision.request is None:
+            _discard(upstream)
+            self.speculation_discarded += 1
+            return self._denied_response(decision)
+        if decision.request.prompt != request.prompt:
+            # Only possible if the filter rules changed since the prescreen.
+            _discard(upstream)
+            self.speculation_discarded += 1
+            return await self.wrapper.generate(decision.request)
+
+        response, upstream_ms = await upstream
+        # Sequentially the request would have taken checks + upstream time.
+        saved_ms = min(checks_ms, upstream_ms)
+        self.speculation_saved_ms += saved_ms
+        response.metadata["speculation_saved_ms"] = saved_ms
+        return response
+
+    async def process_response(self, response: str, request: AIRequest) -> AIResponse:
+        """
+        Process and validate AI response before returning to user.
+
+        Args:
+            response: Raw AI response
+            request: Original request for context
+
+        Returns:
+            Processed AI response
+        """
+        return cast(AIResponse, await self._call(self.wrapper.process_response, response, request))
+
+    async def astream_response(
+        self, chunks: AsyncIterable[str], request: AIRequest
+    ) -> AsyncIterator[str]:
+        """
+        Filter an asynchronously streamed AI response chunk by chunk.
+
+        Args:
+            chunks: Response chunks as produced by the AI system
+            request: Original request for context
+
+        Yields:
+            Filtered response text
+        """
+        async for text in self.wrapper.astream_response(chunks, request):
+            yield text
+
+    async def _speculative(self, request: AIRequest) -> bool:
+        """Return True if the request is selected and its prompt matches no filter rule."""
+        if self.speculate is None or not self.speculate(request):
+            return False
+        result = await self._call(
+            self.wrapper.content_filter.filter, request.prompt, request_context(request)
+        )
+        return result.action is None
+
+    @staticmethod
+    def _denied_response(decision: RequestDecision) -> AIResponse:
+        return AIResponse(
+            content=BLOCKED_REQUEST_MESSAGE,
+            filtered=True,
+            metadata={"denied_by": decision.denied_by},
+        )
+
+    async def _screen_prompt(self, request: AIRequest, results: List[FilterResult]) -> CheckOutcome:
+        result = await self._call(self.wrapper.screen, request.prompt, request_context(request))
+        results.append(result)
+        return "content", result.passed
+
+    async def _check(self, name: str, func: Callable[..., Any], *args: Any) -> CheckOutcome:
+        return name, bool(await self._call(func, *args))
+
+    async def _call(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a component method inline, on the executor, or await it if async."""
+        if self.executor is not None and not inspect.iscoroutinefunction(func):
+            result = await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        else:
+            result = func(*args)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    @staticmethod
+    async def _first_denial(checks: List[Any]) -> List[str]:
+        """Run checks concurrently; stop at the first denial and return its name."""
+        pending = {asyncio.ensure_future(check) for check in checks}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                denied = [name for name, passed in (task.result() for task in done) if not passed]
+                if denied:
+                    return sorted(denied)
+            return []
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _record(self, request: AIRequest, decision: RequestDecision) -> None:
+        """Queue audit and activity writes for a request decision."""
+        if self.audit_logger is None and self.activity_monitor is None:
+            return
+        details = {"allowed": decision.allowed, "denied_by": decision.denied_by}
+        if self.audit_logger is not None:
+            audit_logger = self.audit_logger
+            self._enqueue(
+                lambda: audit_logger.log(
+                    AuditEventType.USER_ACTION,
+                    "ai_request",
+                    user_id=request.user_id,
+                    details=details,
+                )
+            )
+        if self.activity_monitor is not None:
+            activity_monitor = self.activity_monitor
+            activity = Activity(
+                activity_id=uuid.uuid4().hex,
+                user_id=request.user_id,
+                activity_type=_activity_type(decision),
+                severity=ActivitySeverity.INFO if decision.allowed else ActivitySeverity.WARNING,
+                details=details,
+            )
+            self._enqueue(lambda: activity_monitor.log_activity(activity))
+
+    def _enqueue(self, write: Callable[[], Any]) -> None:
+        writes = self._ensure_writer()
+        try:
+            writes.put_nowait(write)
+        except asyncio.QueueFull:
+            # Writes must not be lost; when the queue is saturated the caller
+            # pays for this one write instead.
+            write()
+
+    def _ensure_writer(self) -> "asyncio.Queue[Callable[[], Any]]":
+        if self._writes is None:
+            self._writes = asyncio.Queue(maxsize=self.max_pending_writes)
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.ensure_future(self._drain(self._writes))
+        return self._writes
+
+    async def _drain(self, writes: "asyncio.Queue[Callable[[], Any]]") -> None:
+        while True:
+            write = await writes.get()
+            try:
+                await self._call(write)
+            except Exception:
+                # One failed write must not stop the writer.
+                logger.exception("Background audit/activity write failed")
+            finally:
+                writes.task_done()
+
+
+async def _timed(awaitable: Awaitable[T]) -> Tuple[T, float]:
+    """Await and return the result with the time it took in milliseconds."""
+    started = time.perf_counter()
+    result = await awaitable
+    return result, (time.perf_counter() - started) * 1000
+
+
+def _discard(task: "asyncio.Future[Any]") -> None:
+    """Cancel a speculative task and silence any error it already raised."""
+    task.cancel()
+    task.add_done_callback(lambda done: done.cancelled() or done.exception())
+
+
+def _activity_type(decision: RequestDecision) -> ActivityType:
+    if "content" in decision.denied_by or "moderation" in decision.denied_by:
+        return ActivityType.BLOCKED_CONTENT
+    if any(name != "permission" for name in decision.denied_by):
+        return ActivityType.LIMIT_EXCEEDED
+    return ActivityType.AI_REQUEST
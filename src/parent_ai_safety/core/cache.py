@@ -0,0 +1,142 @@
+"""
+Decision Cache - Reuse screening decisions for repeated content.
+
+Children send the same prompts over and over. DecisionCache remembers the
+combined filter/policy decision for a piece of content, keyed on a hash of the
+normalized content, the content filter and safety policy versions and the
+user's age. Any rule or policy change bumps a version, which invalidates the
+cached decisions automatically. Versions are unique across filters and across
+policies, so swapping a wrapper's policy invalidates the cache as well, and a
+cache shared by wrappers with different policies never serves one policy's
+decision for another (it is cleared on every switch, so share caches only
+between wrappers using the same filter and policy).
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from parent_ai_safety.core.filter import FilterResult
+
+CacheKey = Tuple[bytes, Hashable]
+
+
+class CacheStats(BaseModel):
+    """Decision cache metrics."""
+
+    hits: int = Field(default=0, description="Lookups answered from the cache")
+    misses: int = Field(default=0, description="Lookups not found in the cache")
+    evictions: int = Field(default=0, description="Entries evicted to respect maxsize")
+    invalidations: int = Field(
+        default=0, description="Times the cache was cleared by a version bump"
+    )
+    size: int = Field(default=0, description="Current number of entries")
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class DecisionCache:
+    """
+    Bounded LRU cache of screening decisions.
+
+    Content is normalized by lowercasing, matching the case-insensitive
+    semantics of filter keywords, filter patterns and policy conditions.
+    Entries are only valid for one (filter version, policy version) epoch; the
+    first lookup in a new epoch clears the cache. The cache is thread-safe.
+    """
+
+    def __init__(self, maxsize: int = 10_000) -> None:
+        """
+        Initialize decision cache.
+
+        Args:
+            maxsize: Maximum number of cached decisions
+        """
+        self.maxsize = maxsize
+        self._entries: OrderedDict[CacheKey, FilterResult] = OrderedDict()
+        self._epoch: Optional[Tuple[int, int]] = None
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(content: str, context: Dict[str, Any]) -> CacheKey:
+        """
+        Build the cache key for content screened in the given context.
+
+        Args:
+            content: Content being screened
+            context: Evaluation context; only the age affects decisions
+
+        Returns:
+            Hash of the normalized content plus the age
+        """
+        digest = hashlib.blake2b(content.lower().encode("utf-8"), digest_size=16).digest()
+        return digest, context.get("age")
+
+    def get(self, key: CacheKey, epoch: Tuple[int, int]) -> Optional[FilterResult]:
+        """
+        Look up a cached decision.
+
+        Args:
+            key: Key from make_key()
+            epoch: (filter version, policy version) the decision must belong to
+
+        Returns:
+            Cached decision, or None on a miss
+        """
+        with self._lock:
+            self._check_epoch(epoch)
+            result = self._entries.get(key)
+            if result is None:
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return result
+
+    def put(self, key: CacheKey, epoch: Tuple[int, int], result: FilterResult) -> None:
+        """
+        Store a decision.
+
+        Decisions carrying sanitized content are specific to the exact input
+        text and are not cached.
+
+        Args:
+            key: Key from make_key()
+            epoch: (filter version, policy version) the decision was made under
+            result: Decision to cache
+        """
+        if result.sanitized_content is not None:
+            return
+        with self._lock:
+            self._check_epoch(epoch)
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all cached decisions."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        """Return a snapshot of the cache metrics."""
+        with self._lock:
+            return self._stats.model_copy(update={"size": len(self._entries)})
+
+    def _check_epoch(self, epoch: Tuple[int, int]) -> None:
+        if epoch == self._epoch:
+            return
+        if self._epoch is not None:
+            self._entries.clear()
+            self._stats.invalidations += 1
+        self._epoch = epoch
@@ -1,20 +1,38 @@
 """
 Content Filtering - Age-appropriate and harmful content detection/filtering.
 
+Rules combine keyword sets and regex patterns; all enabled rules are compiled
+into one matcher (see core/matcher.py) and evaluated in a single pass.
+
+Rules can be limited to age brackets. Each bracket gets its own matcher built
+from the rules active for it, so younger children's extra rules cost nothing
+when filtering for teenagers.
+
+An optional TextNormalizer (see core/normalize.py) folds evasive spellings
+such as "b@d" or "b a d"; keywords are folded by the same normalizer when
+compiled, so both sides of a match agree.
+
 TODO: Implement the following functionality:
-- Age-appropriate content filtering
 - Harmful content detection (violence, adult content, etc.)
-- Customizable filter rules and keywords
-- Pattern-based filtering (regex support)
 - Integration with external content safety APIs
-- Content sanitization and modification
 """
 
+import re
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from enum import Enum
-from typing import Any, Dict, List, Optional, Set
+from itertools import count, islice
+from typing import Any, Deque, Dict, Generator, Iterable, Iterator, List, Optional, Set, Tuple
 
 from pydantic import BaseModel, Field
 
+from parent_ai_safety.core.matcher import CompiledRuleSet, Span
+from parent_ai_safety.core.normalize import TextNormalizer
+
+# Rule-set versions come from one process-wide counter, so no two filters ever
+# share a version and decisions cached for one never answer for another.
+_versions = count(1)
+
 
 class ContentCategory(str, Enum):
     """Categories of content that can be filtered."""
@@ -36,6 +54,117 @@ class FilterAction(str, Enum):
     LOG_ONLY = "log_only"
 
 
+class AgeBracket(str, Enum):
+    """Age brackets with their own filter profile."""
+
+    AGES_5_8 = "5-8"
+    AGES_9_12 = "9-12"
+    AGES_13_15 = "13-15"
+    AGES_16_17 = "16-17"
+
+    @property
+    def bounds(self) -> Tuple[int, int]:
+        """Inclusive (youngest, oldest) age of the bracket."""
+        youngest, oldest = self.value.split("-")
+        return int(youngest), int(oldest)
+
+    @classmethod
+    def for_age(cls, age: int) -> "AgeBracket":
+        """
+        Return the bracket of an age.
+
+        Ages outside every bracket fall into the nearest one.
+
+        Args:
+            age: Age in years
+
+        Returns:
+            The bracket containing the age
+        """
+        for bracket in cls:
+            if age <= bracket.bounds[1]:
+                return bracket
+        return cls.AGES_16_17
+
+
+# Precedence used to pick the overall action when several rules match.
+ACTION_PRECEDENCE: Dict[FilterAction, int] = {
+    FilterAction.LOG_ONLY: 0,
+    FilterAction.WARN: 1,
+    FilterAction.SANITIZE: 2,
+    FilterAction.BLOCK: 3,
+}
+
+SANITIZE_MASK = "***"
+MASK_CHAR = "*"
+
+
+class MaskStyle(str, Enum):
+    """How SANITIZE replaces matched text."""
+
+    FIXED = "fixed"  # SANITIZE_MASK, whatever the length
+    LENGTH = "length"  # one MASK_CHAR per masked character
+    KEEP_FIRST = "keep_first"  # first character kept, the rest MASK_CHAR
+
+
+def _mask(text: str, style: MaskStyle) -> str:
+    if style == MaskStyle.LENGTH:
+        return MASK_CHAR * len(text)
+    if style == MaskStyle.KEEP_FIRST:
+        return text[:1] + MASK_CHAR * (len(text) - 1)
+    return SANITIZE_MASK
+
+
+def merge_spans(spans: Iterable[Span]) -> List[Span]:
+    """
+    Merge overlapping and touching spans.
+
+    Args:
+        spans: (start, end) offsets in any order; empty spans are ignored
+
+    Returns:
+        Disjoint spans in ascending order
+    """
+    merged: List[Span] = []
+    for start, end in sorted(spans):
+        if start >= end:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def mask_spans(content: str, spans: Iterable[Span], style: MaskStyle = MaskStyle.FIXED) -> str:
+    """
+    Replace each span of content with a mask.
+
+    Overlapping spans are merged first and the result is built with a single
+    join, so the cost is linear in the content length however many spans
+    there are (plus sorting the spans).
+
+    Args:
+        content: Original content
+        spans: (start, end) offsets to mask
+        style: Masking style
+
+    Returns:
+        Content with every span masked
+    """
+    parts: List[str] = []
+    position = 0
+    for start, end in merge_spans(spans):
+        parts.append(content[position:start])
+        parts.append(_mask(content[start:end], style))
+        position = end
+    if not parts:
+        return content
+    parts.append(content[position:])
+    return "".join(parts)
+
+
 class FilterRule(BaseModel):
     """Individual content filter rule."""
 
@@ -45,6 +174,13 @@ class FilterRule(BaseModel):
     keywords: Set[str] = Field(default_factory=set, description="Keywords to match")
     patterns: List[str] = Field(default_factory=list, description="Regex patterns to match")
     enabled: bool = Field(default=True, description="Whether rule is active")
+    age_brackets: Set[AgeBracket] = Field(
+        default_factory=set, description="Brackets the rule applies to (all if empty)"
+    )
+
+    def applies_to(self, bracket: Optional[AgeBracket]) -> bool:
+        """Return True if the rule is part of a bracket's profile (None: every bracket)."""
+        return bracket is None or not self.age_brackets or bracket in self.age_brackets
 
 
 class FilterResult(BaseModel):
@@ -61,41 +197,238 @@ class ContentFilter:
     """
     Main content filtering engine.
 
+    All enabled rules are compiled into a single CompiledRuleSet so that each
+    piece of content is scanned once regardless of how many rules are active.
+    The compiled set is rebuilt lazily after add_rule() / remove_rule().
+
+    Each age bracket has its own profile: a compiled set of only the rules
+    applying to that bracket, picked per call from ``context["age"]``. Content
+    without an age is checked against every rule. Profiles reference the same
+    FilterRule objects and share compiled patterns, so rule data is not
+    duplicated per bracket.
+
+    With a normalizer, normalized keywords are matched on the normalized
+    content and patterns on both the original and the normalized content;
+    reported spans always refer to the original content, so SANITIZE masks
+    the evasive spelling itself.
+
     TODO: Implement:
-    - filter() method to evaluate content against all rules
-    - add_rule() / remove_rule() for dynamic rule management
     - Integration with external APIs (OpenAI moderation, etc.)
-    - Age-based filter profiles
     - Machine learning-based content classification
     """
 
-    def __init__(self, rules: Optional[List[FilterRule]] = None) -> None:
-        """Initialize content filter with optional rules."""
+    def __init__(
+        self,
+        rules: Optional[List[FilterRule]] = None,
+        normalizer: Optional[TextNormalizer] = None,
+        mask_style: MaskStyle = MaskStyle.FIXED,
+    ) -> None:
+        """
+        Initialize content filter.
+
+        Args:
+            rules: Filter rules
+            normalizer: Normalizer applied to keywords and content (none if None)
+            mask_style: How SANITIZE masks matched text
+        """
         self.rules = rules or []
+        self.normalizer = normalizer
+        self.mask_style = mask_style
+        self._version = next(_versions)
+        self._profiles: Dict[Optional[AgeBracket], CompiledRuleSet] = {}
+        self._patterns: Dict[str, re.Pattern[str]] = {}
+
+    @property
+    def version(self) -> int:
+        """Rule-set version, unique across filters and changed whenever the rules change."""
+        return self._version
+
+    def invalidate(self) -> None:
+        """
+        Mark the compiled rule set as stale.
+
+        add_rule() and remove_rule() call this automatically; call it after
+        mutating rules in place (e.g. toggling FilterRule.enabled).
+        """
+        self._version = next(_versions)
+        self._profiles = {}
+
+    def compiled(self, bracket: Optional[AgeBracket] = None) -> CompiledRuleSet:
+        """
+        Return a compiled profile, building it if the rules changed.
+
+        Args:
+            bracket: Age bracket; None compiles every rule
+
+        Returns:
+            Compiled set of the rules applying to the bracket
+        """
+        profile = self._profiles.get(bracket)
+        if profile is None:
+            rules = [rule for rule in self.rules if rule.applies_to(bracket)]
+            profile = self._profiles[bracket] = CompiledRuleSet(
+                rules, self._patterns, self.normalizer
+            )
+        return profile
+
+    def profile(self, context: Optional[Dict[str, Any]] = None) -> CompiledRuleSet:
+        """
+        Return the compiled profile for an evaluation context.
+
+        Args:
+            context: Evaluation context; its "age" selects the bracket
+
+        Returns:
+            The age bracket's profile, or every rule if the age is unknown
+        """
+        age = context.get("age") if context else None
+        if age is None:
+            return self.compiled()
+        return self.compiled(AgeBracket.for_age(int(age)))
+
+    def scan(self, content: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, List[Span]]:
+        """
+        Return every matching rule with the spans it matched.
+
+        Args:
+            content: Content to scan
+            context: Evaluation context selecting the age profile
+
+        Returns:
+            Mapping of rule name to matched (start, end) spans
+        """
+        return self.profile(context).scan(content)
 
     def filter(self, content: str, context: Optional[Dict[str, Any]] = None) -> FilterResult:
         """
         Filter content against configured rules.
 
-        TODO: Implement filtering logic
-        - Evaluate content against all enabled rules
-        - Apply keyword and pattern matching
-        - Determine highest-priority action
-        - Sanitize content if needed
+        Content is scanned once against the profile of the user's age
+        bracket. When several rules match, the most restrictive action wins
+        (BLOCK > SANITIZE > WARN > LOG_ONLY).
 
         Args:
             content: Content to filter
-            context: Additional context for filtering
+            context: Additional context for filtering ("age" selects the profile)
 
         Returns:
             FilterResult with filtering decision and details
         """
-        raise NotImplementedError("Content filtering not yet implemented")
+        compiled = self.profile(context)
+        hits = compiled.scan(content)
+        if not hits:
+            return FilterResult(passed=True)
+        return self._build_result(content, compiled, hits)
+
+    def filter_batch(
+        self,
+        contents: Iterable[str],
+        workers: Optional[int] = None,
+        context: Optional[Dict[str, Any]] = None,
+        chunksize: int = 256,
+    ) -> Generator[FilterResult, None, None]:
+        """
+        Filter a stream of contents, optionally fanned out to worker processes.
+
+        Inputs are consumed lazily in chunks of ``chunksize`` and at most two
+        chunks per worker are in flight, so arbitrarily large iterables can be
+        processed in bounded memory. The filter (with its compiled rule set) is
+        shipped to each worker once, when the worker starts.
+
+        Args:
+            contents: Contents to filter
+            workers: Number of worker processes; None or 1 filters in-process
+            context: Context applied to every item
+            chunksize: Items sent to a worker per dispatch
+
+        Yields:
+            One FilterResult per input, in input order
+        """
+        if not workers or workers <= 1:
+            for content in contents:
+                yield self.filter(content, context)
+            return
+
+        self.profile(context)
+        iterator = iter(contents)
+        pending: Deque[Future[List[FilterResult]]] = deque()
+        pool = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_batch_worker, initargs=(self,)
+        )
+        try:
+            while True:
+                chunk = list(islice(iterator, chunksize))
+                if not chunk:
+                    break
+                pending.append(pool.submit(_filter_batch_chunk, chunk, context))
+                if len(pending) >= workers * 2:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _build_result(
+        self, content: str, compiled: CompiledRuleSet, hits: Dict[str, List[Span]]
+    ) -> FilterResult:
+        matched = [rule for rule in compiled.rules if rule.name in hits]
+        action = max((rule.action for rule in matched), key=ACTION_PRECEDENCE.__getitem__)
+
+        sanitized_content = None
+        if action == FilterAction.SANITIZE:
+            spans = [
+                span
+                for rule in matched
+                if rule.action == FilterAction.SANITIZE
+                for span in hits[rule.name]
+            ]
+            sanitized_content = mask_spans(content, spans, self.mask_style)
+
+        return FilterResult(
+            passed=action != FilterAction.BLOCK,
+            action=action,
+            matched_rules=[rule.name for rule in matched],
+            sanitized_content=sanitized_content,
+            metadata={"categories": sorted({rule.category.value for rule in matched})},
+        )
 
     def add_rule(self, rule: FilterRule) -> None:
-        """Add a new filter rule."""
-        raise NotImplementedError("Add rule not yet implemented")
+        """
+        Add a new filter rule.
+
+        Raises:
+            ValueError: If a rule with the same name already exists
+        """
+        if any(existing.name == rule.name for existing in self.rules):
+            raise ValueError(f"Filter rule already exists: {rule.name}")
+        self.rules.append(rule)
+        self.invalidate()
 
     def remove_rule(self, rule_name: str) -> None:
-        """Remove a filter rule by name."""
-        raise NotImplementedError("Remove rule not yet implemented")
+        """
+        Remove a filter rule by name.
+
+        Raises:
+            KeyError: If no rule with that name exists
+        """
+        for index, rule in enumerate(self.rules):
+            if rule.name == rule_name:
+                del self.rules[index]
+                self.invalidate()
+                return
+        raise KeyError(rule_name)
+
+
+# Filter installed in each batch worker process by _init_batch_worker().
+_batch_filter: Optional[ContentFilter] = None
+
+
+def _init_batch_worker(content_filter: ContentFilter) -> None:
+    global _batch_filter
+    _batch_filter = content_filter
+
+
+def _filter_batch_chunk(chunk: List[str], context: Optional[Dict[str, Any]]) -> List[FilterResult]:
+    if _batch_filter is None:
+        raise RuntimeError("Batch worker was not initialized")
+    return [_batch_filter.filter(content, context) for content in chunk]
@@ -0,0 +1,287 @@
+"""
+Compiled Matcher - Single-pass multi-rule matching for the content filter.
+
+All enabled filter rules are merged into one compiled rule set:
+- Keywords from every rule share a single Aho-Corasick automaton
+- Regex patterns from every rule share a single combined alternation
+
+Scanning a piece of text walks it once through the automaton and once through
+the combined regex, and reports every rule that matched together with the
+spans it matched. Most text matches no pattern and is done after that single
+regex pass; text that does is rescanned pattern by pattern, so matches that
+overlap or are shadowed by an earlier alternative are all reported.
+
+Wrapping patterns in the alternation shifts their group numbers, so patterns
+with numeric backreferences or group conditionals are left out of it and
+always run on their own.
+
+With a TextNormalizer, keywords are normalized when compiled and matched
+against the normalized text; patterns run on both the original and the
+normalized text.
+"""
+
+import re
+from collections import deque
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from parent_ai_safety.core.filter import FilterRule
+    from parent_ai_safety.core.normalize import NormalizedText, TextNormalizer
+
+Span = Tuple[int, int]
+
+# Numeric backreferences (\1, \g<1>) and group conditionals ((?(1)...)),
+# not preceded by an escaped backslash.
+_NUMBERED_GROUP_REF = re.compile(r"(?<!\\)(?:\\\\)*\\(?:[1-9]|g<\d+>)|\(\?\(\d+\)")
+
+
+def _is_word_char(char: str) -> bool:
+    """Return True if char would be part of a ``\\w`` word."""
+    return char.isalnum() or char == "_"
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over a fixed set of keywords.
+
+    Keywords are matched case-insensitively. Matches are reported only on word
+    boundaries, so "bad" does not match inside "badminton".
+    """
+
+    def __init__(self, keywords: Iterable[str]) -> None:
+        """
+        Build the automaton.
+
+        Args:
+            keywords: Keywords to match; duplicates and empty strings are ignored
+        """
+        self.keywords: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        index: Dict[str, int] = {}
+        for keyword in keywords:
+            key = keyword.lower()
+            if not key or key in index:
+                continue
+            index[key] = len(self.keywords)
+            self.keywords.append(key)
+            self._insert(key, index[key])
+        self._build_failure_links()
+
+    def __len__(self) -> int:
+        """Return the number of distinct keywords in the automaton."""
+        return len(self.keywords)
+
+    @property
+    def max_length(self) -> int:
+        """Length of the longest keyword."""
+        return max((len(keyword) for keyword in self.keywords), default=0)
+
+    def _insert(self, keyword: str, keyword_id: int) -> None:
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(keyword_id)
+
+    def _build_failure_links(self) -> None:
+        queue: deque[int] = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state].extend(self._output[self._fail[next_state]])
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """
+        Yield every keyword occurrence in text.
+
+        Args:
+            text: Text to scan
+
+        Yields:
+            (start, end, keyword_id) tuples in order of their end offset
+        """
+        if not self.keywords:
+            return
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            # A few characters lowercase to more than one code point; keep
+            # offsets aligned with the original text.
+            lowered = "".join(char.lower()[:1] for char in text)
+
+        goto, fail, output, keywords = self._goto, self._fail, self._output, self.keywords
+        length = len(text)
+        state = 0
+        for position, char in enumerate(lowered):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not output[state]:
+                continue
+            end = position + 1
+            for keyword_id in output[state]:
+                start = end - len(keywords[keyword_id])
+                if start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if end < length and _is_word_char(text[end]):
+                    continue
+                yield start, end, keyword_id
+
+
+class CompiledRuleSet:
+    """
+    Immutable, compiled view of a set of filter rules.
+
+    Only enabled rules are compiled. Instances are picklable, so a compiled rule
+    set can be shipped to worker processes once and reused for many scans.
+    """
+
+    def __init__(
+        self,
+        rules: Sequence["FilterRule"],
+        pattern_cache: Optional[Dict[str, "re.Pattern[str]"]] = None,
+        normalizer: Optional["TextNormalizer"] = None,
+    ) -> None:
+        """
+        Compile the given rules.
+
+        Args:
+            rules: Filter rules to compile; disabled rules are skipped
+            pattern_cache: Compiled patterns shared with other rule sets built
+                from the same rules; filled with any pattern it lacks
+            normalizer: Normalizer applied to keywords here and to text in scan()
+        """
+        if pattern_cache is None:
+            pattern_cache = {}
+        self.rules: Tuple[FilterRule, ...] = tuple(rule for rule in rules if rule.enabled)
+        self.normalizer = normalizer
+
+        keyword_rules: Dict[str, List[str]] = {}
+        for rule in self.rules:
+            for keyword in rule.keywords:
+                key = normalizer.normalize(keyword).text if normalizer else keyword.lower()
+                names = keyword_rules.setdefault(key, [])
+                if rule.name not in names:
+                    names.append(rule.name)
+        self._automaton = KeywordAutomaton(keyword_rules)
+        self._keyword_rules: List[List[str]] = [
+            keyword_rules[keyword] for keyword in self._automaton.keywords
+        ]
+
+        self._pattern_rules: List[str] = []
+        self._patterns: List[re.Pattern[str]] = []
+        for rule in self.rules:
+            for pattern in rule.patterns:
+                self._pattern_rules.append(rule.name)
+                compiled = pattern_cache.get(pattern)
+                if compiled is None:
+                    compiled = pattern_cache[pattern] = re.compile(pattern, re.IGNORECASE)
+                self._patterns.append(compiled)
+        self._combined, self._separate = self._combine(self._patterns)
+
+    @property
+    def max_keyword_length(self) -> int:
+        """Length of the longest compiled keyword."""
+        return self._automaton.max_length
+
+    @staticmethod
+    def _combine(
+        patterns: List["re.Pattern[str]"],
+    ) -> Tuple[Optional["re.Pattern[str]"], List[int]]:
+        """
+        Merge patterns into one alternation of named groups ``_p<index>``.
+
+        Returns:
+            The alternation (None if nothing could be merged) and the indices
+            of the patterns that must be scanned separately
+        """
+        merged: List[int] = []
+        separate: List[int] = []
+        for index, pattern in enumerate(patterns):
+            if _NUMBERED_GROUP_REF.search(pattern.pattern):
+                separate.append(index)
+            else:
+                merged.append(index)
+        if not merged:
+            return None, separate
+        alternation = "|".join(f"(?P<_p{index}>{patterns[index].pattern})" for index in merged)
+        try:
+            return re.compile(alternation, re.IGNORECASE), separate
+        except re.error:
+            # Patterns with clashing group names or global inline flags cannot be
+            # merged; scan() falls back to evaluating them one by one.
+            return None, list(range(len(patterns)))
+
+    def scan(
+        self, text: str, normalized: Optional["NormalizedText"] = None
+    ) -> Dict[str, List[Span]]:
+        """
+        Scan text once and report every matching rule.
+
+        With a normalizer, keywords are matched on the normalized text (and
+        its collapsed form) and their spans mapped back to the original.
+        Patterns run on the original text, so they keep their exact meaning,
+        and also on the normalized text to catch evasions.
+
+        Keyword spans are complete, and so are pattern spans: every pattern
+        reports all of its own non-overlapping matches.
+
+        Args:
+            text: Text to scan
+            normalized: Normalized form of text, if already computed
+
+        Returns:
+            Mapping of matched rule name to the spans it matched
+        """
+        if normalized is None and self.normalizer is not None:
+            normalized = self.normalizer.normalize(text)
+        hits: Dict[str, List[Span]] = {}
+        if normalized is None:
+            for start, end, keyword_id in self._automaton.iter_matches(text):
+                for rule_name in self._keyword_rules[keyword_id]:
+                    hits.setdefault(rule_name, []).append((start, end))
+        else:
+            for form in normalized.forms():
+                for start, end, keyword_id in self._automaton.iter_matches(form.text):
+                    span = form.to_original((start, end))
+                    for rule_name in self._keyword_rules[keyword_id]:
+                        hits.setdefault(rule_name, []).append(span)
+
+        if self._patterns:
+            self._scan_patterns(text, hits)
+            if normalized is not None and normalized.text != text:
+                evasions: Dict[str, List[Span]] = {}
+                self._scan_patterns(normalized.text, evasions)
+                for rule_name, spans in evasions.items():
+                    hits.setdefault(rule_name, []).extend(
+                        normalized.to_original(span) for span in spans
+                    )
+        if normalized is not None:
+            # Several forms of the text may report the same span.
+            for rule_name, spans in hits.items():
+                hits[rule_name] = sorted(set(spans))
+        return hits
+
+    def _scan_patterns(self, text: str, hits: Dict[str, List[Span]]) -> None:
+        """Add the pattern spans found in text to hits."""
+        indices: Iterable[int] = range(len(self._patterns))
+        if self._combined is not None and not self._combined.search(text):
+            indices = self._separate
+        for index in indices:
+            for match in self._patterns[index].finditer(text):
+                if match.start() != match.end():
+                    hits.setdefault(self._pattern_rules[index], []).append(match.span())
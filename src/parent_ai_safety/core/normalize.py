@@ -0,0 +1,287 @@
+"""
+Text Normalization - Undo common keyword-filter evasions before matching.
+
+Children and adversarial prompts dodge keyword lists with tricks such as
+"b@d", "bаd" (Cyrillic a), "b<U+200B>ad" (zero-width space), "baaaad" or
+"b a d". TextNormalizer folds all of these to "bad":
+
+- Unicode NFKC (full-width and stylized letters, ligatures)
+- Zero-width characters and combining marks are dropped
+- Confusable letters from other scripts map to their Latin look-alike
+- Leet symbols (0, 1, 3, 4, 5, 7, @, $) map to letters inside words that
+  also contain a letter, so numbers such as "route 66" stay intact
+- Runs of three or more identical letters collapse to two, so legitimate
+  double letters ("kill", "cool") survive; when a text has such runs, a
+  second form with them collapsed to one letter is kept as well ("baaaad"
+  is both "baad" and "bad")
+- Three or more single letters separated by single spaces or dots are joined
+
+Per-character mappings come from a table precomputed for ASCII and memoized
+for every other character, so normalization is a few linear passes without
+regular expressions. The result keeps, for every normalized character, the
+span of original text it came from, so matches can be mapped back.
+
+Keywords must go through the same normalizer as the text they are matched
+against (CompiledRuleSet does this), otherwise folding one side only turns
+evasion handling into false negatives ("covid19" would never match).
+"""
+
+import unicodedata
+from typing import Dict, List, Optional, Set, Tuple
+
+Span = Tuple[int, int]
+
+ZERO_WIDTH = frozenset(
+    "\u00ad\u034f\u180e\u200b\u200c\u200d\u200e\u200f\u2060\u2061\u2062\u2063\ufeff"
+)
+
+# Letters from other scripts that render like Latin letters.
+CONFUSABLES: Dict[str, str] = {
+    # Cyrillic
+    "а": "a",
+    "в": "b",
+    "е": "e",
+    "ё": "e",
+    "к": "k",
+    "м": "m",
+    "н": "h",
+    "о": "o",
+    "р": "p",
+    "с": "c",
+    "т": "t",
+    "у": "y",
+    "х": "x",
+    "і": "i",
+    "ї": "i",
+    "ј": "j",
+    "ѕ": "s",
+    "ԁ": "d",
+    "ɡ": "g",
+    # Greek
+    "α": "a",
+    "β": "b",
+    "ε": "e",
+    "η": "n",
+    "ι": "i",
+    "κ": "k",
+    "ν": "v",
+    "ο": "o",
+    "ρ": "p",
+    "τ": "t",
+    "υ": "u",
+    "χ": "x",
+    # Latin variants NFKC keeps
+    "ı": "i",
+    "ł": "l",
+    "ø": "o",
+    "đ": "d",
+    "ß": "ss",
+}
+
+LEET: Dict[str, str] = {
+    "0": "o",
+    "1": "i",
+    "3": "e",
+    "4": "a",
+    "5": "s",
+    "7": "t",
+    "@": "a",
+    "$": "s",
+}
+
+# Separators that may split spaced-out letters ("b a d", "b.a.d").
+SPACERS = frozenset(" .-_*")
+
+# Runs of identical letters at least this long are collapsed.
+MIN_RUN = 3
+
+
+class NormalizedText:
+    """Normalized text with the original span of every character."""
+
+    __slots__ = ("original", "text", "starts", "ends", "collapsed")
+
+    def __init__(
+        self,
+        original: str,
+        text: str,
+        starts: List[int],
+        ends: List[int],
+        collapsed: Optional["NormalizedText"] = None,
+    ) -> None:
+        """
+        Initialize normalized text.
+
+        Args:
+            original: Text before normalization
+            text: Normalized text
+            starts: Original start offset of each normalized character
+            ends: Original end offset of each normalized character
+            collapsed: Same text with letter runs collapsed to one letter, if
+                it had runs of three or more
+        """
+        self.original = original
+        self.text = text
+        self.starts = starts
+        self.ends = ends
+        self.collapsed = collapsed
+
+    def forms(self) -> List["NormalizedText"]:
+        """Return this text and its collapsed form, if any."""
+        return [self] if self.collapsed is None else [self, self.collapsed]
+
+    def to_original(self, span: Span) -> Span:
+        """
+        Map a non-empty span of the normalized text back to the original text.
+
+        Args:
+            span: (start, end) offsets into the normalized text
+
+        Returns:
+            Smallest original span covering every character in the span
+        """
+        start, end = span
+        return self.starts[start], self.ends[end - 1]
+
+
+class TextNormalizer:
+    """
+    Folds evasive spellings to the plain lowercase text keyword rules expect.
+
+    Instances are cheap to share: the only state is the memoized character
+    table, which only grows with distinct characters seen.
+    """
+
+    def __init__(self) -> None:
+        """Initialize normalizer with the ASCII part of the character table."""
+        self._table: Dict[str, str] = {chr(code): chr(code).lower() for code in range(128)}
+
+    def normalize(self, text: str) -> NormalizedText:
+        """
+        Normalize text.
+
+        Args:
+            text: Text to normalize
+
+        Returns:
+            Normalized text with its offset map
+        """
+        chars, starts, ends = self._map_chars(text)
+        chars, starts, ends = self._fold_words(chars, starts, ends)
+        collapsed: Optional[NormalizedText] = None
+        if self._has_run(chars):
+            single = self._collapse_runs(chars, starts, ends, keep=1)
+            collapsed = NormalizedText(text, "".join(single[0]), single[1], single[2])
+            chars, starts, ends = self._collapse_runs(chars, starts, ends, keep=2)
+        return NormalizedText(text, "".join(chars), starts, ends, collapsed)
+
+    def _char(self, char: str) -> str:
+        """Return the mapping of a single character, memoizing it."""
+        mapped = self._table.get(char)
+        if mapped is None:
+            mapped = "".join(
+                CONFUSABLES.get(part, part)
+                for part in unicodedata.normalize("NFKC", char).lower()
+                if part not in ZERO_WIDTH and not unicodedata.combining(part)
+            )
+            self._table[char] = mapped
+        return mapped
+
+    def _map_chars(self, text: str) -> Tuple[List[str], List[int], List[int]]:
+        chars: List[str] = []
+        starts: List[int] = []
+        ends: List[int] = []
+        for index, char in enumerate(text):
+            for part in self._char(char):
+                chars.append(part)
+                starts.append(index)
+                ends.append(index + 1)
+        return chars, starts, ends
+
+    @staticmethod
+    def _fold_words(
+        chars: List[str], starts: List[int], ends: List[int]
+    ) -> Tuple[List[str], List[int], List[int]]:
+        """Apply leet mapping per word and join spaced-out single letters."""
+        # Split into words (runs of letters, digits and leet symbols).
+        words: List[Tuple[int, int]] = []
+        length = len(chars)
+        position = 0
+        while position < length:
+            if chars[position].isalnum() or chars[position] in LEET:
+                end = position + 1
+                while end < length and (chars[end].isalnum() or chars[end] in LEET):
+                    end += 1
+                words.append((position, end))
+                position = end
+            else:
+                position += 1
+
+        for start, end in words:
+            if any(chars[index].isalpha() for index in range(start, end)):
+                for index in range(start, end):
+                    chars[index] = LEET.get(chars[index], chars[index])
+
+        # Indices of separators between spaced-out letters, to be dropped.
+        dropped: Set[int] = set()
+        run_start = 0
+        for index in range(1, len(words) + 1):
+            if (
+                index < len(words)
+                and words[index][1] - words[index][0] == 1
+                and words[index - 1][1] - words[index - 1][0] == 1
+                and words[index][0] - words[index - 1][1] == 1
+                and chars[words[index][0] - 1] in SPACERS
+                and chars[words[index][0]].isalpha()
+                and chars[words[index - 1][0]].isalpha()
+            ):
+                continue
+            if index - run_start >= 3:
+                dropped.update(words[member][0] - 1 for member in range(run_start + 1, index))
+            run_start = index
+        if not dropped:
+            return chars, starts, ends
+        keep = [index for index in range(length) if index not in dropped]
+        return (
+            [chars[index] for index in keep],
+            [starts[index] for index in keep],
+            [ends[index] for index in keep],
+        )
+
+    @staticmethod
+    def _has_run(chars: List[str]) -> bool:
+        """Return True if chars contain MIN_RUN identical letters in a row."""
+        run = 1
+        for index in range(1, len(chars)):
+            run = run + 1 if chars[index] == chars[index - 1] else 1
+            if run >= MIN_RUN and chars[index].isalpha():
+                return True
+        return False
+
+    @staticmethod
+    def _collapse_runs(
+        chars: List[str], starts: List[int], ends: List[int], keep: int
+    ) -> Tuple[List[str], List[int], List[int]]:
+        """Collapse runs of MIN_RUN or more identical letters to ``keep`` letters."""
+        out_chars: List[str] = []
+        out_starts: List[int] = []
+        out_ends: List[int] = []
+        length = len(chars)
+        position = 0
+        while position < length:
+            char = chars[position]
+            end = position + 1
+            while end < length and chars[end] == char:
+                end += 1
+            if end - position >= MIN_RUN and char.isalpha():
+                # The last kept letter stands for the rest of the run.
+                out_chars.extend(char * keep)
+                out_starts.extend(starts[position : position + keep])
+                out_ends.extend(ends[position : position + keep - 1])
+                out_ends.append(ends[end - 1])
+            else:
+                out_chars.extend(chars[position:end])
+                out_starts.extend(starts[position:end])
+                out_ends.extend(ends[position:end])
+            position = end
+        return out_chars, out_starts, out_ends
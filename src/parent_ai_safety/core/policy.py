@@ -1,18 +1,47 @@
 """
 Safety Policy Engine - Defines and enforces safety rules and boundaries.
 
+Rule conditions are a dict of optional keys. A rule applies when every
+condition it defines holds:
+- "keywords": list of words; content contains any of them (case-insensitive)
+- "patterns": list of regexes; any of them matches the content
+- "min_length" / "max_length": bounds on len(content)
+- "min_age" / "max_age": bounds on context["age"]
+- "action": "block" (default) or "allow", the decision when the rule applies
+
+The highest-priority applicable rule decides; on equal priority "block" wins.
+Content no rule applies to is allowed.
+
+Rules are compiled into an immutable PolicyPlan: conditions are validated and
+their regexes compiled once, rules are sorted by priority, and rules that can
+never change the outcome are dropped. The plan is cached on the policy until
+its version changes.
+
+Policies compose with merge(): a more specific policy (e.g. a child's)
+overrides a more general one (e.g. the family's) rule by rule. PolicyRegistry
+(core/policy_registry.py) maintains merged effective policies for a whole
+hierarchy.
+
 TODO: Implement the following functionality:
-- Safety rule definitions and validation
 - Configurable safety levels (strict, moderate, permissive)
-- Policy enforcement mechanisms
-- Rule conflict resolution
-- Policy inheritance and composition
 """
 
+import re
+import weakref
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from itertools import count
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Pattern, Tuple
+
+from pydantic import BaseModel, Field, PrivateAttr
 
-from pydantic import BaseModel, Field
+CONDITION_KEYS = frozenset(
+    {"keywords", "patterns", "min_length", "max_length", "min_age", "max_age", "action"}
+)
+ACTIONS = ("block", "allow")
+
+# Policy versions come from one process-wide counter, so no two policies ever
+# share a version and decisions cached for one never answer for another.
+_versions = count(1)
 
 
 class SafetyLevel(str, Enum):
@@ -33,15 +62,203 @@ class SafetyRule(BaseModel):
     priority: int = Field(default=0, description="Rule priority (higher = more important)")
     conditions: Dict[str, Any] = Field(default_factory=dict, description="Rule conditions")
 
+    # Policies holding this rule, notified when one of its fields is assigned.
+    _owners: List["weakref.ReferenceType[SafetyPolicy]"] = PrivateAttr(default_factory=list)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Set a field and invalidate the policies holding this rule."""
+        super().__setattr__(name, value)
+        if name.startswith("_"):
+            return
+        for ref in list(self._owners):
+            policy = ref()
+            if policy is None:
+                self._owners.remove(ref)
+            elif any(rule is self for rule in policy.rules):
+                policy.invalidate()
+
+    def __deepcopy__(self, memo: Optional[Dict[int, Any]] = None) -> "SafetyRule":
+        """Copy the rule; the copy belongs to no policy yet."""
+        copied = super().__deepcopy__(memo)
+        copied._owners = []
+        return copied
+
+    def _attach(self, policy: "SafetyPolicy") -> None:
+        """Register a policy to be invalidated when this rule is edited."""
+        if not any(ref() is policy for ref in self._owners):
+            self._owners.append(weakref.ref(policy))
+
+
+class PolicyStep:
+    """One compiled rule: its decision and its validated conditions (None if absent)."""
+
+    __slots__ = (
+        "name",
+        "allow",
+        "keywords",
+        "patterns",
+        "min_length",
+        "max_length",
+        "min_age",
+        "max_age",
+    )
+
+    def __init__(self, rule: SafetyRule) -> None:
+        conditions = rule.conditions
+        unknown = set(conditions) - CONDITION_KEYS
+        if unknown:
+            raise ValueError(f"Safety rule {rule.name}: unknown conditions {sorted(unknown)}")
+        if conditions.get("action", "block") not in ACTIONS:
+            raise ValueError(f"Safety rule {rule.name}: action must be one of {ACTIONS}")
+        self.name = rule.name
+        self.allow: bool = conditions.get("action", "block") == "allow"
+
+        self.keywords: Optional[FrozenSet[str]] = None
+        if "keywords" in conditions:
+            self.keywords = frozenset(k.lower() for k in _string_list(rule, "keywords"))
+        self.patterns: Optional[Tuple[Pattern[str], ...]] = None
+        if "patterns" in conditions:
+            try:
+                self.patterns = tuple(
+                    re.compile(pattern, re.IGNORECASE) for pattern in _string_list(rule, "patterns")
+                )
+            except re.error as error:
+                raise ValueError(f"Safety rule {rule.name}: invalid pattern: {error}") from error
+
+        bounds: Dict[str, Optional[float]] = {}
+        for key in ("min_length", "max_length", "min_age", "max_age"):
+            value = conditions.get(key)
+            if value is not None and (
+                isinstance(value, bool) or not isinstance(value, (int, float))
+            ):
+                raise ValueError(f"Safety rule {rule.name}: {key} must be a number")
+            bounds[key] = value
+        for kind in ("length", "age"):
+            low, high = bounds[f"min_{kind}"], bounds[f"max_{kind}"]
+            if low is not None and high is not None and low > high:
+                raise ValueError(f"Safety rule {rule.name}: min_{kind} exceeds max_{kind}")
+        self.min_length = bounds["min_length"]
+        self.max_length = bounds["max_length"]
+        self.min_age = bounds["min_age"]
+        self.max_age = bounds["max_age"]
+
+    @property
+    def unconditional(self) -> bool:
+        """Whether the rule applies to all content."""
+        return all(
+            value is None
+            for value in (
+                self.keywords,
+                self.patterns,
+                self.min_length,
+                self.max_length,
+                self.min_age,
+                self.max_age,
+            )
+        )
+
+
+class PolicyPlan:
+    """
+    Immutable evaluation plan of a policy's enabled rules.
+
+    Steps are ordered by priority (block before allow on ties). A rule
+    without conditions always decides, so the steps after it are dropped;
+    trailing allow rules are dropped too since the default is allow.
+
+    Steps are evaluated lazily: each step checks its cheap conditions
+    (length, age) first, then its keywords, then its patterns, and evaluation
+    stops at the first step that applies. Keyword results are shared between
+    the steps of one evaluation.
+    """
+
+    __slots__ = ("steps",)
+
+    def __init__(self, rules: Iterable[SafetyRule]) -> None:
+        """
+        Compile rules into a plan.
+
+        Args:
+            rules: Rules to compile; disabled rules are skipped
+
+        Raises:
+            ValueError: If a rule has invalid conditions
+        """
+        ordered = sorted(
+            (rule for rule in rules if rule.enabled),
+            key=lambda rule: (-rule.priority, rule.conditions.get("action", "block") != "block"),
+        )
+        steps: List[PolicyStep] = []
+        for rule in ordered:
+            steps.append(PolicyStep(rule))
+            if steps[-1].unconditional:
+                break
+        while steps and steps[-1].allow:
+            steps.pop()
+        self.steps: Tuple[PolicyStep, ...] = tuple(steps)
+
+    def evaluate(self, content: str, context: Dict[str, Any], length: Optional[int] = None) -> bool:
+        """
+        Return True if content passes the plan.
+
+        Args:
+            content: Content to evaluate
+            context: Evaluation context (age, ...)
+            length: Length for length conditions (len(content) if None)
+
+        Returns:
+            Decision of the first applicable step, or True if none applies
+        """
+        if length is None:
+            length = len(content)
+        age = context.get("age")
+        lowered: Optional[str] = None
+        found: Dict[str, bool] = {}
+        for step in self.steps:
+            if step.min_length is not None and length < step.min_length:
+                continue
+            if step.max_length is not None and length > step.max_length:
+                continue
+            if step.min_age is not None or step.max_age is not None:
+                if age is None:
+                    continue
+                if step.min_age is not None and age < step.min_age:
+                    continue
+                if step.max_age is not None and age > step.max_age:
+                    continue
+            if step.keywords is not None:
+                if lowered is None:
+                    lowered = content.lower()
+                matched = False
+                for keyword in step.keywords:
+                    present = found.get(keyword)
+                    if present is None:
+                        present = found[keyword] = keyword in lowered
+                    if present:
+                        matched = True
+                        break
+                if not matched:
+                    continue
+            if step.patterns is not None and not any(
+                pattern.search(content) for pattern in step.patterns
+            ):
+                continue
+            return step.allow
+        return True
+
+
+def _string_list(rule: SafetyRule, key: str) -> List[str]:
+    values = rule.conditions[key]
+    if isinstance(values, str) or not all(isinstance(value, str) for value in values):
+        raise ValueError(f"Safety rule {rule.name}: {key} must be a list of strings")
+    return list(values)
+
 
 class SafetyPolicy(BaseModel):
     """
     Main safety policy configuration.
 
     TODO: Implement:
-    - validate() method to check policy consistency
-    - enforce() method to apply policy to content/actions
-    - merge() method to combine multiple policies
     - export()/import() methods for policy persistence
     """
 
@@ -50,31 +267,155 @@ class SafetyPolicy(BaseModel):
     rules: List[SafetyRule] = Field(default_factory=list, description="List of safety rules")
     metadata: Dict[str, Any] = Field(default_factory=dict, description="Additional metadata")
 
+    _version: int = PrivateAttr(default_factory=lambda: next(_versions))
+    _plan: Optional[PolicyPlan] = PrivateAttr(default=None)
+    _plan_version: int = PrivateAttr(default=-1)
+
+    def model_post_init(self, __context: Any) -> None:
+        """Register the policy with its rules so that rule edits invalidate it."""
+        self._attach_rules()
+
+    def __deepcopy__(self, memo: Optional[Dict[int, Any]] = None) -> "SafetyPolicy":
+        """Copy the policy and register the copy with its copied rules."""
+        copied = super().__deepcopy__(memo)
+        copied._attach_rules()
+        return copied
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Set a field and bump the policy version."""
+        super().__setattr__(name, value)
+        if not name.startswith("_"):
+            self.invalidate()
+            if name == "rules":
+                self._attach_rules()
+
+    @property
+    def version(self) -> int:
+        """Policy version, unique across policies; changes with the policy or its rules."""
+        return self._version
+
+    def invalidate(self) -> None:
+        """
+        Give the policy a new version.
+
+        Field assignment on the policy or its rules, add_rule() and
+        remove_rule() do this automatically; call it after mutating the rule
+        list or a rule's conditions in place.
+        """
+        self._version = next(_versions)
+
+    def add_rule(self, rule: SafetyRule) -> None:
+        """
+        Add a safety rule.
+
+        Raises:
+            ValueError: If a rule with the same name already exists
+        """
+        if any(existing.name == rule.name for existing in self.rules):
+            raise ValueError(f"Safety rule already exists: {rule.name}")
+        self.rules.append(rule)
+        rule._attach(self)
+        self.invalidate()
+
+    def remove_rule(self, rule_name: str) -> None:
+        """
+        Remove a safety rule by name.
+
+        Raises:
+            KeyError: If no rule with that name exists
+        """
+        for index, rule in enumerate(self.rules):
+            if rule.name == rule_name:
+                del self.rules[index]
+                self.invalidate()
+                return
+        raise KeyError(rule_name)
+
+    def merge(self, override: "SafetyPolicy") -> "SafetyPolicy":
+        """
+        Combine this policy with a more specific one.
+
+        Rules of the override replace inherited rules with the same name (an
+        override can disable an inherited rule by redefining it with
+        enabled=False); other rules of both policies are kept. The override's
+        name and level win, and metadata keys of the override take precedence.
+        Rules are copied, so the result is independent of both inputs.
+
+        Args:
+            override: More specific policy
+
+        Returns:
+            Merged policy
+        """
+        overridden = {rule.name for rule in override.rules}
+        rules = [rule for rule in self.rules if rule.name not in overridden]
+        rules += override.rules
+        return SafetyPolicy(
+            name=override.name,
+            level=override.level,
+            rules=[rule.model_copy(deep=True) for rule in rules],
+            metadata={**self.metadata, **override.metadata},
+        )
+
+    def compiled(self) -> PolicyPlan:
+        """
+        Return the evaluation plan, compiling it if the policy changed.
+
+        Raises:
+            ValueError: If a rule has invalid conditions
+        """
+        version = self.version
+        if self._plan is None or self._plan_version != version:
+            # Rules appended to the list in place are only seen here.
+            self._attach_rules()
+            self._plan = PolicyPlan(self.rules)
+            self._plan_version = version
+        return self._plan
+
+    def _attach_rules(self) -> None:
+        for rule in self.rules:
+            rule._attach(self)
+
     def validate(self) -> bool:
         """
-        Validate policy consistency and completeness.
+        Validate policy consistency.
+
+        Checks that rule names are unique and that every rule's conditions
+        are known, well-typed and consistent, and that its patterns compile.
+
+        Returns:
+            True if the policy is valid
 
-        TODO: Implement validation logic
-        - Check for rule conflicts
-        - Ensure required rules are present
-        - Validate rule conditions
+        Raises:
+            ValueError: Describing the first problem found
         """
-        raise NotImplementedError("Policy validation not yet implemented")
+        names = [rule.name for rule in self.rules]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Duplicate safety rules: {duplicates}")
+        for rule in self.rules:
+            PolicyStep(rule)
+        return True
 
-    def enforce(self, content: str, context: Optional[Dict[str, Any]] = None) -> bool:
+    def enforce(
+        self,
+        content: str,
+        context: Optional[Dict[str, Any]] = None,
+        length: Optional[int] = None,
+    ) -> bool:
         """
         Enforce policy against given content.
 
-        TODO: Implement enforcement logic
-        - Evaluate all enabled rules
-        - Apply priority-based rule resolution
-        - Return enforcement decision
+        Enabled rules are evaluated from highest to lowest priority and the
+        first applicable rule decides.
 
         Args:
             content: Content to evaluate
             context: Additional context for evaluation
+            length: Length for length conditions, e.g. the total length of a
+                streamed response content is a segment of (len(content) if None)
 
         Returns:
             True if content passes policy, False otherwise
         """
-        raise NotImplementedError("Policy enforcement not yet implemented")
+        return self.compiled().evaluate(content, context or {}, length)
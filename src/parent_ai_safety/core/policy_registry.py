@@ -0,0 +1,213 @@
+"""
+Policy Registry - Layered policies with cached effective policies.
+
+Households layer policies, e.g. platform default -> family policy -> per-child
+overrides. The registry stores these layers as a tree of named nodes and
+materializes each node's effective policy: its ancestors' policies merged
+with SafetyPolicy.merge(), most general first.
+
+Effective policies are cached per node and rebuilt only when the node's own
+policy or an ancestor's effective policy changed (detected through policy
+versions), so thousands of users assigned to one family node share a single
+merged policy and its compiled plan. A rebuilt effective policy is updated
+in place, so wrappers holding it see the change.
+"""
+
+import threading
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Set
+
+from parent_ai_safety.core.policy import SafetyPolicy
+
+# Base of root layers.
+_EMPTY_POLICY = SafetyPolicy(name="empty")
+
+
+class _Node:
+    """A policy layer, its place in the tree and its cached effective policy."""
+
+    __slots__ = (
+        "policy",
+        "parent",
+        "children",
+        "effective",
+        "policy_version",
+        "parent_generation",
+        "generation",
+    )
+
+    def __init__(self, policy: SafetyPolicy, parent: Optional[str]) -> None:
+        self.policy = policy
+        self.parent = parent
+        self.children: Set[str] = set()
+        self.effective: Optional[SafetyPolicy] = None
+        # Inputs the cached effective policy was built from.
+        self.policy_version = -1
+        self.parent_generation = -1
+        # Bumped whenever the effective policy is rebuilt.
+        self.generation = 0
+
+
+class PolicyRegistry:
+    """
+    Tree of policy layers with per-node effective policies.
+
+    Effective policies are shared and must be treated as read-only; change
+    a layer's own policy (in place or with update()) instead.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._nodes: Dict[str, _Node] = {}
+        self._assignments: Dict[str, str] = {}
+        self._lock = threading.RLock()
+        self.merges = 0
+
+    def add(self, node_id: str, policy: SafetyPolicy, parent: Optional[str] = None) -> None:
+        """
+        Add a policy layer.
+
+        Args:
+            node_id: Layer identifier
+            policy: The layer's own policy (rules it adds or overrides)
+            parent: Layer it inherits from; a root layer if None
+
+        Raises:
+            ValueError: If the layer already exists
+            KeyError: If the parent is unknown
+        """
+        with self._lock:
+            if node_id in self._nodes:
+                raise ValueError(f"Policy layer already exists: {node_id}")
+            if parent is not None:
+                self._nodes[parent].children.add(node_id)
+            self._nodes[node_id] = _Node(policy, parent)
+
+    def update(self, node_id: str, policy: SafetyPolicy) -> None:
+        """
+        Replace a layer's own policy.
+
+        Effective policies of the layer and its descendants are rebuilt on
+        their next access.
+
+        Raises:
+            KeyError: If the layer is unknown
+        """
+        with self._lock:
+            node = self._nodes[node_id]
+            node.policy = policy
+            # Versions of different policy objects are not comparable.
+            node.policy_version = -1
+
+    def remove(self, node_id: str) -> None:
+        """
+        Remove a leaf layer and its user assignments.
+
+        Raises:
+            KeyError: If the layer is unknown
+            ValueError: If other layers inherit from it
+        """
+        with self._lock:
+            node = self._nodes[node_id]
+            if node.children:
+                raise ValueError(f"Policy layer has dependents: {sorted(node.children)}")
+            if node.parent is not None:
+                self._nodes[node.parent].children.discard(node_id)
+            del self._nodes[node_id]
+            self._assignments = {
+                user: layer for user, layer in self._assignments.items() if layer != node_id
+            }
+
+    def assign(self, user_id: str, node_id: str) -> None:
+        """
+        Assign a user to a layer.
+
+        Raises:
+            KeyError: If the layer is unknown
+        """
+        with self._lock:
+            if node_id not in self._nodes:
+                raise KeyError(node_id)
+            self._assignments[user_id] = node_id
+
+    def policy_for(self, user_id: str) -> SafetyPolicy:
+        """
+        Return the effective policy of a user's layer.
+
+        Raises:
+            KeyError: If the user is not assigned to a layer
+        """
+        with self._lock:
+            return self.effective(self._assignments[user_id])
+
+    def effective(self, node_id: str) -> SafetyPolicy:
+        """
+        Return a layer's effective policy, rebuilding it if an input changed.
+
+        Args:
+            node_id: Layer identifier
+
+        Returns:
+            The layer's policy merged onto its ancestors' policies
+
+        Raises:
+            KeyError: If the layer is unknown
+        """
+        with self._lock:
+            node = self._nodes[node_id]
+            base = _EMPTY_POLICY
+            parent_generation = 0
+            if node.parent is not None:
+                base = self.effective(node.parent)
+                parent_generation = self._nodes[node.parent].generation
+            version = node.policy.version
+            if (
+                node.effective is not None
+                and node.policy_version == version
+                and node.parent_generation == parent_generation
+            ):
+                return node.effective
+
+            merged = base.merge(node.policy)
+            if node.effective is None:
+                node.effective = merged
+            else:
+                for field in ("name", "level", "rules", "metadata"):
+                    setattr(node.effective, field, getattr(merged, field))
+            node.policy_version = version
+            node.parent_generation = parent_generation
+            node.generation += 1
+            self.merges += 1
+            return node.effective
+
+    def dependents(self, node_id: str) -> List[str]:
+        """
+        Return every layer inheriting from a layer, parents before children.
+
+        Raises:
+            KeyError: If the layer is unknown
+        """
+        with self._lock:
+            return list(self._descendants(node_id))
+
+    def refresh(self, node_id: str) -> None:
+        """
+        Eagerly rebuild stale effective policies of a layer and its dependents.
+
+        Args:
+            node_id: Layer whose subtree to rebuild
+
+        Raises:
+            KeyError: If the layer is unknown
+        """
+        with self._lock:
+            self.effective(node_id)
+            for dependent in self._descendants(node_id):
+                self.effective(dependent)
+
+    def _descendants(self, node_id: str) -> Iterator[str]:
+        queue = deque(sorted(self._nodes[node_id].children))
+        while queue:
+            current = queue.popleft()
+            yield current
+            queue.extend(sorted(self._nodes[current].children))
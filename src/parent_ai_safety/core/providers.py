@@ -0,0 +1,606 @@
+"""
+AI Providers - Adapters sending screened prompts to AI APIs.
+
+Providers share a keep-alive ConnectionPool, so consecutive calls to the same
+host reuse open connections instead of paying a TCP (and TLS) handshake per
+call. Each provider bounds its concurrent calls and times calls out.
+
+ProviderRouter puts several providers behind one call: when the primary is
+slow, a hedged request goes to the next provider and the first acceptable
+answer wins; failed calls and answers rejected by the caller (e.g. blocked by
+the content filter) fall back to the next provider.
+
+MockProviderServer is a local server speaking the OpenAI chat completions
+format, for running the whole request path offline (tests, load tests).
+
+TODO: Implement the following functionality:
+- Streaming completions (server-sent events)
+- Retry budgets and circuit breaking per provider
+"""
+
+import asyncio
+import http.client
+import json
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from pydantic import BaseModel, Field
+
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_MAX_CONCURRENCY = 16
+DEFAULT_MAX_IDLE_PER_HOST = 16
+
+HostKey = Tuple[str, str, int]
+
+# Errors of a reused keep-alive connection the server had already closed.
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+
+class ProviderError(Exception):
+    """A provider call failed (connection error, HTTP error, timeout, bad response)."""
+
+
+class Completion(BaseModel):
+    """Answer of a provider to a prompt."""
+
+    text: str = Field(..., description="Completion text")
+    provider: str = Field(..., description="Name of the provider that answered")
+    latency_ms: float = Field(..., description="Time the provider took to answer")
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of keep-alive HTTP connections, per host.
+
+    Connections are checked out for one request and returned afterwards; at
+    most ``max_idle_per_host`` idle connections are kept per host. A request
+    on a reused connection that the server closed in the meantime is retried
+    once on a fresh connection.
+    """
+
+    def __init__(self, max_idle_per_host: int = DEFAULT_MAX_IDLE_PER_HOST) -> None:
+        """
+        Initialize connection pool.
+
+        Args:
+            max_idle_per_host: Idle connections kept per host (0 disables reuse)
+        """
+        self.max_idle_per_host = max_idle_per_host
+        self.connections_opened = 0
+        self._idle: Dict[HostKey, List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> Tuple[int, bytes]:
+        """
+        Send a request over a pooled connection (blocking).
+
+        Args:
+            method: HTTP method
+            url: Absolute http(s) URL
+            body: Request body
+            headers: Request headers
+            timeout: Socket timeout in seconds
+
+        Returns:
+            (status code, response body)
+
+        Raises:
+            OSError, http.client.HTTPException: If the request fails
+        """
+        parts = urlsplit(url)
+        scheme = parts.scheme or "http"
+        key = (
+            scheme,
+            parts.hostname or "localhost",
+            parts.port or (443 if scheme == "https" else 80),
+        )
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        while True:
+            connection, reused = self._acquire(key, timeout)
+            try:
+                connection.request(method, path, body=body, headers=headers or {})
+                response = connection.getresponse()
+                data = response.read()
+            except _STALE_CONNECTION_ERRORS:
+                connection.close()
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                connection.close()
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                self._release(key, connection)
+            return response.status, data
+
+    def close(self) -> None:
+        """Close every idle connection."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+    def _acquire(self, key: HostKey, timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            connections = self._idle.get(key)
+            if connections:
+                connection = connections.pop()
+                connection.timeout = timeout
+                if connection.sock is not None:
+                    connection.sock.settimeout(timeout)
+                return connection, True
+            self.connections_opened += 1
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=timeout), False
+        return http.client.HTTPConnection(host, port, timeout=timeout), False
+
+    def _release(self, key: HostKey, connection: http.client.HTTPConnection) -> None:
+        with self._lock:
+            connections = self._idle.setdefault(key, [])
+            if len(connections) < self.max_idle_per_host:
+                connections.append(connection)
+                return
+        connection.close()
+
+
+class Provider(ABC):
+    """
+    An AI completion API.
+
+    complete() enforces the provider's concurrency limit and timeout around
+    _complete(), which subclasses implement.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        """
+        Initialize provider.
+
+        Args:
+            name: Provider name (reported in completions)
+            max_concurrency: Maximum concurrent calls to this provider
+            timeout: Seconds before a call fails
+        """
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def complete(self, prompt: str) -> Completion:
+        """
+        Send a prompt and return the answer.
+
+        Args:
+            prompt: Screened prompt
+
+        Returns:
+            The provider's completion
+
+        Raises:
+            ProviderError: If the call fails or times out
+        """
+        async with self._limit():
+            started = time.perf_counter()
+            try:
+                text = await asyncio.wait_for(self._complete(prompt), self.timeout)
+            except asyncio.TimeoutError:
+                raise ProviderError(f"{self.name} timed out after {self.timeout}s") from None
+        return Completion(
+            text=text, provider=self.name, latency_ms=(time.perf_counter() - started) * 1000
+        )
+
+    @abstractmethod
+    async def _complete(self, prompt: str) -> str:
+        """Call the API and return the completion text."""
+
+    def _limit(self) -> asyncio.Semaphore:
+        # Semaphores are bound to the loop they are first used on.
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._semaphore
+
+
+class HTTPProvider(Provider):
+    """
+    Provider behind a JSON-over-HTTP API.
+
+    Blocking calls run on the provider's own thread pool of max_concurrency
+    threads, one per in-flight call; close() shuts it down.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        url: str,
+        pool: ConnectionPool,
+        headers: Optional[Dict[str, str]] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        """
+        Initialize HTTP provider.
+
+        Args:
+            name: Provider name
+            url: Endpoint URL
+            pool: Connection pool (share one across providers)
+            headers: Extra request headers (e.g. authentication)
+            max_concurrency: Maximum concurrent calls
+            timeout: Seconds before a call fails
+        """
+        super().__init__(name, max_concurrency, timeout)
+        self.url = url
+        self.pool = pool
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self._pool_executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def close(self) -> None:
+        """Shut down the provider's thread pool."""
+        with self._executor_lock:
+            if self._pool_executor is not None:
+                self._pool_executor.shutdown()
+                self._pool_executor = None
+
+    @abstractmethod
+    def build_body(self, prompt: str) -> Dict[str, Any]:
+        """Return the JSON request body for a prompt."""
+
+    @abstractmethod
+    def parse_response(self, payload: Dict[str, Any]) -> str:
+        """Extract the completion text from a JSON response."""
+
+    async def _complete(self, prompt: str) -> str:
+        body = json.dumps(self.build_body(prompt)).encode("utf-8")
+        loop = asyncio.get_running_loop()
+        try:
+            status, data = await loop.run_in_executor(
+                self._executor(),
+                self.pool.request,
+                "POST",
+                self.url,
+                body,
+                self.headers,
+                self.timeout,
+            )
+        except (OSError, http.client.HTTPException) as exc:
+            raise ProviderError(f"{self.name} request failed: {exc}") from exc
+        if status >= 400:
+            raise ProviderError(f"{self.name} returned HTTP {status}")
+        try:
+            return self.parse_response(json.loads(data))
+        except (ValueError, KeyError, IndexError, TypeError) as exc:
+            raise ProviderError(f"{self.name} returned a malformed response") from exc
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._pool_executor is None:
+                self._pool_executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency, thread_name_prefix=f"provider-{self.name}"
+                )
+            return self._pool_executor
+
+
+class OpenAIChatProvider(HTTPProvider):
+    """Provider for OpenAI-style chat completions APIs."""
+
+    def __init__(
+        self,
+        pool: ConnectionPool,
+        model: str,
+        api_key: Optional[str] = None,
+        url: str = "https://api.openai.com/v1/chat/completions",
+        name: str = "openai",
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        """
+        Initialize OpenAI-style provider.
+
+        Args:
+            pool: Connection pool
+            model: Model name
+            api_key: Bearer token (omitted if None)
+            url: Chat completions endpoint
+            name: Provider name
+            max_concurrency: Maximum concurrent calls
+            timeout: Seconds before a call fails
+        """
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        super().__init__(name, url, pool, headers, max_concurrency, timeout)
+        self.model = model
+
+    def build_body(self, prompt: str) -> Dict[str, Any]:
+        """Return a chat completions request with the prompt as the user message."""
+        return {"model": self.model, "messages": [{"role": "user", "content": prompt}]}
+
+    def parse_response(self, payload: Dict[str, Any]) -> str:
+        """Return the first choice's message content."""
+        return str(payload["choices"][0]["message"]["content"])
+
+
+class AnthropicMessagesProvider(HTTPProvider):
+    """Provider for Anthropic-style messages APIs."""
+
+    def __init__(
+        self,
+        pool: ConnectionPool,
+        model: str,
+        api_key: str,
+        url: str = "https://api.anthropic.com/v1/messages",
+        name: str = "anthropic",
+        max_tokens: int = 1024,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        """
+        Initialize Anthropic-style provider.
+
+        Args:
+            pool: Connection pool
+            model: Model name
+            api_key: API key
+            url: Messages endpoint
+            name: Provider name
+            max_tokens: Maximum tokens to generate
+            max_concurrency: Maximum concurrent calls
+            timeout: Seconds before a call fails
+        """
+        headers = {"x-api-key": api_key, "anthropic-version": "2023-06-01"}
+        super().__init__(name, url, pool, headers, max_concurrency, timeout)
+        self.model = model
+        self.max_tokens = max_tokens
+
+    def build_body(self, prompt: str) -> Dict[str, Any]:
+        """Return a messages request with the prompt as the user message."""
+        return {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "messages": [{"role": "user", "content": prompt}],
+        }
+
+    def parse_response(self, payload: Dict[str, Any]) -> str:
+        """Return the text of the response's content blocks."""
+        return "".join(block["text"] for block in payload["content"] if block["type"] == "text")
+
+
+class ProviderRouter:
+    """
+    Sends prompts to an ordered list of providers with hedging and fallback.
+
+    The first provider is called first. If it has not answered after
+    ``hedge_after`` seconds, the next provider is called as well and the
+    first acceptable answer wins; the other calls are cancelled. A failed
+    call or an answer the caller rejects starts the next provider at once.
+    """
+
+    def __init__(self, providers: Sequence[Provider], hedge_after: Optional[float] = None) -> None:
+        """
+        Initialize router.
+
+        Args:
+            providers: Providers in order of preference
+            hedge_after: Seconds to wait for an answer before hedging (never if None)
+
+        Raises:
+            ValueError: If no provider is given
+        """
+        if not providers:
+            raise ValueError("ProviderRouter needs at least one provider")
+        self.providers = list(providers)
+        self.hedge_after = hedge_after
+        self.hedges = 0
+        self.fallbacks = 0
+
+    async def complete(
+        self, prompt: str, accept: Optional[Callable[[str], bool]] = None
+    ) -> Completion:
+        """
+        Get a completion from the first provider that delivers an acceptable one.
+
+        Args:
+            prompt: Screened prompt
+            accept: Returns False for answers that should fall back to the
+                next provider (every answer is acceptable if None)
+
+        Returns:
+            The first accepted completion; if every answer was rejected, the
+            last rejected one
+
+        Raises:
+            ProviderError: If every provider failed
+        """
+        pending: Dict[asyncio.Task[Completion], Provider] = {}
+        next_index = 0
+        rejected: Optional[Completion] = None
+        errors: List[str] = []
+
+        def launch() -> None:
+            nonlocal next_index
+            provider = self.providers[next_index]
+            next_index += 1
+            pending[asyncio.ensure_future(provider.complete(prompt))] = provider
+
+        launch()
+        try:
+            while pending:
+                can_hedge = self.hedge_after is not None and next_index < len(self.providers)
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=self.hedge_after if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    self.hedges += 1
+                    launch()
+                    continue
+                for task in done:
+                    pending.pop(task)
+                    try:
+                        completion = task.result()
+                    except ProviderError as exc:
+                        errors.append(str(exc))
+                        continue
+                    if accept is None or accept(completion.text):
+                        return completion
+                    rejected = completion
+                if next_index < len(self.providers):
+                    self.fallbacks += 1
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+        if rejected is not None:
+            return rejected
+        raise ProviderError("All providers failed: " + "; ".join(errors))
+
+
+class MockProviderServer:
+    """
+    Local HTTP server answering OpenAI-style chat completions requests.
+
+    Runs in a background thread. Answers are produced by ``reply`` (echoing
+    the prompt by default) after ``latency`` seconds; a ``failure_rate``
+    share of requests fail with HTTP 503. Connections are kept alive.
+    """
+
+    def __init__(
+        self,
+        reply: Optional[Callable[[str], str]] = None,
+        latency: float = 0.0,
+        failure_rate: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        """
+        Initialize mock server (call start() or use it as a context manager).
+
+        Args:
+            reply: Function from prompt to answer
+            latency: Seconds to wait before answering
+            failure_rate: Share of requests answered with HTTP 503
+            host: Interface to bind
+            port: Port to bind (a free port if 0)
+        """
+        self.reply = reply or (lambda prompt: f"Mock answer to: {prompt}")
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.host = host
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Chat completions endpoint of the server."""
+        return f"http://{self.host}:{self._server.server_address[1]}/v1/chat/completions"
+
+    def start(self) -> "MockProviderServer":
+        """Start serving in a background thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._server.serve_forever, name="mock-provider", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def close(self) -> None:
+        """Stop the server and release its port."""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> "MockProviderServer":
+        """Start the server."""
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Stop the server."""
+        self.close()
+
+    def _handler_class(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; without TCP_NODELAY
+            # keep-alive requests stall on delayed ACKs.
+            disable_nagle_algorithm = True
+
+            def setup(self) -> None:
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def do_POST(self) -> None:  # noqa: N802 (http.server naming)
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                with server._lock:
+                    server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                if random.random() < server.failure_rate:  # noqa: S311 (not security relevant)
+                    self._send(503, {"error": {"message": "mock failure"}})
+                    return
+                prompt = payload.get("messages", [{}])[-1].get("content", "")
+                self._send(
+                    200,
+                    {
+                        "id": "mock",
+                        "object": "chat.completion",
+                        "model": payload.get("model", "mock"),
+                        "choices": [
+                            {
+                                "index": 0,
+                                "message": {"role": "assistant", "content": server.reply(prompt)},
+                                "finish_reason": "stop",
+                            }
+                        ],
+                    },
+                )
+
+            def _send(self, status: int, payload: Dict[str, Any]) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+                pass
+
+        return Handler
@@ -0,0 +1,263 @@
+"""
+Streaming Filter - Incremental content filtering for chunked AI output.
+
+AI responses are usually streamed token by token. Instead of buffering the
+whole completion, StreamingFilter scans each chunk together with a bounded
+carry-over window from the previous chunks, releases text as soon as no
+rule can still match across it, and cuts the stream when a BLOCK rule fires.
+
+Like a whole response, a stream is screened in the context of its request: the
+age profile of the content filter applies, and with a SafetyPolicy every
+released segment must also pass policy enforcement. Policy length conditions
+are judged on the total length streamed so far, so a min_length rule cuts the
+stream once it grows long enough; a max_length rule can only see the length
+reached when a segment is released, not the final one.
+
+With a TextNormalizer on the filter, the hold-back is measured in normalized
+characters as well, so text padded with zero-width characters, letter runs or
+spaces is held back until no keyword can still start in it.
+"""
+
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+)
+
+from parent_ai_safety.core.filter import (
+    ACTION_PRECEDENCE,
+    ContentFilter,
+    FilterAction,
+    FilterResult,
+    mask_spans,
+)
+from parent_ai_safety.core.matcher import Span
+
+if TYPE_CHECKING:
+    from parent_ai_safety.core.policy import SafetyPolicy
+
+# Default number of trailing characters held back between chunks. Keyword
+# matches are bounded by the longest keyword; regex matches are assumed to be
+# shorter than this unless a larger window is configured.
+DEFAULT_WINDOW = 64
+
+
+class StreamingFilter:
+    """
+    Incremental filter over a stream of text chunks.
+
+    Feed chunks with feed(); each call returns the text that is now known to be
+    safe to emit. Call close() at the end of the stream to release the held-back
+    tail. Only the carry-over window (at most ``window`` characters plus the
+    latest chunk) is rescanned, so total work stays linear in the stream length.
+    """
+
+    def __init__(
+        self,
+        content_filter: ContentFilter,
+        window: int = DEFAULT_WINDOW,
+        context: Optional[Dict[str, Any]] = None,
+        policy: Optional["SafetyPolicy"] = None,
+    ) -> None:
+        """
+        Initialize streaming filter.
+
+        Args:
+            content_filter: Content filter whose rules are applied
+            window: Minimum number of trailing characters held back so that
+                matches spanning chunk boundaries are still caught
+            context: Evaluation context of the request (user_id, age, ...)
+            policy: Safety policy every released segment must pass
+        """
+        self.content_filter = content_filter
+        self.context = context
+        self.policy = policy
+        self.window = max(window, content_filter.profile(context).max_keyword_length)
+        self.blocked = False
+        self._buffer = ""
+        self._released = ""
+        self._length = 0
+        self._context = 0
+        self._matched: Dict[str, FilterAction] = {}
+        self._closed = False
+
+    def feed(self, chunk: str) -> str:
+        """
+        Add a chunk to the stream.
+
+        Args:
+            chunk: Next chunk of AI output
+
+        Returns:
+            Text that is safe to emit now (possibly empty)
+        """
+        if self.blocked or self._closed:
+            return ""
+        self._buffer += chunk
+        return self._release(final=False)
+
+    def close(self) -> str:
+        """
+        Finish the stream.
+
+        Returns:
+            Remaining held-back text that is safe to emit
+        """
+        if self._closed:
+            return ""
+        released = "" if self.blocked else self._release(final=True)
+        self._closed = True
+        return released
+
+    def result(self) -> FilterResult:
+        """Summarize the rules that matched over the whole stream."""
+        if not self._matched:
+            if self.blocked and self.policy is not None:
+                return FilterResult(
+                    passed=False,
+                    action=FilterAction.BLOCK,
+                    metadata={"streamed": True, "policy": self.policy.name},
+                )
+            return FilterResult(passed=not self.blocked)
+        action = max(self._matched.values(), key=ACTION_PRECEDENCE.__getitem__)
+        return FilterResult(
+            passed=not self.blocked,
+            action=action,
+            matched_rules=list(self._matched),
+            metadata={"streamed": True},
+        )
+
+    def _release(self, final: bool) -> str:
+        buffer = self._buffer
+        context = self._context
+        compiled = self.content_filter.profile(self.context)
+        normalized = compiled.normalizer.normalize(buffer) if compiled.normalizer else None
+        hits = compiled.scan(buffer, normalized)
+        actions = {rule.name: rule.action for rule in compiled.rules}
+
+        # A match touching the end of the buffer may still change once more
+        # text arrives (e.g. "bad" followed by "minton"), so it only counts
+        # once it is followed by at least one more character. Matches lying
+        # entirely in the already-emitted context character were handled before.
+        sanitize_spans: List[Span] = []
+        for rule_name, spans in hits.items():
+            confirmed = [
+                (max(start, context), end)
+                for start, end in spans
+                if end > context and (final or end < len(buffer))
+            ]
+            if not confirmed:
+                continue
+            action = actions[rule_name]
+            self._matched.setdefault(rule_name, action)
+            if action == FilterAction.BLOCK:
+                self.blocked = True
+                self._buffer = ""
+                return ""
+            if action == FilterAction.SANITIZE:
+                sanitize_spans.extend(confirmed)
+
+        safe_end = len(buffer)
+        if not final:
+            safe_end = max(len(buffer) - self.window, context)
+            if normalized is not None:
+                # One normalized character can stand for any number of original
+                # ones (zero-width padding, letter runs, spaced-out letters), so
+                # also hold back everything behind the last ``window``
+                # normalized characters of every form.
+                for form in normalized.forms():
+                    held = form.starts[-self.window] if len(form.starts) >= self.window else 0
+                    safe_end = min(safe_end, max(held, context))
+        for start, end in sanitize_spans:
+            # Never split a span that is being masked.
+            if start < safe_end < end:
+                safe_end = start
+        if safe_end <= context:
+            return ""
+        if self.policy is not None:
+            # Include the tail of the text released before, so that policy
+            # keywords spanning two segments are still seen, and judge length
+            # conditions on everything streamed so far.
+            segment = self._released + buffer[context:safe_end]
+            length = self._length + safe_end - context
+            if not self.policy.enforce(segment, self.context, length):
+                self.blocked = True
+                self._buffer = ""
+                return ""
+            self._released = segment[-self.window :]
+        self._length += safe_end - context
+
+        # Keep the last emitted character so word boundaries at the start of
+        # the next scan are judged correctly.
+        self._context = 1
+        self._buffer = buffer[safe_end - 1 :]
+        emitted = [
+            (start - context, end - context) for start, end in sanitize_spans if end <= safe_end
+        ]
+        return mask_spans(buffer[context:safe_end], emitted, self.content_filter.mask_style)
+
+
+def filter_stream(
+    content_filter: ContentFilter,
+    chunks: Iterable[str],
+    window: int = DEFAULT_WINDOW,
+    stream: Optional[StreamingFilter] = None,
+) -> Iterator[str]:
+    """
+    Filter a synchronous stream of chunks.
+
+    Args:
+        content_filter: Content filter to apply
+        chunks: Chunks of AI output
+        window: Carry-over window size
+        stream: Existing StreamingFilter to use, e.g. to inspect result() later
+
+    Yields:
+        Safe text; the stream stops early if a BLOCK rule fires
+    """
+    stream = stream or StreamingFilter(content_filter, window)
+    for chunk in chunks:
+        released = stream.feed(chunk)
+        if released:
+            yield released
+        if stream.blocked:
+            return
+    released = stream.close()
+    if released:
+        yield released
+
+
+async def afilter_stream(
+    content_filter: ContentFilter,
+    chunks: AsyncIterable[str],
+    window: int = DEFAULT_WINDOW,
+    stream: Optional[StreamingFilter] = None,
+) -> AsyncIterator[str]:
+    """
+    Filter an asynchronous stream of chunks.
+
+    Args:
+        content_filter: Content filter to apply
+        chunks: Chunks of AI output
+        window: Carry-over window size
+        stream: Existing StreamingFilter to use, e.g. to inspect result() later
+
+    Yields:
+        Safe text; the stream stops early if a BLOCK rule fires
+    """
+    stream = stream or StreamingFilter(content_filter, window)
+    async for chunk in chunks:
+        released = stream.feed(chunk)
+        if released:
+            yield released
+        if stream.blocked:
+            return
+    released = stream.close()
+    if released:
+        yield released
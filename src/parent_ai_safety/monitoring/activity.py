@@ -1,21 +1,41 @@
 """
 Activity Monitoring - Track and analyze AI interaction patterns.
 
+Activities are tracked as they are logged, optionally in a columnar store
+on disk, and summarized per user and time period from pre-aggregated rollups
+where available. Unusual usage is flagged as it arrives by comparing each
+activity with its user's online baseline, and concerning activities can be
+sent to parents through the alert bus (see monitoring/alerts.py).
+
 TODO: Implement the following functionality:
-- Real-time activity tracking
 - Behavior pattern detection
-- Anomaly detection (unusual usage patterns)
-- Activity summaries and reports
+- Activity reports
 - Dashboard data generation
-- Alerting for concerning behaviors
 """
 
+import math
+from collections import Counter
+from concurrent.futures import Future
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
 
 from pydantic import BaseModel, Field
 
+if TYPE_CHECKING:
+    from parent_ai_safety.monitoring.activity_store import ColumnarActivityStore
+    from parent_ai_safety.monitoring.alerts import AlertBus
+    from parent_ai_safety.monitoring.baselines import ActivityBaselines, Anomaly
+    from parent_ai_safety.monitoring.journal import Journal
+    from parent_ai_safety.monitoring.rollups import ActivityRollups
+
+# Minimum history (in hours, from first to last activity) before a user's
+# hourly activity rate is compared against their baseline.
+MIN_BASELINE_HOURS = 24
+# Hours whose activity count exceeds the mean by this many standard
+# deviations are anomalous.
+ANOMALY_Z_SCORE = 3.0
+
 
 class ActivityType(str, Enum):
     """Types of activities to monitor."""
@@ -60,37 +80,127 @@ class ActivitySummary(BaseModel):
     concerning_activities: List[Activity] = Field(..., description="Activities needing attention")
 
 
+CONCERNING_SEVERITIES = frozenset({ActivitySeverity.ALERT, ActivitySeverity.CRITICAL})
+
+# Journal record kind of logged activities.
+JOURNAL_ACTIVITY = "activity"
+
+# Per-user counts by type, counts by severity and concerning activities.
+SummaryCounts = Tuple[Dict[ActivityType, int], Dict[ActivitySeverity, int], List[Activity]]
+
+
 class ActivityMonitor:
     """
     Activity monitoring and analysis system.
 
+    Activities are kept in memory by default. With a ColumnarActivityStore
+    they are persisted column by column instead, and summaries and anomaly
+    detection scan the memory-mapped columns without building Activity
+    objects except for the rows they return.
+
+    With ActivityRollups, logged activities also update pre-aggregated
+    minute/hour/day counters and summaries are answered from them; ranges
+    the rollups can no longer answer fall back to scanning.
+
+    With ActivityBaselines, each logged activity updates its user's online
+    baseline and is checked by streaming detectors as it arrives, so
+    detect_anomalies() returns the flagged activities without rescanning the
+    history.
+
+    With a Journal, activities are journaled before they are applied and
+    replayed on startup. A store recovers the activities that reached its
+    files itself, so only journaled activities beyond its length are
+    replayed into it; open the journal and the store together from empty.
+    Applied activities cannot be taken back out of the store, rollups and
+    baselines, so a failed journal commit is reported in ``journal_error``
+    (and later log_activity() calls raise) rather than undone.
+
     TODO: Implement:
-    - log_activity() to record activities
     - get_activities() to retrieve activity history
-    - get_summary() to generate activity summaries
-    - detect_anomalies() for unusual pattern detection
     - generate_report() for parental review
-    - Real-time alerting for critical activities
     """
 
-    def __init__(self) -> None:
-        """Initialize activity monitor."""
+    def __init__(
+        self,
+        store: Optional["ColumnarActivityStore"] = None,
+        rollups: Optional["ActivityRollups"] = None,
+        baselines: Optional["ActivityBaselines"] = None,
+        alerts: Optional["AlertBus"] = None,
+        journal: Optional["Journal"] = None,
+    ) -> None:
+        """
+        Initialize activity monitor.
+
+        Args:
+            store: Persistent columnar store; activities are kept in memory if None
+            rollups: Incremental summary counters, backfilled from the store
+            baselines: Online baselines and anomaly detectors, backfilled from the store
+            alerts: Bus notifying parents of ALERT and CRITICAL activities
+            journal: Write-ahead journal, replayed after the backfills (no alerts
+                are sent for replayed activities)
+        """
         self.activities: List[Activity] = []
+        self.store = store
+        self.rollups = rollups
+        self.baselines = baselines
+        self.alerts = alerts
+        self.journal = journal
+        self.journal_error: Optional[BaseException] = None
+        if store is not None:
+            if rollups is not None:
+                rollups.backfill(store)
+            if baselines is not None:
+                baselines.backfill(store)
+        if journal is not None:
+            skip = len(store) if store is not None else 0
+            for index, (_, record) in enumerate(journal.replay((JOURNAL_ACTIVITY,))):
+                if index >= skip:
+                    self._apply(Activity.model_validate(record))
 
-    def log_activity(self, activity: Activity) -> None:
+    def log_activity(self, activity: Activity, durable: bool = False) -> None:
         """
         Log an activity for monitoring.
 
-        TODO: Implement activity logging
-        - Store activity record
-        - Check for anomalies
-        - Trigger alerts if needed
-        - Update real-time dashboard
+        ALERT and CRITICAL activities are handed to the alert bus without
+        waiting for delivery.
 
         Args:
             activity: Activity to log
+            durable: Wait until the activity is committed to the journal
+
+        Raises:
+            OSError: If the journal has failed, or if durable and the journal
+                commit failed
         """
-        raise NotImplementedError("Activity logging not yet implemented")
+        committed = (
+            self.journal.append(
+                JOURNAL_ACTIVITY, activity.model_dump(mode="json"), self._journal_failed
+            )
+            if self.journal is not None
+            else None
+        )
+        self._apply(activity)
+        if self.alerts is not None and activity.severity in CONCERNING_SEVERITIES:
+            self.alerts.publish_nowait(activity)
+        if durable and committed is not None:
+            committed.result()
+
+    def _journal_failed(self, future: "Future[None]") -> None:
+        """Record the first journal commit failure."""
+        error = future.exception()
+        if error is not None and self.journal_error is None:
+            self.journal_error = error
+
+    def _apply(self, activity: Activity) -> None:
+        """Add an activity to the history, rollups and baselines."""
+        if self.store is not None:
+            self.store.append(activity)
+        else:
+            self.activities.append(activity)
+        if self.rollups is not None:
+            self.rollups.add(activity)
+        if self.baselines is not None:
+            self.baselines.observe(activity)
 
     def get_summary(
         self, user_id: str, start_time: datetime, end_time: datetime
@@ -98,31 +208,70 @@ class ActivityMonitor:
         """
         Generate activity summary for time period.
 
-        TODO: Implement summary generation
-        - Filter activities by user and time
-        - Aggregate by type and severity
-        - Identify concerning activities
-        - Calculate statistics
+        Activities with ALERT or CRITICAL severity are reported as concerning.
 
         Args:
             user_id: User identifier
-            start_time: Period start
-            end_time: Period end
+            start_time: Period start (inclusive)
+            end_time: Period end (inclusive)
 
         Returns:
             Activity summary
         """
-        raise NotImplementedError("Activity summary not yet implemented")
+        return self.get_summaries([user_id], start_time, end_time)[user_id]
+
+    def get_summaries(
+        self, user_ids: Optional[Iterable[str]], start_time: datetime, end_time: datetime
+    ) -> Dict[str, ActivitySummary]:
+        """
+        Generate activity summaries for many users in one grouped pass.
+
+        Used for household and platform-wide dashboards. Users are answered
+        from the rollups when possible; the activity history is scanned once
+        for the rest, regardless of their number.
+
+        Args:
+            user_ids: Users to summarize; every user with activities if None
+            start_time: Period start (inclusive)
+            end_time: Period end (inclusive)
+
+        Returns:
+            Activity summary per user id
+        """
+        grouped: Dict[str, SummaryCounts] = {}
+        if self.rollups is not None:
+            wanted = self.rollups.users() if user_ids is None else list(dict.fromkeys(user_ids))
+            user_ids = []
+            for user_id in wanted:
+                counts = self.rollups.summarize(user_id, start_time, end_time)
+                if counts is None:
+                    user_ids.append(user_id)
+                else:
+                    grouped[user_id] = counts
+        if user_ids is None or user_ids:
+            grouped.update(self._scan_summaries(user_ids, start_time, end_time))
+        return {
+            user_id: ActivitySummary(
+                user_id=user_id,
+                start_time=start_time,
+                end_time=end_time,
+                total_activities=sum(by_type.values()),
+                by_type={value.value: by_type.get(value, 0) for value in ActivityType},
+                by_severity={value.value: by_severity.get(value, 0) for value in ActivitySeverity},
+                concerning_activities=concerning,
+            )
+            for user_id, (by_type, by_severity, concerning) in grouped.items()
+        }
 
     def detect_anomalies(self, user_id: str) -> List[Activity]:
         """
         Detect unusual activity patterns.
 
-        TODO: Implement anomaly detection
-        - Analyze activity patterns
-        - Compare to baseline behavior
-        - Identify significant deviations
-        - Return suspicious activities
+        With baselines, returns the activities the streaming detectors
+        flagged. Otherwise the user's baseline is their mean and standard
+        deviation of activities per hour, over every hour from their first to
+        their last activity, and activities in hours whose count exceeds the
+        baseline by ANOMALY_Z_SCORE standard deviations are returned.
 
         Args:
             user_id: User identifier
@@ -130,4 +279,107 @@ class ActivityMonitor:
         Returns:
             List of anomalous activities
         """
-        raise NotImplementedError("Anomaly detection not yet implemented")
+        if self.baselines is not None:
+            return flagged_activities(self.baselines.flagged(user_id))
+        if self.store is not None:
+            store = self.store
+            rows = anomalous_hours(store.user_hours(user_id))
+            return [store.activity(row) for row in rows]
+        activities = [activity for activity in self.activities if activity.user_id == user_id]
+        flagged = anomalous_hours(
+            (hour_index(activity.timestamp), position)
+            for position, activity in enumerate(activities)
+        )
+        return [activities[position] for position in flagged]
+
+    def detect_anomalies_all(self) -> Dict[str, List[Activity]]:
+        """
+        Detect unusual activity patterns of every user in one sweep.
+
+        Without baselines the history is grouped by user in a single pass
+        instead of being scanned once per user.
+
+        Returns:
+            Anomalous activities per user with at least one
+        """
+        if self.baselines is not None:
+            flagged = {
+                user_id: flagged_activities(self.baselines.flagged(user_id))
+                for user_id in self.baselines.users()
+            }
+        elif self.store is not None:
+            store = self.store
+            flagged = {
+                user_id: [store.activity(row) for row in anomalous_hours(hours)]
+                for user_id, hours in store.hours_by_user().items()
+            }
+        else:
+            by_user: Dict[str, List[Tuple[int, Activity]]] = {}
+            for activity in self.activities:
+                by_user.setdefault(activity.user_id, []).append(
+                    (hour_index(activity.timestamp), activity)
+                )
+            flagged = {user_id: anomalous_hours(items) for user_id, items in by_user.items()}
+        return {user_id: activities for user_id, activities in flagged.items() if activities}
+
+    def _scan_summaries(
+        self, user_ids: Optional[Iterable[str]], start_time: datetime, end_time: datetime
+    ) -> Dict[str, SummaryCounts]:
+        if self.store is not None:
+            return self.store.summarize_many(user_ids, start_time, end_time)
+        if user_ids is None:
+            wanted: Iterable[str] = dict.fromkeys(a.user_id for a in self.activities)
+        else:
+            wanted = user_ids
+        grouped: Dict[str, SummaryCounts] = {user_id: ({}, {}, []) for user_id in wanted}
+        for activity in self.activities:
+            group = grouped.get(activity.user_id)
+            if group is None or not start_time <= activity.timestamp <= end_time:
+                continue
+            by_type, by_severity, concerning = group
+            by_type[activity.activity_type] = by_type.get(activity.activity_type, 0) + 1
+            by_severity[activity.severity] = by_severity.get(activity.severity, 0) + 1
+            if activity.severity in CONCERNING_SEVERITIES:
+                concerning.append(activity)
+        return grouped
+
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def hour_index(moment: datetime) -> int:
+    """Return the number of whole hours between the epoch and a naive UTC datetime."""
+    return int((moment - EPOCH).total_seconds() // 3600)
+
+
+def flagged_activities(anomalies: Iterable["Anomaly"]) -> List[Activity]:
+    """Return the distinct activities of anomalies, in order."""
+    seen: Dict[str, Activity] = {}
+    for anomaly in anomalies:
+        seen.setdefault(anomaly.activity.activity_id, anomaly.activity)
+    return list(seen.values())
+
+
+def anomalous_hours(items: Iterable[Tuple[int, Any]]) -> List[Any]:
+    """
+    Flag items falling in hours with anomalously high activity.
+
+    Args:
+        items: (hour index, reference) pairs
+
+    Returns:
+        References of the flagged items, in input order
+    """
+    items = list(items)
+    counts = Counter(hour for hour, _ in items)
+    if not counts:
+        return []
+    span = max(counts) - min(counts) + 1
+    if span < MIN_BASELINE_HOURS:
+        return []
+    mean = len(items) / span
+    # Hours without activity count as zeros in the baseline.
+    squares = sum((count - mean) ** 2 for count in counts.values())
+    squares += (span - len(counts)) * mean**2
+    threshold = mean + ANOMALY_Z_SCORE * math.sqrt(squares / span)
+    return [reference for hour, reference in items if counts[hour] > threshold]
@@ -0,0 +1,476 @@
+"""
+Columnar Activity Store - Persistent, memory-mapped activity history.
+
+Activities are stored column by column in a directory:
+- timestamps.col: int64 microseconds since the Unix epoch (UTC)
+- users.col: uint32 code into the interned user table (users.jsonl)
+- types.col / severities.col: uint8 ActivityType / ActivitySeverity codes
+- details.idx: uint64 end offset of each row's record in details.heap
+- details.heap: JSON record with the activity id and details
+
+Fixed-width columns are append-only and memory-mapped on read, so scans touch
+only the columns they need and never build Activity objects. Columns use the
+machine's native byte order.
+
+Grouped summaries are vectorized with NumPy when it is installed
+(``pip install parent-ai-safety[fast]``) and fall back to a single pure-Python
+pass over the columns otherwise.
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import (
+    Any,
+    BinaryIO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from parent_ai_safety.monitoring.activity import (
+    CONCERNING_SEVERITIES,
+    EPOCH,
+    Activity,
+    ActivitySeverity,
+    ActivityType,
+    SummaryCounts,
+)
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised when the extra is missing
+    np = None  # type: ignore[assignment]
+
+MICROS_PER_HOUR = 3_600_000_000
+
+ACTIVITY_TYPES: List[ActivityType] = list(ActivityType)
+ACTIVITY_SEVERITIES: List[ActivitySeverity] = list(ActivitySeverity)
+TYPE_CODES: Dict[ActivityType, int] = {value: code for code, value in enumerate(ACTIVITY_TYPES)}
+SEVERITY_CODES: Dict[ActivitySeverity, int] = {
+    value: code for code, value in enumerate(ACTIVITY_SEVERITIES)
+}
+CONCERNING_CODES = frozenset(SEVERITY_CODES[severity] for severity in CONCERNING_SEVERITIES)
+
+# Struct (and memoryview) formats of the fixed-width columns.
+ColumnFormat = Literal["q", "I", "B", "Q"]
+
+# Column name -> struct format of one value.
+COLUMNS: Dict[str, ColumnFormat] = {
+    "timestamps": "q",
+    "users": "I",
+    "types": "B",
+    "severities": "B",
+    "details_end": "Q",
+}
+_WIDTHS: Dict[str, int] = {name: struct.calcsize(fmt) for name, fmt in COLUMNS.items()}
+_FILES: Dict[str, str] = {
+    "timestamps": "timestamps.col",
+    "users": "users.col",
+    "types": "types.col",
+    "severities": "severities.col",
+    "details_end": "details.idx",
+}
+# NumPy dtypes matching the struct formats above.
+_DTYPES: Dict[str, str] = {"timestamps": "=i8", "users": "=u4", "types": "u1", "severities": "u1"}
+
+
+def to_micros(moment: datetime) -> int:
+    """Convert a naive UTC datetime to microseconds since the epoch."""
+    return (moment - EPOCH) // timedelta(microseconds=1)
+
+
+def from_micros(micros: int) -> datetime:
+    """Convert microseconds since the epoch to a naive UTC datetime."""
+    return EPOCH + timedelta(microseconds=micros)
+
+
+class ActivityColumns(NamedTuple):
+    """Read-only, memory-mapped views of the fixed-width columns."""
+
+    timestamps: memoryview
+    users: memoryview
+    types: memoryview
+    severities: memoryview
+    rows: int
+
+
+class ColumnarActivityStore:
+    """
+    Append-friendly columnar activity storage backed by files.
+
+    Appends go through buffered file handles; columns() flushes them and
+    returns memory-mapped views that are remapped only when the files grew.
+    A partially written last row (e.g. after a crash) is discarded on open.
+    """
+
+    def __init__(self, directory: Union[str, Path]) -> None:
+        """
+        Open (or create) a store.
+
+        Args:
+            directory: Directory holding the column files
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._user_ids: List[str] = []
+        self._user_codes: Dict[str, int] = {}
+        self._load_users()
+        self._count = self._recover()
+
+        self._writers: Dict[str, BinaryIO] = {
+            name: open(self.directory / filename, "ab") for name, filename in _FILES.items()
+        }
+        self._heap = open(self.directory / "details.heap", "ab")
+        self._heap_reader = open(self.directory / "details.heap", "rb")
+        self._users_file = open(self.directory / "users.jsonl", "ab")
+        self._heap_size = self._heap.tell()
+        self._dirty = False
+        self._maps: Dict[str, mmap.mmap] = {}
+        self._views: Optional[ActivityColumns] = None
+
+    def __len__(self) -> int:
+        """Return the number of stored activities."""
+        return self._count
+
+    def close(self) -> None:
+        """Flush and close the underlying files."""
+        with self._lock:
+            for handle in (*self._writers.values(), self._heap, self._users_file):
+                handle.close()
+            self._heap_reader.close()
+            self._views = None
+            self._maps.clear()
+
+    def append(self, activity: Activity) -> None:
+        """Append an activity."""
+        record = json.dumps(
+            {"id": activity.activity_id, "details": activity.details},
+            separators=(",", ":"),
+            default=str,
+        ).encode("utf-8")
+        with self._lock:
+            self._heap.write(record)
+            self._heap_size += len(record)
+            values = {
+                "timestamps": to_micros(activity.timestamp),
+                "users": self._intern(activity.user_id),
+                "types": TYPE_CODES[activity.activity_type],
+                "severities": SEVERITY_CODES[activity.severity],
+                "details_end": self._heap_size,
+            }
+            for name, value in values.items():
+                self._writers[name].write(struct.pack(COLUMNS[name], value))
+            self._count += 1
+            self._dirty = True
+
+    def user_code(self, user_id: str) -> Optional[int]:
+        """Return the interned code of a user, or None if the user has no activities."""
+        return self._user_codes.get(user_id)
+
+    def user_id(self, code: int) -> str:
+        """Return the user id for an interned code."""
+        return self._user_ids[code]
+
+    def columns(self) -> ActivityColumns:
+        """Return memory-mapped views of all fixed-width columns."""
+        with self._lock:
+            if self._dirty:
+                self.flush()
+            if self._views is None or self._views.rows != self._count:
+                self._views = ActivityColumns(
+                    timestamps=self._map("timestamps"),
+                    users=self._map("users"),
+                    types=self._map("types"),
+                    severities=self._map("severities"),
+                    rows=self._count,
+                )
+            return self._views
+
+    def flush(self) -> None:
+        """Flush buffered appends to the files."""
+        with self._lock:
+            # Heap records first, so no flushed row points past flushed details.
+            self._heap.flush()
+            self._users_file.flush()
+            for handle in self._writers.values():
+                handle.flush()
+            self._dirty = False
+
+    def activity(self, row: int) -> Activity:
+        """
+        Materialize one stored row as an Activity.
+
+        Args:
+            row: Row number
+
+        Returns:
+            The stored activity
+        """
+        columns = self.columns()
+        offsets = self._map("details_end")
+        start = offsets[row - 1] if row else 0
+        with self._lock:
+            self._heap_reader.seek(start)
+            record = json.loads(self._heap_reader.read(offsets[row] - start))
+        return Activity(
+            activity_id=record["id"],
+            user_id=self._user_ids[columns.users[row]],
+            activity_type=ACTIVITY_TYPES[columns.types[row]],
+            severity=ACTIVITY_SEVERITIES[columns.severities[row]],
+            timestamp=from_micros(columns.timestamps[row]),
+            details=record["details"],
+        )
+
+    def summarize(self, user_id: str, start_time: datetime, end_time: datetime) -> SummaryCounts:
+        """
+        Count one user's activities by type and severity over a time range.
+
+        Args:
+            user_id: User identifier
+            start_time: Period start (inclusive)
+            end_time: Period end (inclusive)
+
+        Returns:
+            Counts by type, counts by severity and the concerning activities
+        """
+        return self.summarize_many([user_id], start_time, end_time)[user_id]
+
+    def summarize_many(
+        self, user_ids: Optional[Iterable[str]], start_time: datetime, end_time: datetime
+    ) -> Dict[str, SummaryCounts]:
+        """
+        Count activities by user, type and severity in one grouped pass.
+
+        Only the user, timestamp, type and severity columns are scanned;
+        Activity objects are built for concerning rows only.
+
+        Args:
+            user_ids: Users to summarize; every stored user if None
+            start_time: Period start (inclusive)
+            end_time: Period end (inclusive)
+
+        Returns:
+            Counts by type, counts by severity and the concerning activities,
+            keyed by user id
+        """
+        wanted = list(self._user_ids if user_ids is None else dict.fromkeys(user_ids))
+        groups = {}
+        for group, user_id in enumerate(wanted):
+            code = self.user_code(user_id)
+            if code is not None:
+                groups[code] = group
+        columns = self.columns()
+        low, high = to_micros(start_time), to_micros(end_time)
+        if np is not None:
+            type_counts, severity_counts, concerning = self._group_numpy(
+                columns, groups, len(wanted), low, high
+            )
+        else:
+            type_counts, severity_counts, concerning = self._group_python(
+                columns, groups, len(wanted), low, high
+            )
+
+        summaries: Dict[str, SummaryCounts] = {}
+        for group, user_id in enumerate(wanted):
+            summaries[user_id] = (
+                {
+                    ACTIVITY_TYPES[code]: count
+                    for code, count in enumerate(type_counts[group])
+                    if count
+                },
+                {
+                    ACTIVITY_SEVERITIES[code]: count
+                    for code, count in enumerate(severity_counts[group])
+                    if count
+                },
+                [self.activity(row) for row in concerning[group]],
+            )
+        return summaries
+
+    def user_hours(self, user_id: str) -> List[Tuple[int, int]]:
+        """
+        Return (hour index, row) pairs for every activity of a user.
+
+        Args:
+            user_id: User identifier
+
+        Returns:
+            Hour since the epoch and row number of each of the user's activities
+        """
+        timestamps = self.columns().timestamps
+        return [(timestamps[row] // MICROS_PER_HOUR, row) for row in self._user_rows(user_id)]
+
+    def hours_by_user(self) -> Dict[str, List[Tuple[int, int]]]:
+        """
+        Return (hour index, row) pairs of every activity, grouped by user in one pass.
+
+        Returns:
+            Hour since the epoch and row number of each activity, per user id
+        """
+        columns = self.columns()
+        users, timestamps = columns.users, columns.timestamps
+        grouped: Dict[int, List[Tuple[int, int]]] = {}
+        for row in range(columns.rows):
+            grouped.setdefault(users[row], []).append((timestamps[row] // MICROS_PER_HOUR, row))
+        return {self.user_id(code): hours for code, hours in grouped.items()}
+
+    def _user_rows(
+        self,
+        user_id: str,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+    ) -> Iterator[int]:
+        code = self.user_code(user_id)
+        if code is None:
+            return
+        columns = self.columns()
+        users, timestamps = columns.users, columns.timestamps
+        low = to_micros(start_time) if start_time is not None else None
+        high = to_micros(end_time) if end_time is not None else None
+        for row in range(columns.rows):
+            if users[row] != code:
+                continue
+            if low is not None and timestamps[row] < low:
+                continue
+            if high is not None and timestamps[row] > high:
+                continue
+            yield row
+
+    @staticmethod
+    def _group_python(
+        columns: ActivityColumns, groups: Dict[int, int], size: int, low: int, high: int
+    ) -> Tuple[List[List[int]], List[List[int]], List[List[int]]]:
+        type_counts = [[0] * len(ACTIVITY_TYPES) for _ in range(size)]
+        severity_counts = [[0] * len(ACTIVITY_SEVERITIES) for _ in range(size)]
+        concerning: List[List[int]] = [[] for _ in range(size)]
+        users, timestamps = columns.users, columns.timestamps
+        types, severities = columns.types, columns.severities
+        for row in range(columns.rows):
+            group = groups.get(users[row])
+            if group is None or not low <= timestamps[row] <= high:
+                continue
+            type_counts[group][types[row]] += 1
+            severity = severities[row]
+            severity_counts[group][severity] += 1
+            if severity in CONCERNING_CODES:
+                concerning[group].append(row)
+        return type_counts, severity_counts, concerning
+
+    def _group_numpy(
+        self, columns: ActivityColumns, groups: Dict[int, int], size: int, low: int, high: int
+    ) -> Tuple[List[List[int]], List[List[int]], List[List[int]]]:
+        concerning: List[List[int]] = [[] for _ in range(size)]
+        if not groups or not columns.rows:
+            return (
+                [[0] * len(ACTIVITY_TYPES) for _ in range(size)],
+                [[0] * len(ACTIVITY_SEVERITIES) for _ in range(size)],
+                concerning,
+            )
+        arrays: Dict[str, Any] = {
+            name: np.frombuffer(getattr(columns, name), dtype=dtype)
+            for name, dtype in _DTYPES.items()
+        }
+        # Map user codes to group numbers; users that were not asked for map to -1.
+        lookup = np.full(len(self._user_ids), -1, dtype=np.int64)
+        lookup[list(groups)] = list(groups.values())
+        group = lookup[arrays["users"]]
+        timestamps = arrays["timestamps"]
+        rows = np.flatnonzero((group >= 0) & (timestamps >= low) & (timestamps <= high))
+        group = group[rows]
+        severities = arrays["severities"][rows]
+
+        def count_by(codes: Any, width: int) -> List[List[int]]:
+            keys = group * width + codes
+            counts = np.bincount(keys, minlength=size * width)
+            return counts.reshape(size, width).tolist()
+
+        flagged = np.isin(severities, list(CONCERNING_CODES))
+        for row, owner in zip(rows[flagged].tolist(), group[flagged].tolist()):
+            concerning[owner].append(row)
+        return (
+            count_by(arrays["types"][rows], len(ACTIVITY_TYPES)),
+            count_by(severities, len(ACTIVITY_SEVERITIES)),
+            concerning,
+        )
+
+    def _map(self, name: str) -> memoryview:
+        path = self.directory / _FILES[name]
+        size = self._count * _WIDTHS[name]
+        if size == 0:
+            return memoryview(b"").cast(COLUMNS[name])
+        current = self._maps.get(name)
+        if current is None or len(current) < size:
+            with open(path, "rb") as handle:
+                # Older maps stay alive for as long as callers hold views on them.
+                current = self._maps[name] = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(current)[:size].cast(COLUMNS[name])
+
+    def _intern(self, user_id: str) -> int:
+        code = self._user_codes.get(user_id)
+        if code is None:
+            code = self._user_codes[user_id] = len(self._user_ids)
+            self._user_ids.append(user_id)
+            # Written through immediately so no stored row can reference a
+            # user code that is missing from the table after a crash.
+            self._users_file.write(json.dumps(user_id).encode("utf-8") + b"\n")
+            self._users_file.flush()
+        return code
+
+    def _load_users(self) -> None:
+        path = self.directory / "users.jsonl"
+        if not path.exists():
+            return
+        with open(path, "rb") as handle:
+            for line in handle:
+                if not line.endswith(b"\n"):
+                    break
+                user_id = json.loads(line)
+                self._user_codes[user_id] = len(self._user_ids)
+                self._user_ids.append(user_id)
+
+    def _recover(self) -> int:
+        """
+        Truncate every file to the last complete row and return the row count.
+
+        A row is complete when every column holds its value, its details
+        record lies entirely within the heap and its user code is known.
+        """
+        sizes = {}
+        for name, filename in _FILES.items():
+            path = self.directory / filename
+            sizes[name] = path.stat().st_size // _WIDTHS[name] if path.exists() else 0
+        count = min(sizes.values())
+
+        heap = self.directory / "details.heap"
+        heap_size = heap.stat().st_size if heap.exists() else 0
+        if count:
+            width = _WIDTHS["details_end"]
+            with open(self.directory / _FILES["details_end"], "rb") as handle:
+                ends = memoryview(handle.read(count * width)).cast(COLUMNS["details_end"])
+            with open(self.directory / _FILES["users"], "rb") as handle:
+                users = memoryview(handle.read(count * _WIDTHS["users"])).cast(COLUMNS["users"])
+            # Heap ends only grow, so the incomplete rows form a suffix.
+            while count and (
+                ends[count - 1] > heap_size or users[count - 1] >= len(self._user_ids)
+            ):
+                count -= 1
+            heap_size = ends[count - 1] if count else 0
+        for name, filename in _FILES.items():
+            path = self.directory / filename
+            if path.exists():
+                os.truncate(path, count * _WIDTHS[name])
+        if heap.exists():
+            os.truncate(heap, heap_size)
+        return count
@@ -0,0 +1,473 @@
+"""
+Alert Bus - Asynchronous, coalescing delivery of parent alerts.
+
+ActivityMonitor.log_activity() hands ALERT and CRITICAL activities to an
+AlertBus instead of notifying parents inline. The bus queues them in a bounded
+asyncio queue and a single worker task delivers them:
+
+- Activities are coalesced per (user, activity type): the first one is sent
+  right away and opens a window of ``window`` seconds; the followers arriving
+  for the same key during the window are folded into one digest sent when it
+  closes. A burst of 500 blocked prompts becomes an immediate alert for the
+  first one and a digest with count=499.
+- CRITICAL activities are always sent right away, never held in a digest.
+- Activities already seen in the open window (same activity id) are dropped.
+- Each digest is sent to every sink (webhook, e-mail, callback, ...).
+
+Async producers get backpressure from publish(), which waits while the queue
+is full. publish_nowait() never blocks; it can be called from any thread and
+counts activities it has to drop. Delivery counters are in metrics().
+
+TODO: Implement the following functionality:
+- Per-parent notification preferences and quiet hours
+- Retrying failed deliveries with backoff
+"""
+
+import asyncio
+import inspect
+import logging
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from pydantic import BaseModel, Field
+
+from parent_ai_safety.core.providers import ConnectionPool
+from parent_ai_safety.monitoring.activity import Activity, ActivitySeverity, ActivityType
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW = 60.0
+DEFAULT_MAX_QUEUE = 10_000
+DEFAULT_SINK_TIMEOUT = 10.0
+# Activity ids listed in a digest.
+MAX_DIGEST_IDS = 20
+
+SEVERITY_ORDER: Dict[ActivitySeverity, int] = {
+    severity: rank for rank, severity in enumerate(ActivitySeverity)
+}
+
+AlertKey = Tuple[str, ActivityType]
+
+
+class Alert(BaseModel):
+    """Alert about one activity, or digest of the activities of one user and type in a window."""
+
+    user_id: str = Field(..., description="User the activities belong to")
+    activity_type: ActivityType = Field(..., description="Type of the activities")
+    severity: ActivitySeverity = Field(..., description="Highest severity in the digest")
+    count: int = Field(..., description="Number of distinct activities")
+    first_seen: datetime = Field(..., description="Timestamp of the earliest activity")
+    last_seen: datetime = Field(..., description="Timestamp of the latest activity")
+    activity_ids: List[str] = Field(
+        default_factory=list, description=f"First {MAX_DIGEST_IDS} activity ids"
+    )
+    details: Dict[str, Any] = Field(
+        default_factory=dict, description="Details of the first activity"
+    )
+
+    @property
+    def summary(self) -> str:
+        """One-line human-readable description."""
+        what = self.activity_type.value.replace("_", " ")
+        if self.count == 1:
+            return f"{self.severity.value.upper()}: {what} for {self.user_id}"
+        return f"{self.severity.value.upper()}: {self.count} x {what} for {self.user_id}"
+
+
+class AlertMetrics(BaseModel):
+    """Alert bus counters."""
+
+    published: int = Field(default=0, description="Activities accepted into the queue")
+    dropped: int = Field(default=0, description="Activities dropped (queue full or bus stopped)")
+    duplicates: int = Field(default=0, description="Activities already in an open digest")
+    coalesced: int = Field(default=0, description="Activities folded into an open digest")
+    alerts: int = Field(default=0, description="Alerts produced (immediate and digests)")
+    delivered: int = Field(default=0, description="Successful sink deliveries")
+    failed: int = Field(default=0, description="Failed sink deliveries")
+    queued: int = Field(default=0, description="Activities waiting in the queue")
+    open_windows: int = Field(default=0, description="Coalescing windows still open")
+
+
+class AlertSink(ABC):
+    """Destination of alerts."""
+
+    name = "sink"
+
+    @abstractmethod
+    async def send(self, alert: Alert) -> None:
+        """
+        Deliver an alert.
+
+        Raises:
+            Exception: If delivery failed
+        """
+
+
+class CallbackSink(AlertSink):
+    """Calls a function (sync or async) with each alert."""
+
+    name = "callback"
+
+    def __init__(self, callback: Callable[[Alert], Any]) -> None:
+        """
+        Initialize callback sink.
+
+        Args:
+            callback: Called with each alert; awaited if it returns an awaitable
+        """
+        self.callback = callback
+
+    async def send(self, alert: Alert) -> None:
+        """Call the callback."""
+        result = self.callback(alert)
+        if inspect.isawaitable(result):
+            await result
+
+
+class EmailSink(AlertSink):
+    """
+    Stand-in for e-mail notification.
+
+    Formats each alert as a message to ``recipient`` and hands it to
+    ``transport`` (e.g. a function sending it over SMTP). Without a transport
+    messages are only collected in ``outbox``.
+    """
+
+    name = "email"
+
+    def __init__(
+        self, recipient: str, transport: Optional[Callable[[str, str, str], Any]] = None
+    ) -> None:
+        """
+        Initialize e-mail sink.
+
+        Args:
+            recipient: Parent's e-mail address
+            transport: Called with (recipient, subject, body); blocking calls run
+                on the default executor
+        """
+        self.recipient = recipient
+        self.transport = transport
+        self.outbox: List[Tuple[str, str, str]] = []
+
+    async def send(self, alert: Alert) -> None:
+        """Format and send the message."""
+        body = (
+            f"{alert.summary}\n"
+            f"Between {alert.first_seen.isoformat()} and {alert.last_seen.isoformat()} UTC.\n"
+            f"Activities: {', '.join(alert.activity_ids)}"
+        )
+        message = (self.recipient, f"[Parent AI Safety] {alert.summary}", body)
+        if self.transport is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.transport, *message)
+        self.outbox.append(message)
+
+
+class WebhookSink(AlertSink):
+    """POSTs each alert as JSON to a URL over a keep-alive connection pool."""
+
+    name = "webhook"
+
+    def __init__(
+        self,
+        url: str,
+        pool: Optional[ConnectionPool] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = DEFAULT_SINK_TIMEOUT,
+    ) -> None:
+        """
+        Initialize webhook sink.
+
+        Args:
+            url: Endpoint receiving alerts
+            pool: Connection pool (a private one if None)
+            headers: Extra request headers (e.g. a signature or token)
+            timeout: Socket timeout in seconds
+        """
+        self.url = url
+        self.pool = pool or ConnectionPool()
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.timeout = timeout
+
+    async def send(self, alert: Alert) -> None:
+        """POST the alert; HTTP errors raise."""
+        body = alert.model_dump_json().encode("utf-8")
+        status, data = await asyncio.get_running_loop().run_in_executor(
+            None, self.pool.request, "POST", self.url, body, self.headers, self.timeout
+        )
+        if status >= 400:
+            raise RuntimeError(f"Webhook returned HTTP {status}: {data[:200]!r}")
+
+
+class _Digest:
+    """Open coalescing window of one (user, type) key and the followers it collected."""
+
+    __slots__ = ("deadline", "seen", "first", "severity", "ids", "first_seen", "last_seen")
+
+    def __init__(self, deadline: float) -> None:
+        self.deadline = deadline
+        self.seen: Set[str] = set()
+        self.first: Optional[Activity] = None
+        self.severity = ActivitySeverity.INFO
+        self.ids: Set[str] = set()
+        self.first_seen: Optional[datetime] = None
+        self.last_seen: Optional[datetime] = None
+
+    def mark_sent(self, activity: Activity) -> bool:
+        """Record an activity alerted on its own; False if it is a duplicate."""
+        if activity.activity_id in self.seen:
+            return False
+        self.seen.add(activity.activity_id)
+        return True
+
+    def add(self, activity: Activity) -> bool:
+        """Fold an activity in; False if it is a duplicate."""
+        if not self.mark_sent(activity):
+            return False
+        self.ids.add(activity.activity_id)
+        if self.first is None or self.first_seen is None or self.last_seen is None:
+            self.first = activity
+            self.first_seen = self.last_seen = activity.timestamp
+        else:
+            self.first_seen = min(self.first_seen, activity.timestamp)
+            self.last_seen = max(self.last_seen, activity.timestamp)
+        if SEVERITY_ORDER[activity.severity] > SEVERITY_ORDER[self.severity]:
+            self.severity = activity.severity
+        return True
+
+    def alert(self) -> Optional[Alert]:
+        """Return the digest of the followers, or None if there were none."""
+        if self.first is None or self.first_seen is None or self.last_seen is None:
+            return None
+        return Alert(
+            user_id=self.first.user_id,
+            activity_type=self.first.activity_type,
+            severity=self.severity,
+            count=len(self.ids),
+            first_seen=self.first_seen,
+            last_seen=self.last_seen,
+            activity_ids=sorted(self.ids)[:MAX_DIGEST_IDS],
+            details=dict(self.first.details),
+        )
+
+
+def _single_alert(activity: Activity) -> Alert:
+    """Alert about one activity."""
+    return Alert(
+        user_id=activity.user_id,
+        activity_type=activity.activity_type,
+        severity=activity.severity,
+        count=1,
+        first_seen=activity.timestamp,
+        last_seen=activity.timestamp,
+        activity_ids=[activity.activity_id],
+        details=dict(activity.details),
+    )
+
+
+class AlertBus:
+    """
+    Bounded, coalescing alert queue with a single delivery worker.
+
+    Start it with start() (or ``async with``) on the event loop that should
+    run deliveries; aclose() delivers what is pending and stops the worker.
+    """
+
+    def __init__(
+        self,
+        sinks: Sequence[AlertSink],
+        window: float = DEFAULT_WINDOW,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        sink_timeout: float = DEFAULT_SINK_TIMEOUT,
+    ) -> None:
+        """
+        Initialize alert bus.
+
+        Args:
+            sinks: Destinations every alert is sent to
+            window: Seconds the followers of an alert (same user and type)
+                are coalesced into a digest
+            max_queue: Bound of the activity queue
+            sink_timeout: Seconds before a sink delivery counts as failed
+        """
+        self.sinks = list(sinks)
+        self.window = window
+        self.max_queue = max_queue
+        self.sink_timeout = sink_timeout
+        self.sink_failures: Dict[str, int] = {}
+        self._metrics = AlertMetrics()
+        self._digests: Dict[AlertKey, _Digest] = {}
+        self._queue: Optional[asyncio.Queue[Activity]] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._worker: Optional[asyncio.Task[None]] = None
+        self._lock = threading.Lock()
+
+    async def __aenter__(self) -> "AlertBus":
+        """Start the delivery worker."""
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        """Deliver pending alerts and stop."""
+        await self.aclose()
+
+    def start(self) -> None:
+        """Start the delivery worker on the running event loop."""
+        if self._worker is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._worker = self._loop.create_task(self._run(self._queue))
+
+    async def aclose(self) -> None:
+        """Drain the queue, send every open digest now and stop the worker."""
+        if self._worker is None or self._queue is None:
+            return
+        await self._queue.join()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        self._queue = None
+        self._loop = None
+        await self._flush(None)
+
+    async def publish(self, activity: Activity) -> None:
+        """
+        Queue an activity, waiting while the queue is full.
+
+        Must be awaited on the bus's event loop.
+
+        Raises:
+            RuntimeError: If the bus is not started
+        """
+        if self._queue is None:
+            raise RuntimeError("AlertBus is not started")
+        await self._queue.put(activity)
+        self._count("published")
+
+    def publish_nowait(self, activity: Activity) -> bool:
+        """
+        Queue an activity without blocking; callable from any thread.
+
+        Args:
+            activity: Activity to alert about
+
+        Returns:
+            False if it was dropped because the bus is stopped or the queue is
+            full (from other threads a full queue is only noticed later, and
+            counted in metrics)
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            self._count("dropped")
+            logger.warning("AlertBus is not running; dropped alert %s", activity.activity_id)
+            return False
+        if threading.get_ident() == self._loop_thread:
+            return self._offer(activity)
+        loop.call_soon_threadsafe(self._offer, activity)
+        return True
+
+    def metrics(self) -> AlertMetrics:
+        """Return a snapshot of the delivery counters."""
+        with self._lock:
+            metrics = self._metrics.model_copy()
+        metrics.queued = self._queue.qsize() if self._queue is not None else 0
+        metrics.open_windows = len(self._digests)
+        return metrics
+
+    def _offer(self, activity: Activity) -> bool:
+        queue = self._queue
+        if queue is None:
+            self._count("dropped")
+            return False
+        try:
+            queue.put_nowait(activity)
+        except asyncio.QueueFull:
+            self._count("dropped")
+            return False
+        self._count("published")
+        return True
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self._metrics, name, getattr(self._metrics, name) + amount)
+
+    async def _run(self, queue: "asyncio.Queue[Activity]") -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            timeout = None
+            if self._digests:
+                deadline = min(digest.deadline for digest in self._digests.values())
+                timeout = max(deadline - loop.time(), 0.0)
+            try:
+                activity = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                await self._flush(loop.time())
+                continue
+            # Coalesce everything already queued before checking deadlines, so
+            # a backlog is not split into several digests.
+            batch = [activity]
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            now = loop.time()
+            immediate = [
+                alert for alert in (self._coalesce(activity, now) for activity in batch) if alert
+            ]
+            # Marked done only after delivery so aclose() never cancels a send.
+            try:
+                for alert in immediate:
+                    self._count("alerts")
+                    await self._deliver(alert)
+                await self._flush(loop.time())
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    def _coalesce(self, activity: Activity, now: float) -> Optional[Alert]:
+        """Fold an activity into its key's window; return an alert to send right away."""
+        key = (activity.user_id, activity.activity_type)
+        digest = self._digests.get(key)
+        if digest is None:
+            digest = self._digests[key] = _Digest(now + self.window)
+            digest.mark_sent(activity)
+            return _single_alert(activity)
+        if activity.severity == ActivitySeverity.CRITICAL:
+            if digest.mark_sent(activity):
+                return _single_alert(activity)
+        elif digest.add(activity):
+            self._count("coalesced")
+            return None
+        self._count("duplicates")
+        return None
+
+    async def _flush(self, now: Optional[float]) -> None:
+        """Close windows that are due (all if now is None) and send their digests."""
+        due = [
+            key for key, digest in self._digests.items() if now is None or digest.deadline <= now
+        ]
+        for key in due:
+            alert = self._digests.pop(key).alert()
+            if alert is None:
+                continue
+            self._count("alerts")
+            await self._deliver(alert)
+
+    async def _deliver(self, alert: Alert) -> None:
+        for sink in self.sinks:
+            try:
+                await asyncio.wait_for(sink.send(alert), self.sink_timeout)
+            except Exception:
+                # One failing sink must not keep the others from delivering.
+                logger.exception("Alert delivery to %s failed", sink.name)
+                self._count("failed")
+                with self._lock:
+                    self.sink_failures[sink.name] = self.sink_failures.get(sink.name, 0) + 1
+            else:
+                self._count("delivered")
@@ -1,21 +1,57 @@
 """
 Audit Logger - Comprehensive tamper-proof logging of all system operations.
 
+Entries form a hash chain: each entry stores the hash of the previous entry
+and its own hash over its content and that link. The chain is cut into
+segments (every ``segment_size`` entries or ``segment_interval``, whichever
+comes first) and only each segment's checkpoint is signed with Ed25519, which
+keeps log() cheap while still making any modification, insertion, removal or
+reordering of sealed entries detectable.
+
+With a Journal, entries and checkpoints are journaled as they are created and
+replayed on startup. Pass the original signing key when reopening so that
+replayed checkpoints verify. If a journal commit fails, the entries and
+checkpoints it lost are dropped from memory again, so the chain always matches
+what a restart would replay, and the error is kept in ``journal_error``.
+
 TODO: Implement the following functionality:
-- Tamper-proof audit log storage
-- Cryptographic signing of log entries
 - Complete audit trail of all operations
 - Log export and archiving
 - Compliance reporting (COPPA, GDPR, etc.)
 - Log retention policies
 """
 
-from datetime import datetime
+import base64
+import hashlib
+import json
+import threading
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives.asymmetric.ed25519 import (
+    Ed25519PrivateKey,
+    Ed25519PublicKey,
+)
+from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
 from pydantic import BaseModel, Field
 
+from parent_ai_safety.monitoring.audit_index import AuditIndex
+from parent_ai_safety.monitoring.journal import Journal
+
+# Hash that the first entry of the log links to.
+GENESIS_HASH = "0" * 64
+
+DEFAULT_SEGMENT_SIZE = 1000
+DEFAULT_SEGMENT_INTERVAL = timedelta(seconds=1)
+
+# Journal record kinds.
+JOURNAL_ENTRY = "audit.entry"
+JOURNAL_CHECKPOINT = "audit.checkpoint"
+
 
 class AuditEventType(str, Enum):
     """Types of events to audit."""
@@ -38,26 +74,74 @@ class AuditEntry(BaseModel):
     action: str = Field(..., description="Action performed")
     details: Dict[str, Any] = Field(default_factory=dict, description="Event details")
     ip_address: Optional[str] = Field(None, description="Source IP address")
-    signature: Optional[str] = Field(None, description="Cryptographic signature")
+    previous_hash: Optional[str] = Field(None, description="Hash of the previous entry")
+    entry_hash: Optional[str] = Field(None, description="Hash of this entry and its link")
+    signature: Optional[str] = Field(
+        None, description="Checkpoint signature (last entry of each sealed segment)"
+    )
+
+
+class AuditCheckpoint(BaseModel):
+    """Signed checkpoint sealing one segment of the hash chain."""
+
+    segment: int = Field(..., description="Segment number, starting at 0")
+    start: int = Field(..., description="Index of the first entry in the segment")
+    end: int = Field(..., description="Index one past the last entry in the segment")
+    head_hash: str = Field(..., description="Hash of the last entry in the segment")
+    sealed_at: datetime = Field(default_factory=datetime.utcnow, description="Seal time")
+    signature: str = Field(..., description="Base64 Ed25519 signature of the checkpoint")
+
+    def message(self) -> bytes:
+        """Bytes covered by the checkpoint signature."""
+        return f"{self.segment}:{self.start}:{self.end}:{self.head_hash}".encode()
 
 
 class AuditLogger:
     """
     Comprehensive audit logging system.
 
+    Entries are also kept in a time-partitioned AuditIndex so that queries do
+    not scan the whole log.
+
     TODO: Implement:
-    - log() method to create audit entries
-    - get_logs() to retrieve audit history
     - export_logs() for compliance reporting
-    - verify_integrity() to check log tampering
     - archive_logs() for long-term storage
-    - Cryptographic signing of entries
     - Secure storage mechanisms
     """
 
-    def __init__(self) -> None:
-        """Initialize audit logger."""
+    def __init__(
+        self,
+        signing_key: Optional[Ed25519PrivateKey] = None,
+        segment_size: int = DEFAULT_SEGMENT_SIZE,
+        segment_interval: timedelta = DEFAULT_SEGMENT_INTERVAL,
+        journal: Optional[Journal] = None,
+    ) -> None:
+        """
+        Initialize audit logger.
+
+        Args:
+            signing_key: Key used to sign checkpoints; a new key is generated if None
+            segment_size: Maximum number of entries per signed segment
+            segment_interval: Maximum age of an open segment before it is sealed
+            journal: Write-ahead journal; its entries and checkpoints are replayed
+        """
         self.entries: List[AuditEntry] = []
+        self.checkpoints: List[AuditCheckpoint] = []
+        self.signing_key = signing_key or Ed25519PrivateKey.generate()
+        self.segment_size = segment_size
+        self.segment_interval = segment_interval
+        self._segment_opened_at: Optional[datetime] = None
+        self._index = AuditIndex()
+        self._lock = threading.Lock()
+        self.journal = journal
+        self.journal_error: Optional[BaseException] = None
+        if journal is not None:
+            self._replay(journal)
+
+    @property
+    def public_key(self) -> Ed25519PublicKey:
+        """Public key that verifies checkpoint signatures."""
+        return self.signing_key.public_key()
 
     def log(
         self,
@@ -65,26 +149,144 @@ class AuditLogger:
         action: str,
         user_id: Optional[str] = None,
         details: Optional[Dict[str, Any]] = None,
+        durable: bool = False,
     ) -> AuditEntry:
         """
         Create an audit log entry.
 
-        TODO: Implement audit logging
-        - Generate unique entry ID
-        - Capture complete event details
-        - Sign entry cryptographically
-        - Store in tamper-proof manner
+        The entry is linked into the hash chain. Signing happens only when the
+        open segment is sealed, once per segment rather than once per entry.
 
         Args:
             event_type: Type of event
             action: Action performed
             user_id: User who performed action
             details: Additional event details
+            durable: Wait until the entry is committed to the journal
 
         Returns:
             Created audit entry
+
+        Raises:
+            OSError: If the journal has failed, or if durable and the journal
+                commit failed (the entry is then removed from the log again)
+        """
+        entry = AuditEntry(
+            entry_id=uuid.uuid4().hex,
+            event_type=event_type,
+            user_id=user_id,
+            action=action,
+            details=details or {},
+        )
+        with self._lock:
+            entry.previous_hash = self.entries[-1].entry_hash if self.entries else GENESIS_HASH
+            entry.entry_hash = entry_digest(entry)
+            # Journaled under the lock so the journal keeps chain order.
+            committed = self._journal(
+                JOURNAL_ENTRY,
+                entry.model_dump(mode="json"),
+                len(self.entries),
+                len(self.checkpoints),
+            )
+            self.entries.append(entry)
+            self._index.add(entry)
+            if self._segment_opened_at is None:
+                self._segment_opened_at = entry.timestamp
+            if (
+                len(self.entries) - self._sealed_count >= self.segment_size
+                or entry.timestamp - self._segment_opened_at >= self.segment_interval
+            ):
+                self._seal()
+        if durable and committed is not None:
+            committed.result()
+        return entry
+
+    def seal(self) -> Optional[AuditCheckpoint]:
         """
-        raise NotImplementedError("Audit logging not yet implemented")
+        Seal the open segment now, e.g. before shutdown or export.
+
+        Returns:
+            The new checkpoint, or None if there were no unsealed entries
+        """
+        with self._lock:
+            return self._seal()
+
+    @property
+    def _sealed_count(self) -> int:
+        return self.checkpoints[-1].end if self.checkpoints else 0
+
+    def _seal(self) -> Optional[AuditCheckpoint]:
+        start, end = self._sealed_count, len(self.entries)
+        if start == end:
+            return None
+        head = self.entries[-1]
+        checkpoint = AuditCheckpoint(
+            segment=len(self.checkpoints),
+            start=start,
+            end=end,
+            head_hash=head.entry_hash or "",
+            signature="",
+        )
+        checkpoint.signature = base64.b64encode(
+            self.signing_key.sign(checkpoint.message())
+        ).decode()
+        head.signature = checkpoint.signature
+        self.checkpoints.append(checkpoint)
+        self._segment_opened_at = None
+        self._journal(
+            JOURNAL_CHECKPOINT, checkpoint.model_dump(mode="json"), end, checkpoint.segment
+        )
+        return checkpoint
+
+    def _journal(
+        self, kind: str, record: Dict[str, Any], entries: int, checkpoints: int
+    ) -> Optional["Future[None]"]:
+        """
+        Journal a record added to a log of ``entries`` entries and ``checkpoints`` checkpoints.
+
+        If its commit fails, the log is rolled back to that size.
+        """
+        if self.journal is None:
+            return None
+        return self.journal.append(
+            kind, record, lambda future: self._journal_failed(future, entries, checkpoints)
+        )
+
+    def _journal_failed(self, future: "Future[None]", entries: int, checkpoints: int) -> None:
+        """Drop entries and checkpoints whose journal commit failed."""
+        error = future.exception()
+        if error is None:
+            return
+        with self._lock:
+            if self.journal_error is None:
+                self.journal_error = error
+            if entries >= len(self.entries) and checkpoints >= len(self.checkpoints):
+                return
+            del self.checkpoints[checkpoints:]
+            while self.checkpoints and self.checkpoints[-1].end > entries:
+                self.checkpoints.pop()
+            del self.entries[entries:]
+            for entry in self.entries[self._sealed_count :]:
+                entry.signature = None
+            self._index = AuditIndex()
+            for entry in self.entries:
+                self._index.add(entry)
+            unsealed = self.entries[self._sealed_count :]
+            self._segment_opened_at = unsealed[0].timestamp if unsealed else None
+
+    def _replay(self, journal: Journal) -> None:
+        """Rebuild entries, checkpoints and the index from the journal."""
+        for kind, record in journal.replay((JOURNAL_ENTRY, JOURNAL_CHECKPOINT)):
+            if kind == JOURNAL_ENTRY:
+                entry = AuditEntry.model_validate(record)
+                self.entries.append(entry)
+                self._index.add(entry)
+            else:
+                checkpoint = AuditCheckpoint.model_validate(record)
+                self.checkpoints.append(checkpoint)
+                self.entries[checkpoint.end - 1].signature = checkpoint.signature
+        if len(self.entries) > self._sealed_count:
+            self._segment_opened_at = self.entries[self._sealed_count].timestamp
 
     def get_logs(
         self,
@@ -96,33 +298,142 @@ class AuditLogger:
         """
         Retrieve audit logs with filtering.
 
-        TODO: Implement log retrieval
-        - Filter by time range
-        - Filter by event type
-        - Filter by user
-        - Return matching entries
+        Args:
+            start_time: Start of time range (inclusive)
+            end_time: End of time range (inclusive)
+            event_type: Event type filter
+            user_id: User filter
+
+        Returns:
+            List of matching audit entries in timestamp order
+        """
+        return list(self.iter_logs(start_time, end_time, event_type, user_id))
+
+    def iter_logs(
+        self,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        event_type: Optional[AuditEventType] = None,
+        user_id: Optional[str] = None,
+    ) -> Iterator[AuditEntry]:
+        """
+        Lazily iterate over matching audit logs.
+
+        Same filters as get_logs(), without materializing the result; use it
+        for large compliance exports.
 
         Args:
-            start_time: Start of time range
-            end_time: End of time range
+            start_time: Start of time range (inclusive)
+            end_time: End of time range (inclusive)
             event_type: Event type filter
             user_id: User filter
 
         Returns:
-            List of matching audit entries
+            Iterator over matching audit entries in timestamp order
         """
-        raise NotImplementedError("Log retrieval not yet implemented")
+        return self._index.query(start_time, end_time, event_type, user_id)
 
-    def verify_integrity(self) -> bool:
+    def verify_integrity(
+        self,
+        public_key: Optional[Ed25519PublicKey] = None,
+        workers: Optional[int] = None,
+    ) -> bool:
         """
         Verify integrity of audit log.
 
-        TODO: Implement integrity verification
-        - Verify cryptographic signatures
-        - Check for missing entries
-        - Detect tampering attempts
+        Every segment is checked independently: entry hashes are recomputed,
+        links inside the segment are followed and the checkpoint signature is
+        verified. Segments can therefore be checked in parallel; the links
+        between segments are checked afterwards from the stored hashes.
+        Entries after the last checkpoint are chain-checked but unsigned.
+
+        Args:
+            public_key: Trusted key to verify checkpoints (defaults to own key)
+            workers: Number of processes to verify segments on (in-process if None)
 
         Returns:
             True if log is intact, False if tampered
         """
-        raise NotImplementedError("Integrity verification not yet implemented")
+        with self._lock:
+            entries = list(self.entries)
+            checkpoints = list(self.checkpoints)
+        key_bytes = (public_key or self.public_key).public_bytes(Encoding.Raw, PublicFormat.Raw)
+
+        jobs: List[Tuple[List[Dict[str, Any]], Optional[str], Optional[bytes], bytes]] = []
+        previous_end = 0
+        for checkpoint in checkpoints:
+            if checkpoint.start != previous_end or checkpoint.end > len(entries):
+                return False
+            previous_end = checkpoint.end
+            jobs.append(
+                (
+                    _payloads(entries[checkpoint.start : checkpoint.end]),
+                    checkpoint.head_hash,
+                    checkpoint.message(),
+                    base64.b64decode(checkpoint.signature),
+                )
+            )
+        if previous_end < len(entries):
+            jobs.append((_payloads(entries[previous_end:]), None, None, b""))
+
+        # Links between segments, from the stored hashes.
+        expected = GENESIS_HASH
+        for payloads, _, _, _ in jobs:
+            if payloads[0].get("previous_hash") != expected:
+                return False
+            expected = payloads[-1].get("entry_hash") or ""
+
+        args = [(key_bytes, *job) for job in jobs]
+        if workers and workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                return all(pool.map(_verify_segment_args, args))
+        return all(_verify_segment_args(arg) for arg in args)
+
+
+def entry_digest(entry: AuditEntry) -> str:
+    """Compute the chain hash of an entry from its content and previous_hash."""
+    return _payload_digest(entry.model_dump(mode="json"))
+
+
+def _payloads(entries: List[AuditEntry]) -> List[Dict[str, Any]]:
+    return [entry.model_dump(mode="json") for entry in entries]
+
+
+def _payload_digest(payload: Dict[str, Any]) -> str:
+    content = {
+        key: value for key, value in payload.items() if key not in ("entry_hash", "signature")
+    }
+    canonical = json.dumps(content, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _verify_segment_args(
+    args: Tuple[bytes, List[Dict[str, Any]], Optional[str], Optional[bytes], bytes],
+) -> bool:
+    return _verify_segment(*args)
+
+
+def _verify_segment(
+    key_bytes: bytes,
+    payloads: List[Dict[str, Any]],
+    head_hash: Optional[str],
+    message: Optional[bytes],
+    signature: bytes,
+) -> bool:
+    """Verify one segment's hashes, internal links and checkpoint signature."""
+    previous = payloads[0].get("previous_hash")
+    for payload in payloads:
+        if payload.get("previous_hash") != previous:
+            return False
+        if _payload_digest(payload) != payload.get("entry_hash"):
+            return False
+        previous = payload["entry_hash"]
+    if message is None:
+        return True
+    if previous != head_hash:
+        return False
+    try:
+        Ed25519PublicKey.from_public_bytes(key_bytes).verify(signature, message)
+    except InvalidSignature:
+        return False
+    return True
@@ -0,0 +1,121 @@
+"""
+Audit Index - Time-partitioned, indexed storage for audit log queries.
+
+Entries are partitioned by UTC day. Every partition keeps its entries sorted by
+timestamp, plus secondary runs per user, per event type and per (user, event
+type) pair. A query visits only the partitions overlapping its time range,
+picks the narrowest run matching its filters and binary-searches the range
+inside it, so it costs O(log n + k) for k results.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from parent_ai_safety.monitoring.audit import AuditEntry, AuditEventType
+
+
+class _Run:
+    """Entries sorted by timestamp, with a parallel list of timestamps."""
+
+    __slots__ = ("timestamps", "entries")
+
+    def __init__(self) -> None:
+        self.timestamps: List[datetime] = []
+        self.entries: List[AuditEntry] = []
+
+    def add(self, entry: "AuditEntry") -> None:
+        if not self.timestamps or entry.timestamp >= self.timestamps[-1]:
+            self.timestamps.append(entry.timestamp)
+            self.entries.append(entry)
+            return
+        # Out-of-order entries are rare (clock adjustments, replays).
+        position = bisect_right(self.timestamps, entry.timestamp)
+        insort(self.timestamps, entry.timestamp)
+        self.entries.insert(position, entry)
+
+    def between(self, start: Optional[datetime], end: Optional[datetime]) -> Iterator["AuditEntry"]:
+        low = 0 if start is None else bisect_left(self.timestamps, start)
+        high = len(self.timestamps) if end is None else bisect_right(self.timestamps, end)
+        for position in range(low, high):
+            yield self.entries[position]
+
+
+class _Partition:
+    """All entries of one UTC day."""
+
+    __slots__ = ("all", "by_user", "by_type", "by_user_type")
+
+    def __init__(self) -> None:
+        self.all = _Run()
+        self.by_user: Dict[str, _Run] = {}
+        self.by_type: Dict[AuditEventType, _Run] = {}
+        self.by_user_type: Dict[Tuple[str, AuditEventType], _Run] = {}
+
+    def add(self, entry: "AuditEntry") -> None:
+        self.all.add(entry)
+        self.by_type.setdefault(entry.event_type, _Run()).add(entry)
+        if entry.user_id is not None:
+            self.by_user.setdefault(entry.user_id, _Run()).add(entry)
+            key = (entry.user_id, entry.event_type)
+            self.by_user_type.setdefault(key, _Run()).add(entry)
+
+    def run(self, event_type: Optional["AuditEventType"], user_id: Optional[str]) -> Optional[_Run]:
+        if user_id is not None and event_type is not None:
+            return self.by_user_type.get((user_id, event_type))
+        if user_id is not None:
+            return self.by_user.get(user_id)
+        if event_type is not None:
+            return self.by_type.get(event_type)
+        return self.all
+
+
+class AuditIndex:
+    """Time-partitioned audit entry store with secondary indexes."""
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self._partitions: Dict[int, _Partition] = {}
+        self._keys: List[int] = []
+
+    def __len__(self) -> int:
+        """Return the number of indexed entries."""
+        return sum(len(partition.all.entries) for partition in self._partitions.values())
+
+    def add(self, entry: "AuditEntry") -> None:
+        """Index an entry."""
+        key = entry.timestamp.toordinal()
+        partition = self._partitions.get(key)
+        if partition is None:
+            partition = self._partitions[key] = _Partition()
+            insort(self._keys, key)
+        partition.add(entry)
+
+    def query(
+        self,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        event_type: Optional["AuditEventType"] = None,
+        user_id: Optional[str] = None,
+    ) -> Iterator["AuditEntry"]:
+        """
+        Lazily yield matching entries in timestamp order.
+
+        Args:
+            start_time: Inclusive start of time range
+            end_time: Inclusive end of time range
+            event_type: Event type filter
+            user_id: User filter
+
+        Yields:
+            Matching audit entries
+        """
+        low = 0 if start_time is None else bisect_left(self._keys, start_time.toordinal())
+        high = (
+            len(self._keys) if end_time is None else bisect_right(self._keys, end_time.toordinal())
+        )
+        for key in self._keys[low:high]:
+            run = self._partitions[key].run(event_type, user_id)
+            if run is not None:
+                yield from run.between(start_time, end_time)
@@ -0,0 +1,310 @@
+"""
+Activity Baselines - Online per-user statistics and streaming anomaly detectors.
+
+Every logged activity updates its user's baseline in constant time:
+- Activities per hour: Welford mean/variance over all hours since the user's
+  first activity (hours without activity count as zeros), plus an EWMA
+- Hour-of-day histogram
+- Share of BLOCKED_CONTENT activities: long-run mean plus a short-term EWMA
+
+Detectors evaluate each activity against the baseline as it arrives:
+- RATE_ZSCORE: the current hour's count exceeds the mean by z_score deviations
+- RATE_CUSUM: a one-sided CUSUM of hourly counts signals a sustained increase
+- UNUSUAL_HOUR: activity at an hour of day the user is rarely active
+- BLOCKED_RATIO: the recent share of blocked content far exceeds the norm
+
+Activities arriving for an hour that was already closed (out of order) update
+the histogram and blocked share but not the hourly rate.
+"""
+
+import math
+import threading
+from collections import deque
+from enum import Enum
+from typing import Deque, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from parent_ai_safety.monitoring.activity import (
+    ANOMALY_Z_SCORE,
+    MIN_BASELINE_HOURS,
+    Activity,
+    ActivityType,
+    hour_index,
+)
+from parent_ai_safety.monitoring.activity_store import (
+    MICROS_PER_HOUR,
+    TYPE_CODES,
+    ColumnarActivityStore,
+)
+
+DEFAULT_EWMA_ALPHA = 0.1
+# CUSUM slack and decision threshold, in standard deviations of hourly counts.
+CUSUM_SLACK = 0.5
+CUSUM_THRESHOLD = 5.0
+# Hours of day holding less than this share of a user's activity are unusual.
+UNUSUAL_HOUR_SHARE = 0.01
+MIN_HOUR_SAMPLES = 100
+MIN_BLOCKED_SAMPLES = 50
+DEFAULT_MAX_FLAGGED = 1000
+
+_BLOCKED_CODE = TYPE_CODES[ActivityType.BLOCKED_CONTENT]
+
+
+class AnomalyDetector(str, Enum):
+    """Streaming anomaly detectors."""
+
+    RATE_ZSCORE = "rate_zscore"
+    RATE_CUSUM = "rate_cusum"
+    UNUSUAL_HOUR = "unusual_hour"
+    BLOCKED_RATIO = "blocked_ratio"
+
+
+class Anomaly(BaseModel):
+    """An activity flagged by a detector."""
+
+    activity: Activity = Field(..., description="The anomalous activity")
+    detector: AnomalyDetector = Field(..., description="Detector that flagged it")
+    score: float = Field(..., description="Detector statistic (e.g. z-score)")
+
+
+class BaselineSnapshot(BaseModel):
+    """Current baseline statistics of a user."""
+
+    user_id: str = Field(..., description="User identifier")
+    hours: int = Field(..., description="Completed hours in the baseline")
+    rate_mean: float = Field(..., description="Mean activities per hour")
+    rate_std: float = Field(..., description="Standard deviation of activities per hour")
+    rate_ewma: float = Field(..., description="Exponentially weighted activities per hour")
+    blocked_ratio: float = Field(..., description="Long-run share of blocked content")
+    blocked_ewma: float = Field(..., description="Recent share of blocked content")
+    hour_of_day: List[int] = Field(..., description="Activity count per UTC hour of day")
+
+
+class RunningStats:
+    """Welford mean/variance and EWMA mean/variance of a stream of values."""
+
+    __slots__ = ("alpha", "count", "mean", "m2", "ewma", "ewvar")
+
+    def __init__(self, alpha: float = DEFAULT_EWMA_ALPHA) -> None:
+        self.alpha = alpha
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.ewma = 0.0
+        self.ewvar = 0.0
+
+    @property
+    def std(self) -> float:
+        """Population standard deviation."""
+        return math.sqrt(self.m2 / self.count) if self.count else 0.0
+
+    def add(self, value: float, repeat: int = 1) -> None:
+        """Add a value ``repeat`` times in O(1)."""
+        if repeat <= 0:
+            return
+        if not self.count:
+            self.ewma = value
+        total = self.count + repeat
+        delta = value - self.mean
+        self.mean += delta * repeat / total
+        self.m2 += delta * delta * self.count * repeat / total
+        self.count = total
+        # Closed form of ``repeat`` EWMA steps towards the same value.
+        decay = (1 - self.alpha) ** repeat
+        ewma_delta = value - self.ewma
+        self.ewvar = decay * (self.ewvar + ewma_delta * ewma_delta * (1 - decay))
+        self.ewma = value - ewma_delta * decay
+
+
+class _UserBaseline:
+    """Streaming state of one user."""
+
+    __slots__ = ("rate", "hour", "hour_count", "cusum", "hours_of_day", "blocked", "flagged")
+
+    def __init__(self, alpha: float, max_flagged: int) -> None:
+        self.rate = RunningStats(alpha)
+        self.hour = -1
+        self.hour_count = 0
+        self.cusum = 0.0
+        self.hours_of_day = [0] * 24
+        self.blocked = RunningStats(alpha)
+        self.flagged: Deque[Anomaly] = deque(maxlen=max_flagged)
+
+
+class ActivityBaselines:
+    """
+    Per-user online baselines and streaming anomaly detection.
+
+    observe() costs O(1) per activity whatever the history length. The most
+    recent max_flagged anomalies are kept per user. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        alpha: float = DEFAULT_EWMA_ALPHA,
+        z_score: float = ANOMALY_Z_SCORE,
+        max_flagged: int = DEFAULT_MAX_FLAGGED,
+    ) -> None:
+        """
+        Initialize empty baselines.
+
+        Args:
+            alpha: EWMA smoothing factor
+            z_score: Deviations above the mean flagged by the z-score detectors
+            max_flagged: Anomalies kept per user
+        """
+        self.alpha = alpha
+        self.z_score = z_score
+        self.max_flagged = max_flagged
+        self._users: Dict[str, _UserBaseline] = {}
+        self._lock = threading.Lock()
+
+    def users(self) -> List[str]:
+        """Return the users with a baseline."""
+        with self._lock:
+            return list(self._users)
+
+    def observe(self, activity: Activity) -> List[Anomaly]:
+        """
+        Update the user's baseline with an activity and run the detectors.
+
+        Args:
+            activity: Newly logged activity
+
+        Returns:
+            Anomalies raised by the activity (usually none)
+        """
+        hour = hour_index(activity.timestamp)
+        blocked = activity.activity_type == ActivityType.BLOCKED_CONTENT
+        with self._lock:
+            baseline = self._user(activity.user_id)
+            hits = self._update(baseline, hour, blocked)
+            anomalies = [
+                Anomaly(activity=activity, detector=detector, score=score)
+                for detector, score in hits
+            ]
+            baseline.flagged.extend(anomalies)
+        return anomalies
+
+    def backfill(self, store: ColumnarActivityStore) -> None:
+        """
+        Build baselines from every activity already in a columnar store.
+
+        Args:
+            store: Store to read; only flagged rows are materialized
+        """
+        columns = store.columns()
+        with self._lock:
+            for row in range(columns.rows):
+                baseline = self._user(store.user_id(columns.users[row]))
+                hits = self._update(
+                    baseline,
+                    columns.timestamps[row] // MICROS_PER_HOUR,
+                    columns.types[row] == _BLOCKED_CODE,
+                )
+                if hits:
+                    activity = store.activity(row)
+                    baseline.flagged.extend(
+                        Anomaly(activity=activity, detector=detector, score=score)
+                        for detector, score in hits
+                    )
+
+    def flagged(self, user_id: str) -> List[Anomaly]:
+        """Return a user's retained anomalies, oldest first."""
+        with self._lock:
+            baseline = self._users.get(user_id)
+            return list(baseline.flagged) if baseline is not None else []
+
+    def snapshot(self, user_id: str) -> Optional[BaselineSnapshot]:
+        """
+        Return a user's current baseline statistics.
+
+        Args:
+            user_id: User identifier
+
+        Returns:
+            Snapshot, or None if the user has no activity
+        """
+        with self._lock:
+            baseline = self._users.get(user_id)
+            if baseline is None:
+                return None
+            return BaselineSnapshot(
+                user_id=user_id,
+                hours=baseline.rate.count,
+                rate_mean=baseline.rate.mean,
+                rate_std=baseline.rate.std,
+                rate_ewma=baseline.rate.ewma,
+                blocked_ratio=baseline.blocked.mean,
+                blocked_ewma=baseline.blocked.ewma,
+                hour_of_day=list(baseline.hours_of_day),
+            )
+
+    def _user(self, user_id: str) -> _UserBaseline:
+        baseline = self._users.get(user_id)
+        if baseline is None:
+            baseline = self._users[user_id] = _UserBaseline(self.alpha, self.max_flagged)
+        return baseline
+
+    def _update(
+        self, baseline: _UserBaseline, hour: int, blocked: bool
+    ) -> List[Tuple[AnomalyDetector, float]]:
+        hits: List[Tuple[AnomalyDetector, float]] = []
+        if hour > baseline.hour:
+            self._advance(baseline, hour)
+        if hour == baseline.hour:
+            baseline.hour_count += 1
+            self._check_rate(baseline, hits)
+
+        hours_of_day = baseline.hours_of_day
+        # The blocked-share stats count every activity of the user.
+        total = baseline.blocked.count
+        if total >= MIN_HOUR_SAMPLES and hours_of_day[hour % 24] < UNUSUAL_HOUR_SHARE * total:
+            hits.append((AnomalyDetector.UNUSUAL_HOUR, hours_of_day[hour % 24] / total))
+        hours_of_day[hour % 24] += 1
+
+        ratio = baseline.blocked
+        norm = max(ratio.mean, 1 / max(ratio.count, 1))
+        ratio.add(1.0 if blocked else 0.0)
+        if blocked and ratio.count > MIN_BLOCKED_SAMPLES:
+            # Steady-state deviation of an EWMA of Bernoulli(norm) samples.
+            deviation = math.sqrt(norm * (1 - norm) * self.alpha / (2 - self.alpha))
+            if deviation and ratio.ewma > norm + self.z_score * deviation:
+                hits.append((AnomalyDetector.BLOCKED_RATIO, (ratio.ewma - norm) / deviation))
+        return hits
+
+    @staticmethod
+    def _advance(baseline: _UserBaseline, hour: int) -> None:
+        """Close the current hour and the empty hours before ``hour``."""
+        rate = baseline.rate
+        if baseline.hour >= 0:
+            reference = rate.mean + CUSUM_SLACK * max(rate.std, 1.0)
+            if rate.count:
+                baseline.cusum = max(0.0, baseline.cusum + baseline.hour_count - reference)
+                if baseline.cusum > CUSUM_THRESHOLD * max(rate.std, 1.0):
+                    # The shift was signalled during the hour; start over.
+                    baseline.cusum = 0.0
+            rate.add(baseline.hour_count)
+            gap = hour - baseline.hour - 1
+            if gap > 0:
+                reference = rate.mean + CUSUM_SLACK * max(rate.std, 1.0)
+                baseline.cusum = max(0.0, baseline.cusum - gap * reference)
+                rate.add(0.0, gap)
+        baseline.hour = hour
+        baseline.hour_count = 0
+
+    def _check_rate(
+        self, baseline: _UserBaseline, hits: List[Tuple[AnomalyDetector, float]]
+    ) -> None:
+        rate = baseline.rate
+        if rate.count < MIN_BASELINE_HOURS:
+            return
+        excess = baseline.hour_count - rate.mean
+        std = rate.std
+        if excess > self.z_score * std:
+            hits.append((AnomalyDetector.RATE_ZSCORE, excess / std if std else math.inf))
+        sigma = max(std, 1.0)
+        cusum = baseline.cusum + excess - CUSUM_SLACK * sigma
+        if cusum > CUSUM_THRESHOLD * sigma:
+            hits.append((AnomalyDetector.RATE_CUSUM, cusum / sigma))
@@ -0,0 +1,295 @@
+"""
+Write-Ahead Journal - Durable, group-committed record log.
+
+AuditLogger and ActivityMonitor append every record to a Journal before
+updating their in-memory state, and replay it on startup to rebuild that
+state after a restart or crash.
+
+Each record is one line: the CRC-32 of the JSON body as 8 hex digits, a space
+and the JSON body ``{"k": kind, "r": record}``. On open, the file is scanned
+and cut at the first line that is incomplete or fails its checksum (a write
+torn by a crash), so appends always follow intact records.
+
+Appends are group-committed: writers only encode and enqueue their record,
+and a single writer thread collects everything queued within
+``commit_interval`` seconds (or ``max_batch`` records, whichever comes first)
+into one write and one fsync. Every append returns a future resolved once the
+record is durable; callers that need durability wait on it (or on barrier()),
+the rest continue immediately.
+
+A failed commit is fatal: the failed records and everything queued behind them
+are rejected, the partial write is cut off, and every later append raises.
+Owners that apply a record before it is durable pass a callback to append()
+to undo (or at least report) state the journal does not have.
+
+TODO: Implement the following functionality:
+- Compaction (snapshot the state and truncate the journal)
+- Rotation into size-bounded files
+"""
+
+import json
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+DEFAULT_COMMIT_INTERVAL = 0.002
+DEFAULT_MAX_BATCH = 1024
+
+_Pending = Tuple[bytes, "Future[None]"]
+
+
+def encode_record(kind: str, record: Dict[str, Any]) -> bytes:
+    """
+    Frame a record as a checksummed journal line.
+
+    Args:
+        kind: Record kind, used to route it on replay
+        record: JSON-compatible record
+
+    Returns:
+        Line including the trailing newline
+    """
+    body = json.dumps({"k": kind, "r": record}, separators=(",", ":"), default=str).encode("utf-8")
+    return b"%08x %s\n" % (zlib.crc32(body), body)
+
+
+def decode_record(line: bytes) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    Parse a journal line.
+
+    Args:
+        line: Line including the trailing newline
+
+    Returns:
+        (kind, record), or None if the line is incomplete or corrupt
+    """
+    if len(line) < 10 or not line.endswith(b"\n") or line[8:9] != b" ":
+        return None
+    body = line[9:-1]
+    try:
+        if int(line[:8], 16) != zlib.crc32(body):
+            return None
+        payload = json.loads(body)
+    except ValueError:
+        return None
+    return payload["k"], payload["r"]
+
+
+class Journal:
+    """
+    Append-only, crash-safe journal file with group commit.
+
+    Thread-safe. Close it (or use it as a context manager) to commit pending
+    records and stop the writer thread.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        commit_interval: float = DEFAULT_COMMIT_INTERVAL,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        fsync: bool = True,
+    ) -> None:
+        """
+        Open (or create) a journal and start its writer thread.
+
+        Args:
+            path: Journal file
+            commit_interval: Seconds a commit waits for more records to join it
+            max_batch: Records that trigger a commit without waiting
+            fsync: Whether commits fsync (disable only for tests or benchmarks)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.commit_interval = commit_interval
+        self.max_batch = max_batch
+        self.fsync = fsync
+        self.commits = 0
+        self.records = 0
+        self.recovered = 0
+        self.truncated_bytes = 0
+        self.error: Optional[OSError] = None
+        self._replay_end = self._size = self._recover()
+        self._file = open(self.path, "ab")
+        self._pending: List[_Pending] = []
+        self._last: Optional[Future[None]] = None
+        self._closed = False
+        self._cond = threading.Condition()
+        self._writer = threading.Thread(target=self._run, name="journal-writer", daemon=True)
+        self._writer.start()
+
+    def __enter__(self) -> "Journal":
+        """Return the open journal."""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Commit pending records and close."""
+        self.close()
+
+    def append(
+        self,
+        kind: str,
+        record: Dict[str, Any],
+        callback: Optional[Callable[["Future[None]"], Any]] = None,
+    ) -> "Future[None]":
+        """
+        Queue a record for the next group commit.
+
+        Args:
+            kind: Record kind, used to route it on replay
+            record: JSON-compatible record
+            callback: Called with the future once it is resolved, always on
+                the writer thread (never inside append(), so it may take
+                locks the caller holds)
+
+        Returns:
+            Future resolved when the record is durable (or failed with the
+            write error)
+
+        Raises:
+            RuntimeError: If the journal is closed
+            OSError: If an earlier commit failed
+        """
+        line = encode_record(kind, record)
+        future: Future[None] = Future()
+        if callback is not None:
+            future.add_done_callback(callback)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Journal is closed")
+            if self.error is not None:
+                raise OSError(f"Journal commit failed earlier: {self.error}") from self.error
+            self._pending.append((line, future))
+            self._last = future
+            # Wake the writer to open a batch, or to cut a full one short.
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch:
+                self._cond.notify()
+        return future
+
+    def barrier(self) -> "Future[None]":
+        """
+        Return a future resolved once every record appended so far is durable.
+
+        Commits happen in append order, so this is the future of the last
+        appended record. Async callers can ``await asyncio.wrap_future(...)``.
+        """
+        with self._cond:
+            if self._last is not None:
+                return self._last
+        done: Future[None] = Future()
+        done.set_result(None)
+        return done
+
+    def sync(self, timeout: Optional[float] = None) -> None:
+        """
+        Block until every record appended so far is durable.
+
+        Args:
+            timeout: Seconds to wait at most
+
+        Raises:
+            OSError: If committing failed
+        """
+        self.barrier().result(timeout)
+
+    def replay(self, kinds: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Iterate over the records recovered when the journal was opened.
+
+        Records appended since are not included: their effects are already in
+        memory.
+
+        Args:
+            kinds: Record kinds to return (all if None)
+
+        Returns:
+            Iterator over (kind, record) in append order
+        """
+        wanted = set(kinds) if kinds is not None else None
+        offset = 0
+        with open(self.path, "rb") as handle:
+            for line in handle:
+                offset += len(line)
+                if offset > self._replay_end:
+                    break
+                decoded = decode_record(line)
+                if decoded is not None and (wanted is None or decoded[0] in wanted):
+                    yield decoded
+
+    def close(self) -> None:
+        """Commit pending records, stop the writer thread and close the file."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._writer.join()
+        self._file.close()
+
+    def _recover(self) -> int:
+        """Count intact records and cut off a torn tail; return the intact size."""
+        if not self.path.exists():
+            return 0
+        offset = 0
+        with open(self.path, "r+b") as handle:
+            for line in handle:
+                if decode_record(line) is None:
+                    break
+                offset += len(line)
+                self.recovered += 1
+            size = handle.seek(0, os.SEEK_END)
+            if size > offset:
+                self.truncated_bytes = size - offset
+                handle.truncate(offset)
+                os.fsync(handle.fileno())
+        return offset
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                # Group commit: give concurrent writers time to join the batch.
+                deadline = time.monotonic() + self.commit_interval
+                while len(self._pending) < self.max_batch and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._pending[: self.max_batch]
+                del self._pending[: self.max_batch]
+            self._commit(batch)
+
+    def _commit(self, batch: List[_Pending]) -> None:
+        data = b"".join(line for line, _ in batch)
+        try:
+            self._file.write(data)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+        except OSError as exc:
+            # Records queued behind the batch may depend on it (e.g. the audit
+            # hash chain), so they are rejected too and the journal stops.
+            with self._cond:
+                self.error = exc
+                batch = batch + self._pending
+                self._pending = []
+            # Drop a partial write so the file ends with intact records.
+            try:
+                self._file.truncate(self._size)
+            except OSError:
+                pass
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+        self._size += len(data)
+        self.commits += 1
+        self.records += len(batch)
+        for _, future in batch:
+            future.set_result(None)
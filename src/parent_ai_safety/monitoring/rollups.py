@@ -0,0 +1,275 @@
+"""
+Activity Rollups - Incrementally maintained counters for real-time dashboards.
+
+Every logged activity increments per-user minute, hour and day buckets holding
+counts by ActivityType and ActivitySeverity. A summary over any time range is
+assembled from the coarsest buckets that fit inside it, finer buckets towards
+its edges and the raw activities of the partial minutes at either end, so its
+cost does not grow with the number of activities in the range.
+
+Old detail is compacted: minute buckets and raw activities are kept for
+minute_retention, hour buckets for hour_retention and day buckets forever.
+Compaction runs every compact_interval of activity time. Ranges whose edges
+need compacted detail are not answered (summarize() returns None) and callers
+fall back to scanning the activity history.
+"""
+
+import threading
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from parent_ai_safety.monitoring.activity import Activity, SummaryCounts
+from parent_ai_safety.monitoring.activity_store import (
+    ACTIVITY_SEVERITIES,
+    ACTIVITY_TYPES,
+    CONCERNING_CODES,
+    MICROS_PER_HOUR,
+    SEVERITY_CODES,
+    TYPE_CODES,
+    ColumnarActivityStore,
+    to_micros,
+)
+
+MICROS_PER_MINUTE = 60_000_000
+MICROS_PER_DAY = 24 * MICROS_PER_HOUR
+# Bucket widths, coarsest first.
+LEVELS: Tuple[int, ...] = (MICROS_PER_DAY, MICROS_PER_HOUR, MICROS_PER_MINUTE)
+
+DEFAULT_MINUTE_RETENTION = timedelta(days=2)
+DEFAULT_HOUR_RETENTION = timedelta(days=90)
+DEFAULT_COMPACT_INTERVAL = timedelta(hours=1)
+
+# Bucket layout: type counts followed by severity counts.
+_SEVERITY_OFFSET = len(ACTIVITY_TYPES)
+_WIDTH = _SEVERITY_OFFSET + len(ACTIVITY_SEVERITIES)
+
+
+class _UserRollup:
+    """Buckets, raw tail and concerning activities of one user."""
+
+    __slots__ = ("buckets", "times", "codes", "concerning_times", "concerning")
+
+    def __init__(self) -> None:
+        self.buckets: Dict[int, Dict[int, List[int]]] = {level: {} for level in LEVELS}
+        # Raw (type code, severity code) pairs sorted by timestamp, for range edges.
+        self.times: List[int] = []
+        self.codes: List[Tuple[int, int]] = []
+        self.concerning_times: List[int] = []
+        self.concerning: List[Activity] = []
+
+
+class ActivityRollups:
+    """
+    Per-user, per-minute/hour/day activity counters.
+
+    Concerning (ALERT/CRITICAL) activities are rare and are kept in full so
+    summaries can list them. The rollups are thread-safe.
+    """
+
+    def __init__(
+        self,
+        minute_retention: timedelta = DEFAULT_MINUTE_RETENTION,
+        hour_retention: timedelta = DEFAULT_HOUR_RETENTION,
+        compact_interval: timedelta = DEFAULT_COMPACT_INTERVAL,
+    ) -> None:
+        """
+        Initialize empty rollups.
+
+        Args:
+            minute_retention: How long minute buckets and raw activities are kept
+            hour_retention: How long hour buckets are kept
+            compact_interval: Activity time between automatic compactions
+        """
+        self._retention = {MICROS_PER_MINUTE: minute_retention, MICROS_PER_HOUR: hour_retention}
+        self._compact_interval = compact_interval // timedelta(microseconds=1)
+        self._users: Dict[str, _UserRollup] = {}
+        # Start of the oldest detail still kept per bucket width; raw
+        # activities share the minute horizon. None until the first compaction.
+        self._horizons: Dict[int, Optional[int]] = dict.fromkeys(LEVELS)
+        self._latest: Optional[int] = None
+        self._last_compaction: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def users(self) -> List[str]:
+        """Return the users with rolled-up activities."""
+        with self._lock:
+            return list(self._users)
+
+    def add(self, activity: Activity) -> None:
+        """Count an activity."""
+        self._record(
+            activity.user_id,
+            to_micros(activity.timestamp),
+            TYPE_CODES[activity.activity_type],
+            SEVERITY_CODES[activity.severity],
+            activity,
+        )
+
+    def backfill(self, store: ColumnarActivityStore) -> None:
+        """
+        Count every activity already in a columnar store.
+
+        Args:
+            store: Store to read; only concerning rows are materialized
+        """
+        columns = store.columns()
+        for row in range(columns.rows):
+            severity = columns.severities[row]
+            self._record(
+                store.user_id(columns.users[row]),
+                columns.timestamps[row],
+                columns.types[row],
+                severity,
+                store.activity(row) if severity in CONCERNING_CODES else None,
+            )
+
+    def summarize(
+        self, user_id: str, start_time: datetime, end_time: datetime
+    ) -> Optional[SummaryCounts]:
+        """
+        Count a user's activities by type and severity over a time range.
+
+        Args:
+            user_id: User identifier
+            start_time: Period start (inclusive)
+            end_time: Period end (inclusive)
+
+        Returns:
+            Counts by type, counts by severity and the concerning activities,
+            or None if the range needs detail that was compacted away
+        """
+        low, high = to_micros(start_time), to_micros(end_time) + 1
+        totals = [0] * _WIDTH
+        with self._lock:
+            rollup = self._users.get(user_id)
+            if rollup is None or low >= high:
+                return {}, {}, []
+            if not self._accumulate(rollup, low, high, 0, totals):
+                return None
+            times = rollup.concerning_times
+            concerning = rollup.concerning[bisect_left(times, low) : bisect_left(times, high)]
+        return (
+            {
+                ACTIVITY_TYPES[code]: totals[code]
+                for code in range(_SEVERITY_OFFSET)
+                if totals[code]
+            },
+            {
+                ACTIVITY_SEVERITIES[code]: totals[_SEVERITY_OFFSET + code]
+                for code in range(len(ACTIVITY_SEVERITIES))
+                if totals[_SEVERITY_OFFSET + code]
+            },
+            concerning,
+        )
+
+    def compact(self, now: Optional[datetime] = None) -> None:
+        """
+        Drop buckets and raw activities older than their retention.
+
+        Args:
+            now: Reference time (defaults to current UTC time)
+        """
+        with self._lock:
+            self._compact(to_micros(now or datetime.utcnow()))
+
+    def _record(
+        self,
+        user_id: str,
+        micros: int,
+        type_code: int,
+        severity_code: int,
+        activity: Optional[Activity],
+    ) -> None:
+        with self._lock:
+            rollup = self._users.get(user_id)
+            if rollup is None:
+                rollup = self._users[user_id] = _UserRollup()
+            for level in LEVELS:
+                horizon = self._horizons[level]
+                if horizon is not None and micros < horizon:
+                    continue
+                buckets = rollup.buckets[level]
+                counts = buckets.get(micros // level)
+                if counts is None:
+                    counts = buckets[micros // level] = [0] * _WIDTH
+                counts[type_code] += 1
+                counts[_SEVERITY_OFFSET + severity_code] += 1
+
+            horizon = self._horizons[MICROS_PER_MINUTE]
+            if horizon is None or micros >= horizon:
+                _insert(rollup.times, rollup.codes, micros, (type_code, severity_code))
+            if activity is not None and severity_code in CONCERNING_CODES:
+                _insert(rollup.concerning_times, rollup.concerning, micros, activity)
+
+            if self._latest is None or micros > self._latest:
+                self._latest = micros
+            if self._last_compaction is None:
+                self._last_compaction = micros
+            elif self._latest - self._last_compaction >= self._compact_interval:
+                self._compact(self._latest)
+
+    def _accumulate(
+        self, rollup: _UserRollup, low: int, high: int, depth: int, totals: List[int]
+    ) -> bool:
+        """Add counts for [low, high) to totals; False if compacted detail is needed."""
+        if low >= high:
+            return True
+        if depth == len(LEVELS):
+            horizon = self._horizons[MICROS_PER_MINUTE]
+            if horizon is not None and low < horizon:
+                return False
+            for position in range(bisect_left(rollup.times, low), bisect_left(rollup.times, high)):
+                type_code, severity_code = rollup.codes[position]
+                totals[type_code] += 1
+                totals[_SEVERITY_OFFSET + severity_code] += 1
+            return True
+
+        level = LEVELS[depth]
+        first, last = -(-low // level), high // level
+        if first >= last:
+            return self._accumulate(rollup, low, high, depth + 1, totals)
+        horizon = self._horizons[level]
+        if horizon is not None and first * level < horizon:
+            return False
+        buckets = rollup.buckets[level]
+        indices: Iterable[int] = range(first, last)
+        if last - first > len(buckets):
+            indices = [index for index in buckets if first <= index < last]
+        for index in indices:
+            counts = buckets.get(index)
+            if counts is not None:
+                for code, count in enumerate(counts):
+                    totals[code] += count
+        return self._accumulate(rollup, low, first * level, depth + 1, totals) and self._accumulate(
+            rollup, last * level, high, depth + 1, totals
+        )
+
+    def _compact(self, now: int) -> None:
+        self._last_compaction = now
+        for level, retention in self._retention.items():
+            cutoff = (now - retention // timedelta(microseconds=1)) // level * level
+            horizon = self._horizons[level]
+            if horizon is not None and cutoff <= horizon:
+                continue
+            self._horizons[level] = cutoff
+            for rollup in self._users.values():
+                buckets = rollup.buckets[level]
+                rollup.buckets[level] = {
+                    index: counts for index, counts in buckets.items() if index * level >= cutoff
+                }
+                if level == MICROS_PER_MINUTE:
+                    position = bisect_left(rollup.times, cutoff)
+                    del rollup.times[:position]
+                    del rollup.codes[:position]
+
+
+def _insert(times: List[int], values: List[Any], micros: int, value: Any) -> None:
+    """Insert into parallel lists kept sorted by time."""
+    if not times or micros >= times[-1]:
+        times.append(micros)
+        values.append(value)
+        return
+    position = bisect_left(times, micros + 1)
+    insort(times, micros)
+    values.insert(position, value)
@@ -1,7 +1,12 @@
 """Pytest configuration and fixtures."""
 
+from datetime import datetime, timedelta
+from typing import List
+
 import pytest
 
+from parent_ai_safety.monitoring.activity import Activity, ActivitySeverity, ActivityType
+
 
 @pytest.fixture
 def sample_user_id() -> str:
@@ -9,6 +14,43 @@ def sample_user_id() -> str:
     return "test_user_001"
 
 
+ACTIVITY_BASE = datetime(2025, 11, 20, 0, 0)
+
+
+@pytest.fixture
+def sample_activities() -> List[Activity]:
+    """Return two days of one request per hour for "kid", with a burst, plus another user."""
+    activities = []
+    for hour in range(48):
+        activities.append(
+            Activity(
+                activity_id=f"h{hour}",
+                user_id="kid",
+                activity_type=ActivityType.AI_REQUEST,
+                timestamp=ACTIVITY_BASE + timedelta(hours=hour),
+            )
+        )
+    for minute in range(30):
+        activities.append(
+            Activity(
+                activity_id=f"burst{minute}",
+                user_id="kid",
+                activity_type=ActivityType.BLOCKED_CONTENT,
+                severity=ActivitySeverity.ALERT if minute == 0 else ActivitySeverity.WARNING,
+                timestamp=ACTIVITY_BASE + timedelta(hours=30, minutes=minute),
+            )
+        )
+    activities.append(
+        Activity(
+            activity_id="other",
+            user_id="sibling",
+            activity_type=ActivityType.LOGIN,
+            timestamp=ACTIVITY_BASE + timedelta(hours=1),
+        )
+    )
+    return activities
+
+
 # TODO: Add more fixtures as implementation progresses
 # - sample_policy
 # - sample_content_filter
@@ -0,0 +1,102 @@
+"""Tests for access control."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from parent_ai_safety.controls.access import AccessControl, Permission, User, UserRole
+from parent_ai_safety.controls.passwords import PasswordHasher
+
+
+@pytest.fixture
+def access_control() -> AccessControl:
+    """Access control with one parent and one child."""
+    control = AccessControl(hasher=PasswordHasher(n=2**4), kdf_workers=2)
+    control.add_user(User(user_id="parent", username="mom", role=UserRole.PARENT))
+    control.add_user(User(user_id="child", username="kid", role=UserRole.CHILD, age=9))
+    return control
+
+
+class TestAccessControl:
+    """Tests for AccessControl sessions and permissions."""
+
+    def test_role_permissions(self, access_control: AccessControl) -> None:
+        """Test that permissions follow the user's role."""
+        parent = access_control.create_session("parent")
+        child = access_control.create_session("child")
+        assert access_control.check_permission(parent.session_id, Permission.ADMIN) is True
+        assert access_control.check_permission(child.session_id, Permission.USE_AI) is True
+        assert access_control.check_permission(child.session_id, Permission.ADMIN) is False
+
+    def test_expired_and_revoked_sessions(self, access_control: AccessControl) -> None:
+        """Test that expired, revoked and unknown sessions are denied."""
+        expired = access_control.create_session("child", ttl=timedelta(seconds=-1))
+        assert access_control.check_permission(expired.session_id, Permission.USE_AI) is False
+
+        session = access_control.create_session("child")
+        access_control.revoke_session(session.session_id)
+        assert access_control.check_permission(session.session_id, Permission.USE_AI) is False
+        assert access_control.check_permission("unknown", Permission.USE_AI) is False
+
+    def test_role_change_applies_to_open_sessions(self, access_control: AccessControl) -> None:
+        """Test that replacing a user updates permissions of existing sessions."""
+        session = access_control.create_session("child")
+        access_control.add_user(User(user_id="child", username="kid", role=UserRole.RESTRICTED))
+        assert access_control.check_permission(session.session_id, Permission.USE_AI) is False
+
+    def test_evict_expired(self, access_control: AccessControl) -> None:
+        """Test bulk eviction of expired sessions."""
+        short = [access_control.create_session("child", ttl=timedelta(minutes=1)) for _ in range(3)]
+        revoked = access_control.create_session("child", ttl=timedelta(minutes=1))
+        access_control.revoke_session(revoked.session_id)
+        kept = access_control.create_session("parent")
+        later = datetime.utcnow() + timedelta(minutes=5)
+        assert access_control.evict_expired(later) == 3
+        assert set(access_control.sessions) == {kept.session_id}
+        assert all(not session.is_active for session in short)
+        assert access_control.check_permission(kept.session_id, Permission.ADMIN) is True
+
+    def test_create_session_unknown_user(self, access_control: AccessControl) -> None:
+        """Test creating a session for an unregistered user."""
+        with pytest.raises(KeyError):
+            access_control.create_session("nobody")
+
+
+class TestAuthentication:
+    """Tests for password login and device resume."""
+
+    def test_authenticate(self, access_control: AccessControl) -> None:
+        """Test login with correct, wrong and unknown credentials."""
+        access_control.set_password("parent", "s3cret")
+        session = access_control.authenticate("mom", "s3cret")
+        assert session is not None and session.user_id == "parent"
+        assert access_control.authenticate("mom", "wrong") is None
+        assert access_control.authenticate("nobody", "s3cret") is None
+        assert access_control.authenticate("kid", "s3cret") is None
+        access_control.close()
+
+    def test_aauthenticate_rehashes_on_cost_change(self, access_control: AccessControl) -> None:
+        """Test async login and rehash-on-login with new cost parameters."""
+        access_control.set_password("parent", "s3cret")
+        access_control.hasher = PasswordHasher(n=2**5)
+        session = asyncio.run(access_control.aauthenticate("mom", "s3cret"))
+        assert session is not None
+        assert access_control._password_hashes["parent"].startswith("scrypt$32$")
+        assert access_control.authenticate("mom", "s3cret") is not None
+        access_control.close()
+
+    def test_resume_token(self, access_control: AccessControl) -> None:
+        """Test device-bound resume tokens and their revocation."""
+        access_control.set_password("child", "pw")
+        session = access_control.authenticate("kid", "pw")
+        assert session is not None
+        token = access_control.issue_resume_token(session.session_id, "tablet")
+        resumed = access_control.resume_session(token, "tablet")
+        assert resumed is not None and resumed.user_id == "child"
+        assert access_control.resume_session(token, "phone") is None
+        access_control.set_password("child", "new")
+        assert access_control.resume_session(token, "tablet") is None
+        with pytest.raises(KeyError):
+            access_control.issue_resume_token("unknown", "tablet")
+        access_control.close()
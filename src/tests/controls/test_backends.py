@@ -0,0 +1,157 @@
+"""Tests for usage counter backends."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from parent_ai_safety.controls.backends import (
+    InMemoryUsageBackend,
+    LeasedUsageBackend,
+    RedisUsageBackend,
+)
+from parent_ai_safety.controls.limits import LimitType, UsageLimit, UsageLimits, UsageRecord
+
+DAY = datetime(2025, 11, 26).toordinal()
+
+
+class FakeRedis:
+    """In-process stand-in for the subset of redis-py the backend uses."""
+
+    def __init__(self) -> None:
+        self.values: Dict[str, int] = {}
+        self.ttls: Dict[str, int] = {}
+        self.round_trips = 0
+        self._lock = threading.Lock()
+
+    def incrby(self, key: str, amount: int) -> int:
+        with self._lock:
+            self.round_trips += 1
+            return self._incrby(key, amount)
+
+    def decrby(self, key: str, amount: int) -> int:
+        return self.incrby(key, -amount)
+
+    def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        with self._lock:
+            self.round_trips += 1
+            return [str(self.values[key]).encode() if key in self.values else None for key in keys]
+
+    def pipeline(self) -> "FakePipeline":
+        return FakePipeline(self)
+
+    def _incrby(self, key: str, amount: int) -> int:
+        self.values[key] = self.values.get(key, 0) + amount
+        return self.values[key]
+
+
+class FakePipeline:
+    """Queued commands executed in one round trip."""
+
+    def __init__(self, redis: FakeRedis) -> None:
+        self.redis = redis
+        self.commands: List[Tuple[str, Any, int]] = []
+
+    def incrby(self, key: str, amount: int) -> None:
+        self.commands.append(("incrby", key, amount))
+
+    def expire(self, key: str, seconds: int) -> None:
+        self.commands.append(("expire", key, seconds))
+
+    def execute(self) -> List[Any]:
+        with self.redis._lock:
+            self.redis.round_trips += 1
+            results: List[Any] = []
+            for command, key, value in self.commands:
+                if command == "incrby":
+                    results.append(self.redis._incrby(key, value))
+                else:
+                    self.redis.ttls[key] = value
+                    results.append(True)
+            return results
+
+
+class TestInMemoryUsageBackend:
+    """Tests for InMemoryUsageBackend."""
+
+    def test_reserve_respects_limit(self) -> None:
+        """Test that reservations stop at the limit."""
+        backend = InMemoryUsageBackend()
+        assert backend.reserve("child", DAY, 2, limit=3)
+        assert not backend.reserve("child", DAY, 2, limit=3)
+        assert backend.reserve("child", DAY, 1, limit=3)
+        backend.add("child", DAY - 1, 60, 0)
+        assert backend.totals("child", DAY - 1, DAY) == (60, 3)
+
+
+class TestRedisUsageBackend:
+    """Tests for RedisUsageBackend against a fake server."""
+
+    def test_batched_increments(self) -> None:
+        """Test that increments are pipelined and flushed before reads."""
+        redis = FakeRedis()
+        backend = RedisUsageBackend(redis, batch_size=10)
+        for _ in range(5):
+            backend.add("child", DAY, 30, 1)
+        assert redis.round_trips == 0
+        assert backend.totals("child", DAY, DAY) == (150, 5)
+        assert redis.round_trips == 2
+        assert redis.ttls[backend.key("child", DAY, "requests")] > 0
+
+    def test_concurrent_reserves_never_exceed_limit(self) -> None:
+        """Test atomic check-and-increment across workers sharing the server."""
+        redis = FakeRedis()
+        workers = [RedisUsageBackend(redis) for _ in range(4)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            granted = list(
+                pool.map(lambda i: workers[i % 4].reserve("child", DAY, 1, limit=50), range(200))
+            )
+        assert sum(granted) == 50
+        assert workers[0].totals("child", DAY, DAY) == (0, 50)
+
+
+class TestLeasedUsageBackend:
+    """Tests for LeasedUsageBackend."""
+
+    def test_leases_avoid_round_trips(self) -> None:
+        """Test that most reservations are granted locally."""
+        redis = FakeRedis()
+        backend = LeasedUsageBackend(RedisUsageBackend(redis), lease_size=10)
+        assert all(backend.reserve("child", DAY, 1, limit=100) for _ in range(30))
+        assert redis.round_trips == 3
+        assert backend.totals("child", DAY, DAY) == (0, 30)
+
+    def test_near_limit_and_release(self) -> None:
+        """Test single reservations near the limit and returning unused quota."""
+        shared = RedisUsageBackend(FakeRedis())
+        first = LeasedUsageBackend(shared, lease_size=10)
+        second = LeasedUsageBackend(shared, lease_size=10)
+        assert first.reserve("child", DAY, 1, limit=15)
+        granted = sum(second.reserve("child", DAY, 1, limit=15) for _ in range(10))
+        assert granted == 5
+        first.release()
+        assert shared.totals("child", DAY, DAY) == (0, 6)
+        assert second.reserve("child", DAY, 1, limit=15)
+
+
+class TestSharedUsageLimits:
+    """Tests for UsageLimits sharing a backend across workers."""
+
+    def test_quota_is_shared(self) -> None:
+        """Test that two workers enforce one quota together."""
+        shared = RedisUsageBackend(FakeRedis())
+        now = datetime(2025, 11, 26, 12)
+        workers = [UsageLimits(backend=shared) for _ in range(2)]
+        for limits in workers:
+            limits.add_limit("child", UsageLimit(limit_type=LimitType.REQUEST_COUNT, value=3))
+        assert [limits.consume("child", now=now) for limits in workers * 2] == [
+            True,
+            True,
+            True,
+            False,
+        ]
+        workers[0].record_usage(
+            UsageRecord(user_id="child", timestamp=now, duration_seconds=120, request_count=0)
+        )
+        assert workers[1].get_remaining("child", LimitType.REQUEST_COUNT, now=now) == 0
+        assert workers[1].check_limit("child", LimitType.DAILY_TIME, now=now) is True
@@ -0,0 +1,114 @@
+"""Tests for usage limits."""
+
+from datetime import datetime, time, timedelta
+
+import pytest
+
+from parent_ai_safety.controls.limits import (
+    LimitType,
+    TimeWindow,
+    UsageLimit,
+    UsageLimits,
+    UsageRecord,
+)
+
+# A Wednesday.
+NOW = datetime(2025, 11, 26, 15, 30)
+
+
+class TestUsageLimits:
+    """Tests for UsageLimits."""
+
+    def test_no_limits_configured(self) -> None:
+        """Test that users without limits are always allowed."""
+        limits = UsageLimits()
+        assert limits.check_limit("child", LimitType.DAILY_TIME, now=NOW) is True
+        assert limits.get_remaining("child", LimitType.DAILY_TIME, now=NOW) == -1
+
+    def test_request_count(self) -> None:
+        """Test request quotas for the current day."""
+        limits = UsageLimits()
+        limits.add_limit("child", UsageLimit(limit_type=LimitType.REQUEST_COUNT, value=3))
+        limits.record_usage(UsageRecord(user_id="child", timestamp=NOW - timedelta(days=1)))
+        for _ in range(2):
+            limits.record_usage(UsageRecord(user_id="child", timestamp=NOW))
+        limits.record_usage(UsageRecord(user_id="other", timestamp=NOW))
+        assert limits.get_remaining("child", LimitType.REQUEST_COUNT, now=NOW) == 1
+        assert limits.check_limit("child", LimitType.REQUEST_COUNT, now=NOW) is True
+        limits.record_usage(UsageRecord(user_id="child", timestamp=NOW))
+        assert limits.check_limit("child", LimitType.REQUEST_COUNT, now=NOW) is False
+
+    def test_daily_and_weekly_time(self) -> None:
+        """Test time quotas in minutes."""
+        limits = UsageLimits()
+        limits.add_limit("child", UsageLimit(limit_type=LimitType.DAILY_TIME, value=30))
+        limits.add_limit("child", UsageLimit(limit_type=LimitType.WEEKLY_TIME, value=60))
+        # Monday of the same week, and the Sunday before it.
+        limits.record_usage(
+            UsageRecord(user_id="child", timestamp=NOW - timedelta(days=2), duration_seconds=1800)
+        )
+        limits.record_usage(
+            UsageRecord(user_id="child", timestamp=NOW - timedelta(days=3), duration_seconds=3600)
+        )
+        limits.record_usage(UsageRecord(user_id="child", timestamp=NOW, duration_seconds=600))
+        assert limits.get_remaining("child", LimitType.DAILY_TIME, now=NOW) == 20
+        assert limits.get_remaining("child", LimitType.WEEKLY_TIME, now=NOW) == 20
+
+    def test_counters_keep_one_week(self) -> None:
+        """Test that usage older than the counter ring does not count."""
+        limits = UsageLimits()
+        limits.add_limit("child", UsageLimit(limit_type=LimitType.REQUEST_COUNT, value=5))
+        limits.record_usage(UsageRecord(user_id="child", timestamp=NOW, request_count=4))
+        # Same ring slot a week later replaces the old day; a late record for
+        # the old day is then dropped.
+        next_week = NOW + timedelta(days=7)
+        limits.record_usage(UsageRecord(user_id="child", timestamp=next_week))
+        limits.record_usage(UsageRecord(user_id="child", timestamp=NOW, request_count=9))
+        assert limits.get_remaining("child", LimitType.REQUEST_COUNT, now=next_week) == 4
+        assert limits.get_remaining("child", LimitType.REQUEST_COUNT, now=NOW) == 5
+        assert len(limits.usage_records) == 3
+
+    def test_usage_history_is_bounded(self) -> None:
+        """Test that consume() keeps no records and usage_records keeps only recent ones."""
+        limits = UsageLimits(max_records=2)
+        limits.add_limit("child", UsageLimit(limit_type=LimitType.REQUEST_COUNT, value=1000))
+        for _ in range(100):
+            assert limits.consume("child", now=NOW)
+        assert len(limits.usage_records) == 0
+        assert limits.get_remaining("child", LimitType.REQUEST_COUNT, now=NOW) == 900
+
+        for minutes in range(3):
+            limits.record_usage(
+                UsageRecord(user_id="child", timestamp=NOW, duration_seconds=60 * minutes)
+            )
+        assert [record.duration_seconds for record in limits.usage_records] == [60, 120]
+
+    def test_schedule_windows(self) -> None:
+        """Test schedule windows, including one crossing midnight."""
+        limits = UsageLimits()
+        limits.add_limit(
+            "child",
+            UsageLimit(
+                limit_type=LimitType.SCHEDULE,
+                value=0,
+                time_windows=[
+                    TimeWindow(start_time=time(15), end_time=time(19), days_of_week=[0, 1, 2]),
+                    TimeWindow(start_time=time(22), end_time=time(1), days_of_week=[4]),
+                ],
+            ),
+        )
+        assert limits.check_limit("child", LimitType.SCHEDULE, now=NOW) is True
+        assert limits.check_limit("child", LimitType.SCHEDULE, now=NOW.replace(hour=9)) is False
+        friday_night = datetime(2025, 11, 28, 23, 0)
+        assert limits.check_limit("child", LimitType.SCHEDULE, now=friday_night) is True
+        saturday_early = datetime(2025, 11, 29, 0, 30)
+        assert limits.check_limit("child", LimitType.SCHEDULE, now=saturday_early) is True
+        assert (
+            limits.check_limit("child", LimitType.SCHEDULE, now=saturday_early + timedelta(hours=1))
+            is False
+        )
+
+    def test_schedule_has_no_remaining(self) -> None:
+        """Test that get_remaining() rejects SCHEDULE."""
+        with pytest.raises(ValueError):
+            UsageLimits().get_remaining("child", LimitType.SCHEDULE)
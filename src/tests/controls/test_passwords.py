@@ -0,0 +1,31 @@
+"""Tests for password hashing."""
+
+from parent_ai_safety.controls.passwords import PasswordHasher
+
+# Cheap parameters keep the tests fast.
+FAST = PasswordHasher(n=2**4, r=8, p=1)
+
+
+class TestPasswordHasher:
+    """Tests for PasswordHasher."""
+
+    def test_hash_and_verify(self) -> None:
+        """Test that only the right password verifies."""
+        encoded = FAST.hash("correct horse")
+        assert encoded.startswith("scrypt$16$8$1$")
+        assert FAST.verify("correct horse", encoded) is True
+        assert FAST.verify("wrong", encoded) is False
+        assert FAST.hash("correct horse") != encoded
+
+    def test_malformed_hash(self) -> None:
+        """Test that malformed hashes never verify and need rehashing."""
+        assert FAST.verify("x", "md5$abc") is False
+        assert FAST.needs_rehash("md5$abc") is True
+
+    def test_needs_rehash_on_cost_change(self) -> None:
+        """Test that hashes made with other parameters need rehashing."""
+        encoded = FAST.hash("pw")
+        assert FAST.needs_rehash(encoded) is False
+        stronger = PasswordHasher(n=2**5)
+        assert stronger.needs_rehash(encoded) is True
+        assert stronger.verify("pw", encoded) is True
@@ -0,0 +1,69 @@
+"""Tests for the compiled schedule index."""
+
+from datetime import datetime, time, timedelta
+
+from parent_ai_safety.controls.limits import LimitType, TimeWindow, UsageLimit, UsageLimits
+from parent_ai_safety.controls.schedule import ScheduleIndex
+
+# A Wednesday.
+NOW = datetime(2025, 11, 26, 15, 30)
+SUNDAY_NIGHT = datetime(2025, 11, 30, 23, 0)
+
+AFTER_SCHOOL = TimeWindow(start_time=time(15), end_time=time(19), days_of_week=[0, 1, 2])
+EVENING = TimeWindow(start_time=time(18), end_time=time(20), days_of_week=[2])
+SUNDAY_LATE = TimeWindow(start_time=time(22), end_time=time(1), days_of_week=[6])
+
+
+class TestScheduleIndex:
+    """Tests for ScheduleIndex."""
+
+    def test_overlapping_windows(self) -> None:
+        """Test that overlapping windows merge into one allowed span."""
+        index = ScheduleIndex([AFTER_SCHOOL, EVENING])
+        assert index.allows(NOW)
+        assert index.allows(NOW.replace(hour=19, minute=59))
+        assert not index.allows(NOW.replace(hour=20))
+        assert index.next_transition(NOW) == NOW.replace(hour=20, minute=0)
+
+    def test_window_crossing_into_monday(self) -> None:
+        """Test a window crossing midnight at the end of the week."""
+        index = ScheduleIndex([SUNDAY_LATE])
+        assert index.allows(SUNDAY_NIGHT)
+        assert index.allows(SUNDAY_NIGHT + timedelta(hours=1, minutes=59))
+        assert not index.allows(SUNDAY_NIGHT + timedelta(hours=2))
+        assert index.next_transition(SUNDAY_NIGHT) == datetime(2025, 12, 1, 1, 0)
+
+    def test_next_transition_wraps_around_the_week(self) -> None:
+        """Test the next transition after the last one of the week."""
+        index = ScheduleIndex([AFTER_SCHOOL])
+        saturday = datetime(2025, 11, 29, 12, 0)
+        assert index.next_transition(saturday) == datetime(2025, 12, 1, 15, 0)
+
+    def test_constant_schedules(self) -> None:
+        """Test schedules that never change."""
+        everywhere = TimeWindow(start_time=time(0), end_time=time(0), days_of_week=list(range(7)))
+        assert ScheduleIndex([everywhere]).next_transition(NOW) is None
+        assert not ScheduleIndex([]).allows(NOW)
+
+    def test_intersection(self) -> None:
+        """Test that combining indexes allows only times both allow."""
+        index = ScheduleIndex([AFTER_SCHOOL]) & ScheduleIndex([EVENING])
+        assert not index.allows(NOW)
+        assert index.allows(NOW.replace(hour=18, minute=30))
+
+
+class TestUsageLimitsSchedule:
+    """Tests for schedule checks through UsageLimits."""
+
+    def test_check_and_next_change(self) -> None:
+        """Test the compiled schedule and its invalidation."""
+        limits = UsageLimits()
+        assert limits.next_schedule_change("child", now=NOW) is None
+        limit = UsageLimit(limit_type=LimitType.SCHEDULE, value=0, time_windows=[EVENING])
+        limits.add_limit("child", limit)
+        assert limits.check_limit("child", LimitType.SCHEDULE, now=NOW) is False
+        assert limits.next_schedule_change("child", now=NOW) == NOW.replace(hour=18, minute=0)
+        limit.time_windows.append(AFTER_SCHOOL)
+        assert limits.check_limit("child", LimitType.SCHEDULE, now=NOW) is False
+        limits.invalidate("child")
+        assert limits.check_limit("child", LimitType.SCHEDULE, now=NOW) is True
@@ -0,0 +1,231 @@
+"""Tests for the async request pipeline."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from parent_ai_safety.controls.access import AccessControl, Permission, User, UserRole
+from parent_ai_safety.controls.limits import LimitType, UsageLimit, UsageLimits
+from parent_ai_safety.core.ai_wrapper import BLOCKED_REQUEST_MESSAGE, AIRequest, AIResponse
+from parent_ai_safety.core.async_wrapper import AsyncAISafetyWrapper
+from parent_ai_safety.core.filter import ContentCategory, ContentFilter, FilterAction, FilterRule
+from parent_ai_safety.core.policy import SafetyPolicy
+from parent_ai_safety.core.providers import Provider, ProviderRouter
+from parent_ai_safety.monitoring.activity import ActivityMonitor, ActivityType
+from parent_ai_safety.monitoring.audit import AuditLogger
+
+
+def _wrapper(executor: Optional[ThreadPoolExecutor] = None) -> AsyncAISafetyWrapper:
+    access_control = AccessControl()
+    access_control.add_user(User(user_id="child", username="kid", role=UserRole.CHILD))
+    usage_limits = UsageLimits()
+    usage_limits.add_limit("child", UsageLimit(limit_type=LimitType.REQUEST_COUNT, value=2))
+    content_filter = ContentFilter(
+        rules=[
+            FilterRule(
+                name="violence",
+                category=ContentCategory.VIOLENCE,
+                action=FilterAction.BLOCK,
+                keywords={"fight"},
+            ),
+            FilterRule(
+                name="mild",
+                category=ContentCategory.PROFANITY,
+                action=FilterAction.SANITIZE,
+                keywords={"darn"},
+            ),
+        ]
+    )
+    return AsyncAISafetyWrapper(
+        SafetyPolicy(name="test"),
+        content_filter,
+        access_control=access_control,
+        usage_limits=usage_limits,
+        audit_logger=AuditLogger(),
+        activity_monitor=ActivityMonitor(),
+        executor=executor,
+    )
+
+
+def _request(wrapper: AsyncAISafetyWrapper, prompt: str) -> AIRequest:
+    assert wrapper.access_control is not None
+    session = wrapper.access_control.create_session("child")
+    return AIRequest(prompt=prompt, user_id="child", metadata={"session_id": session.session_id})
+
+
+class TestAsyncAISafetyWrapper:
+    """Tests for AsyncAISafetyWrapper."""
+
+    def test_allowed_request(self) -> None:
+        """Test that a clean request passes all checks and is logged."""
+
+        async def run() -> None:
+            async with _wrapper() as wrapper:
+                processed = await wrapper.process_request(_request(wrapper, "darn homework"))
+                assert processed is not None
+                assert processed.prompt == "*** homework"
+            assert wrapper.audit_logger is not None and wrapper.activity_monitor is not None
+            assert len(wrapper.audit_logger.entries) == 1
+            assert wrapper.activity_monitor.activities[0].activity_type == ActivityType.AI_REQUEST
+
+        asyncio.run(run())
+
+    def test_denials(self) -> None:
+        """Test content, permission and quota denials."""
+
+        async def run() -> None:
+            async with _wrapper() as wrapper:
+                decision = await wrapper.evaluate_request(_request(wrapper, "let's fight"))
+                assert decision.allowed is False
+                assert decision.denied_by == ["content"]
+
+                no_session = AIRequest(prompt="hi", user_id="child")
+                assert (await wrapper.evaluate_request(no_session)).denied_by == ["permission"]
+
+                for _ in range(2):
+                    assert await wrapper.process_request(_request(wrapper, "hi")) is not None
+                decision = await wrapper.evaluate_request(_request(wrapper, "hi"))
+                assert decision.denied_by == [LimitType.REQUEST_COUNT.value]
+            assert wrapper.activity_monitor is not None
+            types = [activity.activity_type for activity in wrapper.activity_monitor.activities]
+            assert types[0] == ActivityType.BLOCKED_CONTENT
+            assert types[-1] == ActivityType.LIMIT_EXCEEDED
+
+        asyncio.run(run())
+
+    def test_concurrent_sessions_with_executor(self) -> None:
+        """Test many concurrent requests with checks offloaded to a pool."""
+
+        async def run(wrapper: AsyncAISafetyWrapper) -> Any:
+            async with wrapper:
+                requests = [_request(wrapper, "hello") for _ in range(50)]
+                return await asyncio.gather(*(wrapper.process_request(r) for r in requests))
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            wrapper = _wrapper(executor)
+            assert wrapper.usage_limits is not None
+            wrapper.usage_limits.limits.clear()
+            results = asyncio.run(run(wrapper))
+        assert all(result is not None for result in results)
+        assert wrapper.audit_logger is not None
+        assert len(wrapper.audit_logger.entries) == 50
+
+    def test_async_component_methods_are_awaited(self) -> None:
+        """Test that coroutine check methods are supported."""
+
+        class AsyncAccessControl(AccessControl):
+            async def check_permission(  # type: ignore[override]
+                self, session_id: str, permission: Permission
+            ) -> bool:
+                await asyncio.sleep(0)
+                return session_id == "ok"
+
+        async def run() -> None:
+            wrapper = AsyncAISafetyWrapper(
+                SafetyPolicy(name="test"), ContentFilter(), access_control=AsyncAccessControl()
+            )
+            ok = AIRequest(prompt="hi", user_id="u", metadata={"session_id": "ok"})
+            bad = AIRequest(prompt="hi", user_id="u", metadata={"session_id": "bad"})
+            assert await wrapper.process_request(ok) is not None
+            assert await wrapper.process_request(bad) is None
+
+        asyncio.run(run())
+
+
+class SlowProvider(Provider):
+    """Provider answering after a delay and recording cancellations."""
+
+    def __init__(self, delay: float) -> None:
+        super().__init__("slow")
+        self.delay = delay
+        self.prompts: List[str] = []
+        self.cancelled = 0
+
+    async def _complete(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return f"answer to {prompt}"
+
+
+class TestSpeculativeCompletion:
+    """Tests for speculative dispatch in complete()."""
+
+    def _wrapper(self, provider: Provider, verdict: bool = True) -> AsyncAISafetyWrapper:
+        async def moderator(prompt: str, context: Dict[str, Any]) -> bool:
+            await asyncio.sleep(0.05)
+            return verdict
+
+        wrapper = _wrapper()
+        wrapper.wrapper.router = ProviderRouter([provider])
+        wrapper.moderators = [moderator]
+        wrapper.speculate = lambda request: True
+        return wrapper
+
+    def test_latency_saved(self) -> None:
+        """Test that the upstream call overlaps the checks."""
+        wrapper = self._wrapper(SlowProvider(0.05))
+
+        async def run() -> AIResponse:
+            async with wrapper:
+                return await wrapper.complete(_request(wrapper, "hello"))
+
+        response = asyncio.run(run())
+        assert response.content == "answer to hello"
+        assert response.metadata["speculation_saved_ms"] > 20
+        assert wrapper.speculative_requests == 1
+        assert wrapper.speculation_saved_ms == response.metadata["speculation_saved_ms"]
+
+    def test_denied_request_discards_answer(self) -> None:
+        """Test that a late denial cancels the upstream call and releases nothing."""
+        provider = SlowProvider(0.2)
+        wrapper = self._wrapper(provider, verdict=False)
+
+        async def run() -> AIResponse:
+            async with wrapper:
+                response = await wrapper.complete(_request(wrapper, "hello"))
+                await asyncio.sleep(0)
+                return response
+
+        response = asyncio.run(run())
+        assert response.content == BLOCKED_REQUEST_MESSAGE
+        assert response.metadata["denied_by"] == ["moderation"]
+        assert provider.cancelled == 1
+        assert wrapper.speculation_discarded == 1
+        assert wrapper.activity_monitor is not None
+        assert wrapper.activity_monitor.activities[0].activity_type == ActivityType.BLOCKED_CONTENT
+
+    def test_filtered_prompts_never_sent_early(self) -> None:
+        """Test that prompts the filter blocks or sanitizes are not speculated."""
+        provider = SlowProvider(0.0)
+        wrapper = self._wrapper(provider)
+
+        async def run() -> List[AIResponse]:
+            async with wrapper:
+                return [
+                    await wrapper.complete(_request(wrapper, "darn homework")),
+                    await wrapper.complete(_request(wrapper, "a fight")),
+                ]
+
+        sanitized, blocked = asyncio.run(run())
+        assert sanitized.content == "answer to *** homework"
+        assert "speculation_saved_ms" not in sanitized.metadata
+        assert blocked.content == BLOCKED_REQUEST_MESSAGE
+        assert provider.prompts == ["*** homework"]
+        assert wrapper.speculative_requests == 0
+
+    def test_not_speculating(self) -> None:
+        """Test that requests not selected for speculation wait for the checks."""
+        provider = SlowProvider(0.0)
+        wrapper = self._wrapper(provider)
+        wrapper.speculate = lambda request: False
+
+        async def run() -> AIResponse:
+            async with wrapper:
+                return await wrapper.complete(_request(wrapper, "hello"))
+
+        assert "speculation_saved_ms" not in asyncio.run(run()).metadata
+        assert wrapper.speculative_requests == 0
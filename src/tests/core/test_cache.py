@@ -0,0 +1,113 @@
+"""Tests for the screening decision cache."""
+
+from parent_ai_safety.core.ai_wrapper import AIRequest, AISafetyWrapper
+from parent_ai_safety.core.cache import DecisionCache
+from parent_ai_safety.core.filter import (
+    ContentCategory,
+    ContentFilter,
+    FilterAction,
+    FilterResult,
+    FilterRule,
+)
+from parent_ai_safety.core.policy import SafetyLevel, SafetyPolicy, SafetyRule
+
+
+def _rule(name: str, keyword: str) -> FilterRule:
+    return FilterRule(
+        name=name, category=ContentCategory.CUSTOM, action=FilterAction.BLOCK, keywords={keyword}
+    )
+
+
+class TestDecisionCache:
+    """Tests for DecisionCache."""
+
+    def test_lru_eviction_and_stats(self) -> None:
+        """Test LRU ordering, eviction and hit/miss counters."""
+        cache = DecisionCache(maxsize=2)
+        epoch = (0, 0)
+        keys = [DecisionCache.make_key(text, {}) for text in ("a", "b", "c")]
+        cache.put(keys[0], epoch, FilterResult(passed=True))
+        cache.put(keys[1], epoch, FilterResult(passed=True))
+        assert cache.get(keys[0], epoch) is not None  # "a" is now most recent
+        cache.put(keys[2], epoch, FilterResult(passed=True))
+        assert cache.get(keys[1], epoch) is None
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.evictions, stats.size) == (1, 1, 1, 2)
+        assert stats.hit_rate == 0.5
+
+    def test_key_normalization(self) -> None:
+        """Test that keys ignore case but not age."""
+        assert DecisionCache.make_key("Hello", {}) == DecisionCache.make_key("hELLO", {})
+        assert DecisionCache.make_key("hi", {"age": 8}) != DecisionCache.make_key("hi", {"age": 14})
+
+    def test_epoch_change_invalidates(self) -> None:
+        """Test that a version bump clears cached decisions."""
+        cache = DecisionCache()
+        key = DecisionCache.make_key("hi", {})
+        cache.put(key, (0, 0), FilterResult(passed=True))
+        assert cache.get(key, (1, 0)) is None
+        assert cache.stats().invalidations == 1
+
+    def test_sanitized_results_not_cached(self) -> None:
+        """Test that content-specific decisions are skipped."""
+        cache = DecisionCache()
+        key = DecisionCache.make_key("darn", {})
+        cache.put(key, (0, 0), FilterResult(passed=True, sanitized_content="***"))
+        assert cache.stats().size == 0
+
+
+class TestWrapperCaching:
+    """Tests for decision caching in AISafetyWrapper."""
+
+    def test_repeated_prompts_hit_cache(self) -> None:
+        """Test that repeated prompts are answered from the cache."""
+        cache = DecisionCache()
+        wrapper = AISafetyWrapper(SafetyPolicy(name="p"), ContentFilter(), decision_cache=cache)
+        for prompt in ("Help with math homework", "help with math homework", "hi"):
+            assert wrapper.process_request(AIRequest(prompt=prompt, user_id="c")) is not None
+        assert (cache.stats().hits, cache.stats().misses) == (1, 2)
+
+    def test_rule_and_policy_changes_invalidate(self) -> None:
+        """Test add_rule(), remove_rule() and policy changes bump versions."""
+        content_filter = ContentFilter()
+        policy = SafetyPolicy(name="p")
+        wrapper = AISafetyWrapper(policy, content_filter, decision_cache=DecisionCache())
+        request = AIRequest(prompt="tell me about dragons", user_id="c")
+        assert wrapper.process_request(request) is not None
+
+        content_filter.add_rule(_rule("dragons", "dragons"))
+        assert wrapper.process_request(request) is None
+        content_filter.remove_rule("dragons")
+        assert wrapper.process_request(request) is not None
+
+        policy.add_rule(
+            SafetyRule(name="no_dragons", description="d", conditions={"keywords": ["dragon"]})
+        )
+        assert wrapper.process_request(request) is None
+        policy.remove_rule("no_dragons")
+        assert wrapper.process_request(request) is not None
+
+        version = policy.version
+        policy.level = SafetyLevel.STRICT
+        assert policy.version != version
+
+    def test_swapped_and_shared_policies(self) -> None:
+        """Test that decisions are never served for a different policy or filter."""
+        strict = SafetyPolicy(
+            name="strict",
+            rules=[SafetyRule(name="knives", description="d", conditions={"keywords": ["knife"]})],
+        )
+        cache = DecisionCache()
+        content_filter = ContentFilter()
+        request = AIRequest(prompt="where is the knife", user_id="c")
+
+        wrapper = AISafetyWrapper(SafetyPolicy(name="lax"), content_filter, decision_cache=cache)
+        assert wrapper.process_request(request) is not None
+        wrapper.policy = strict
+        assert wrapper.process_request(request) is None
+
+        lax = AISafetyWrapper(SafetyPolicy(name="lax"), ContentFilter(), decision_cache=cache)
+        strict_wrapper = AISafetyWrapper(strict, ContentFilter(), decision_cache=cache)
+        for _ in range(2):
+            assert lax.process_request(request) is not None
+            assert strict_wrapper.process_request(request) is None
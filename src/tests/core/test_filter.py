@@ -3,10 +3,14 @@
 import pytest
 
 from parent_ai_safety.core.filter import (
+    AgeBracket,
     ContentCategory,
     ContentFilter,
     FilterAction,
     FilterRule,
+    MaskStyle,
+    mask_spans,
+    merge_spans,
 )
 
 
@@ -34,15 +38,253 @@ class TestContentFilter:
         filter_obj = ContentFilter()
         assert len(filter_obj.rules) == 0
 
-    def test_filter_not_implemented(self) -> None:
-        """Test that filter() raises NotImplementedError."""
+    def test_filter_passes_clean_content(self) -> None:
+        """Test that content without matches passes."""
+        filter_obj = ContentFilter(
+            rules=[
+                FilterRule(
+                    name="profanity",
+                    category=ContentCategory.PROFANITY,
+                    action=FilterAction.BLOCK,
+                    keywords={"badword"},
+                )
+            ]
+        )
+        result = filter_obj.filter("help with math homework")
+        assert result.passed is True
+        assert result.action is None
+        assert result.matched_rules == []
+
+    def test_keyword_filtering(self) -> None:
+        """Test case-insensitive keyword matching on word boundaries."""
+        filter_obj = ContentFilter(
+            rules=[
+                FilterRule(
+                    name="profanity",
+                    category=ContentCategory.PROFANITY,
+                    action=FilterAction.BLOCK,
+                    keywords={"bad"},
+                )
+            ]
+        )
+        assert filter_obj.filter("that is BAD!").passed is False
+        assert filter_obj.filter("let's play badminton").passed is True
+
+    def test_pattern_matching(self) -> None:
+        """Test regex pattern matching."""
+        filter_obj = ContentFilter(
+            rules=[
+                FilterRule(
+                    name="phone",
+                    category=ContentCategory.PERSONAL_INFO,
+                    action=FilterAction.WARN,
+                    patterns=[r"\d{3}-\d{4}"],
+                )
+            ]
+        )
+        result = filter_obj.filter("call me at 555-1234")
+        assert result.passed is True
+        assert result.action == FilterAction.WARN
+        assert result.matched_rules == ["phone"]
+
+    def test_content_sanitization(self) -> None:
+        """Test that SANITIZE rules mask matched spans."""
+        filter_obj = ContentFilter(
+            rules=[
+                FilterRule(
+                    name="mild",
+                    category=ContentCategory.PROFANITY,
+                    action=FilterAction.SANITIZE,
+                    keywords={"darn"},
+                )
+            ]
+        )
+        result = filter_obj.filter("darn it, darn")
+        assert result.passed is True
+        assert result.sanitized_content == "*** it, ***"
+
+    def test_multiple_rules(self) -> None:
+        """Test that every matching rule is reported and BLOCK wins."""
+        filter_obj = ContentFilter(
+            rules=[
+                FilterRule(
+                    name="mild",
+                    category=ContentCategory.PROFANITY,
+                    action=FilterAction.SANITIZE,
+                    keywords={"darn"},
+                ),
+                FilterRule(
+                    name="violence",
+                    category=ContentCategory.VIOLENCE,
+                    action=FilterAction.BLOCK,
+                    patterns=[r"\bkill(ed|ing)?\b"],
+                ),
+                FilterRule(
+                    name="disabled",
+                    category=ContentCategory.CUSTOM,
+                    action=FilterAction.BLOCK,
+                    keywords={"darn"},
+                    enabled=False,
+                ),
+            ]
+        )
+        result = filter_obj.filter("darn, he was killed")
+        assert result.passed is False
+        assert result.action == FilterAction.BLOCK
+        assert result.matched_rules == ["mild", "violence"]
+        assert result.metadata["categories"] == ["profanity", "violence"]
+
+    def test_add_and_remove_rule_rebuilds_matcher(self) -> None:
+        """Test that rule changes invalidate the compiled rule set."""
         filter_obj = ContentFilter()
-        with pytest.raises(NotImplementedError):
-            filter_obj.filter("test content")
+        assert filter_obj.filter("scary stuff").passed is True
+        compiled = filter_obj.compiled()
+        assert filter_obj.compiled() is compiled
+        version = filter_obj.version
+
+        filter_obj.add_rule(
+            FilterRule(
+                name="scary",
+                category=ContentCategory.VIOLENCE,
+                action=FilterAction.BLOCK,
+                keywords={"scary"},
+            )
+        )
+        assert filter_obj.compiled() is not compiled
+        assert filter_obj.filter("scary stuff").passed is False
+
+        filter_obj.remove_rule("scary")
+        assert filter_obj.filter("scary stuff").passed is True
+        assert filter_obj.version not in (version, ContentFilter().version)
+
+    def test_rule_management_errors(self) -> None:
+        """Test duplicate and unknown rule names."""
+        rule = FilterRule(name="r", category=ContentCategory.CUSTOM, action=FilterAction.WARN)
+        filter_obj = ContentFilter(rules=[rule])
+        with pytest.raises(ValueError):
+            filter_obj.add_rule(rule)
+        with pytest.raises(KeyError):
+            filter_obj.remove_rule("missing")
+
+
+class TestMasking:
+    """Tests for span merging and masking styles."""
+
+    def test_merge_spans(self) -> None:
+        """Test merging overlapping, touching, nested and empty spans."""
+        spans = [(10, 12), (0, 3), (2, 5), (5, 6), (11, 12), (8, 8)]
+        assert merge_spans(spans) == [(0, 6), (10, 12)]
+
+    def test_mask_styles(self) -> None:
+        """Test each masking style on overlapping spans."""
+        content = "you darn fool"
+        spans = [(4, 8), (6, 13)]
+        assert mask_spans(content, spans) == "you ***"
+        assert mask_spans(content, spans, MaskStyle.LENGTH) == "you *********"
+        assert mask_spans(content, spans, MaskStyle.KEEP_FIRST) == "you d********"
+        assert mask_spans(content, []) == content
+
+    def test_many_hits(self) -> None:
+        """Test sanitizing a long response with hundreds of hits."""
+        filter_obj = ContentFilter(
+            rules=[
+                FilterRule(
+                    name="mild",
+                    category=ContentCategory.PROFANITY,
+                    action=FilterAction.SANITIZE,
+                    keywords={"darn", "darn it"},
+                )
+            ],
+            mask_style=MaskStyle.LENGTH,
+        )
+        result = filter_obj.filter("darn it, ok. " * 500)
+        assert result.sanitized_content == "*******, ok. " * 500
+
+
+class TestAgeProfiles:
+    """Tests for per-age-bracket filter profiles."""
+
+    def _filter(self) -> ContentFilter:
+        return ContentFilter(
+            rules=[
+                FilterRule(
+                    name="violence",
+                    category=ContentCategory.VIOLENCE,
+                    action=FilterAction.BLOCK,
+                    keywords={"fight"},
+                    patterns=[r"kill\w*"],
+                ),
+                FilterRule(
+                    name="scary",
+                    category=ContentCategory.VIOLENCE,
+                    action=FilterAction.BLOCK,
+                    keywords={"zombie"},
+                    patterns=[r"kill\w*"],
+                    age_brackets={AgeBracket.AGES_5_8, AgeBracket.AGES_9_12},
+                ),
+            ]
+        )
+
+    def test_for_age(self) -> None:
+        """Test mapping ages to brackets, clamping ages outside every bracket."""
+        assert AgeBracket.for_age(3) == AgeBracket.AGES_5_8
+        assert AgeBracket.for_age(9) == AgeBracket.AGES_9_12
+        assert AgeBracket.for_age(15) == AgeBracket.AGES_13_15
+        assert AgeBracket.for_age(30) == AgeBracket.AGES_16_17
+        assert AgeBracket.AGES_13_15.bounds == (13, 15)
+
+    def test_profile_selected_by_age(self) -> None:
+        """Test that bracket-limited rules only apply to their brackets."""
+        filter_obj = self._filter()
+        assert filter_obj.filter("a zombie", {"age": 7}).passed is False
+        assert filter_obj.filter("a zombie", {"age": 14}).passed is True
+        assert filter_obj.filter("a zombie").passed is False
+        assert filter_obj.filter("a fight", {"age": 16}).passed is False
+        assert [rule.name for rule in filter_obj.profile({"age": 16}).rules] == ["violence"]
+
+    def test_profiles_share_rule_data(self) -> None:
+        """Test that profiles are cached, share rules and patterns, and are invalidated."""
+        filter_obj = self._filter()
+        young = filter_obj.compiled(AgeBracket.AGES_5_8)
+        teen = filter_obj.compiled(AgeBracket.AGES_16_17)
+        assert filter_obj.compiled(AgeBracket.AGES_5_8) is young
+        assert young.rules[0] is teen.rules[0]
+        assert young._patterns[0] is teen._patterns[0] is young._patterns[1]
+
+        filter_obj.rules[1].age_brackets.add(AgeBracket.AGES_16_17)
+        filter_obj.invalidate()
+        assert filter_obj.filter("a zombie", {"age": 17}).passed is False
+
+
+class TestFilterBatch:
+    """Tests for ContentFilter.filter_batch()."""
+
+    def _filter(self) -> ContentFilter:
+        return ContentFilter(
+            rules=[
+                FilterRule(
+                    name="violence",
+                    category=ContentCategory.VIOLENCE,
+                    action=FilterAction.BLOCK,
+                    keywords={"fight"},
+                )
+            ]
+        )
+
+    def test_in_process(self) -> None:
+        """Test batch filtering without workers."""
+        results = list(self._filter().filter_batch(["hello", "a fight"]))
+        assert [result.passed for result in results] == [True, False]
 
+    def test_process_pool_preserves_order(self) -> None:
+        """Test that worker results come back in input order."""
+        contents = (f"message {i} fight" if i % 3 == 0 else f"message {i}" for i in range(500))
+        results = list(self._filter().filter_batch(contents, workers=2, chunksize=16))
+        assert len(results) == 500
+        assert [result.passed for result in results] == [i % 3 != 0 for i in range(500)]
 
-# TODO: Add tests when implementation is complete
-# - test_keyword_filtering
-# - test_pattern_matching
-# - test_content_sanitization
-# - test_multiple_rules
+    def test_early_stop(self) -> None:
+        """Test that a partially consumed batch shuts its pool down."""
+        batch = self._filter().filter_batch(("x" for _ in range(10_000)), workers=2, chunksize=8)
+        assert next(batch).passed is True
+        batch.close()
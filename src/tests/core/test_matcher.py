@@ -0,0 +1,114 @@
+"""Tests for the compiled multi-rule matcher."""
+
+import pickle
+from typing import List
+
+from parent_ai_safety.core.filter import ContentCategory, FilterAction, FilterRule
+from parent_ai_safety.core.matcher import CompiledRuleSet, KeywordAutomaton
+
+
+class TestKeywordAutomaton:
+    """Tests for KeywordAutomaton."""
+
+    def test_overlapping_keywords(self) -> None:
+        """Test that overlapping and nested keywords are all reported."""
+        automaton = KeywordAutomaton(["he", "she", "hers", "his"])
+        matches = {
+            (start, end, automaton.keywords[keyword_id])
+            for start, end, keyword_id in automaton.iter_matches("ushers he his")
+        }
+        # Only whole words count, so "she"/"he" inside "ushers" are ignored.
+        assert matches == {(7, 9, "he"), (10, 13, "his")}
+
+    def test_multi_word_keyword(self) -> None:
+        """Test keywords containing spaces."""
+        automaton = KeywordAutomaton(["bad word"])
+        assert list(automaton.iter_matches("a Bad Word here")) == [(2, 10, 0)]
+
+    def test_empty(self) -> None:
+        """Test automaton without keywords."""
+        automaton = KeywordAutomaton([])
+        assert len(automaton) == 0
+        assert list(automaton.iter_matches("anything")) == []
+
+
+class TestCompiledRuleSet:
+    """Tests for CompiledRuleSet."""
+
+    def _rules(self) -> List[FilterRule]:
+        return [
+            FilterRule(
+                name="a",
+                category=ContentCategory.CUSTOM,
+                action=FilterAction.WARN,
+                keywords={"apple", "shared"},
+                patterns=[r"\d+"],
+            ),
+            FilterRule(
+                name="b",
+                category=ContentCategory.CUSTOM,
+                action=FilterAction.BLOCK,
+                keywords={"shared"},
+                patterns=[r"\d{3}"],
+            ),
+        ]
+
+    def test_scan_reports_every_rule(self) -> None:
+        """Test shared keywords and shadowed patterns are attributed to all rules."""
+        hits = CompiledRuleSet(self._rules()).scan("shared 12345")
+        assert hits["a"] == [(0, 6), (7, 12)]
+        # r"\d{3}" is shadowed by r"\d+" in the combined alternation, but its
+        # spans must be reported even though rule b already hit a keyword.
+        assert hits["b"] == [(0, 6), (7, 10)]
+        hits = CompiledRuleSet(self._rules()).scan("apple 12345")
+        assert hits["b"] == [(6, 9)]
+
+    def test_scan_no_match(self) -> None:
+        """Test scanning clean text."""
+        assert CompiledRuleSet(self._rules()).scan("nothing here") == {}
+
+    def test_overlapping_patterns_of_one_rule(self) -> None:
+        """Test that overlapping patterns of a rule all report their spans."""
+        rule = FilterRule(
+            name="pii",
+            category=ContentCategory.PERSONAL_INFO,
+            action=FilterAction.SANITIZE,
+            patterns=[r"call me", r"me at \d+"],
+        )
+        hits = CompiledRuleSet([rule]).scan("call me at 5551234")
+        assert hits == {"pii": [(0, 7), (5, 18)]}
+
+    def test_numeric_backreferences(self) -> None:
+        """Test that patterns with numbered group references keep their meaning."""
+        rules = [
+            FilterRule(
+                name=name,
+                category=ContentCategory.CUSTOM,
+                action=FilterAction.WARN,
+                patterns=[pattern],
+            )
+            for name, pattern in (("digits", r"\d+"), ("word", r"(\w+)-\1"))
+        ]
+        compiled = CompiledRuleSet(rules)
+        assert compiled.scan("bye-bye 42") == {"digits": [(8, 10)], "word": [(0, 7)]}
+        assert compiled.scan("bye-bye") == {"word": [(0, 7)]}
+        assert compiled.scan("bye-now") == {}
+
+    def test_uncombinable_patterns(self) -> None:
+        """Test patterns that cannot be merged into one alternation."""
+        rules = [
+            FilterRule(
+                name=name,
+                category=ContentCategory.CUSTOM,
+                action=FilterAction.WARN,
+                patterns=[r"(?P<word>" + name + r")"],
+            )
+            for name in ("foo", "bar")
+        ]
+        hits = CompiledRuleSet(rules).scan("foo and bar")
+        assert hits == {"foo": [(0, 3)], "bar": [(8, 11)]}
+
+    def test_picklable(self) -> None:
+        """Test that compiled rule sets survive pickling."""
+        compiled = pickle.loads(pickle.dumps(CompiledRuleSet(self._rules())))  # noqa: S301
+        assert set(compiled.scan("apple 999")) == {"a", "b"}
@@ -0,0 +1,130 @@
+"""Tests for evasion-resistant text normalization."""
+
+from typing import List
+
+import pytest
+
+from parent_ai_safety.core.filter import (
+    ContentCategory,
+    ContentFilter,
+    FilterAction,
+    FilterRule,
+)
+from parent_ai_safety.core.normalize import TextNormalizer
+
+
+class TestTextNormalizer:
+    """Tests for TextNormalizer."""
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "b@d",
+            "B4D",
+            "bаd",  # Cyrillic a
+            "b\u200bad",  # zero-width space
+            "ＢＡＤ",  # full-width letters
+            "b a d",
+            "b.a.d",
+            "ba\u0301d",  # combining accent
+        ],
+    )
+    def test_evasions_fold_to_plain_text(self, text: str) -> None:
+        """Test that common evasions normalize to the plain keyword."""
+        assert TextNormalizer().normalize(text).text == "bad"
+
+    def test_runs_collapse_to_two_and_one(self) -> None:
+        """Test that long runs keep a double-letter form and a single-letter form."""
+        normalized = TextNormalizer().normalize("baaaaad killll")
+        assert normalized.text == "baad kill"
+        assert normalized.collapsed is not None
+        assert normalized.collapsed.text == "bad kil"
+        assert TextNormalizer().normalize("kill cool").collapsed is None
+
+    def test_ordinary_text_kept(self) -> None:
+        """Test that numbers, double letters and words stay intact."""
+        normalized = TextNormalizer().normalize("Take route 66, it's a good idea")
+        assert normalized.text == "take route 66, it's a good idea"
+
+    def test_offset_map(self) -> None:
+        """Test mapping normalized spans back to the original text."""
+        original = "so b a a a d!"
+        normalized = TextNormalizer().normalize(original)
+        assert normalized.text == "so baad!"
+        start, end = normalized.to_original((3, 7))
+        assert original[start:end] == "b a a a d"
+        assert normalized.collapsed is not None
+        start, end = normalized.collapsed.to_original((3, 6))
+        assert original[start:end] == "b a a a d"
+
+
+class TestNormalizedFiltering:
+    """Tests for ContentFilter with a normalizer."""
+
+    def _filter(self, action: FilterAction) -> ContentFilter:
+        return ContentFilter(
+            rules=[
+                FilterRule(
+                    name="profanity",
+                    category=ContentCategory.PROFANITY,
+                    action=action,
+                    keywords={"darn"},
+                    patterns=[r"\d{3}-\d{4}"],
+                )
+            ],
+            normalizer=TextNormalizer(),
+        )
+
+    def test_evasion_blocked(self) -> None:
+        """Test that evasive spellings match keyword rules."""
+        content_filter = self._filter(FilterAction.BLOCK)
+        assert content_filter.filter("d 4 r n").passed is True  # digits alone stay digits
+        assert content_filter.filter("d@rn it").passed is False
+        assert ContentFilter(content_filter.rules).filter("d@rn it").passed is True
+
+    @pytest.mark.parametrize(
+        "keyword, texts",
+        [
+            ("kill", ["kill", "KILL", "killll", "k1ll", "kiiill"]),
+            ("cool", ["cool", "cooool", "c00l"]),
+            ("covid19", ["covid19", "COVID19"]),
+            ("bad", ["bad", "baaaad", "b@d"]),
+        ],
+    )
+    def test_keywords_normalized_like_text(self, keyword: str, texts: List[str]) -> None:
+        """Test that double letters and digits in keywords do not cause misses."""
+        content_filter = ContentFilter(
+            rules=[
+                FilterRule(
+                    name="rule",
+                    category=ContentCategory.VIOLENCE,
+                    action=FilterAction.BLOCK,
+                    keywords={keyword},
+                )
+            ],
+            normalizer=TextNormalizer(),
+        )
+        for text in texts:
+            assert content_filter.filter(f"say {text} now").passed is False, text
+        assert content_filter.filter("say something else").passed is True
+
+    def test_patterns_match_normalized_text(self) -> None:
+        """Test that patterns catch evasions without losing plain matches."""
+        content_filter = ContentFilter(
+            rules=[
+                FilterRule(
+                    name="rule",
+                    category=ContentCategory.VIOLENCE,
+                    action=FilterAction.SANITIZE,
+                    patterns=[r"\bshoot(ing)?\b", r"covid19"],
+                )
+            ],
+            normalizer=TextNormalizer(),
+        )
+        result = content_filter.filter("5h00ting and covid19")
+        assert result.sanitized_content == "*** and ***"
+
+    def test_sanitize_masks_original_spans(self) -> None:
+        """Test that keyword and pattern spans refer to the original content."""
+        result = self._filter(FilterAction.SANITIZE).filter("D-A-R-N, call 555-1234")
+        assert result.sanitized_content == "***, call ***"
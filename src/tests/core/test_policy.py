@@ -31,21 +31,144 @@ class TestSafetyPolicy:
         assert policy.level == SafetyLevel.MODERATE
         assert len(policy.rules) == 0
 
-    def test_validate_not_implemented(self) -> None:
-        """Test that validate() raises NotImplementedError."""
+    def test_validate(self) -> None:
+        """Test that validate() accepts valid policies and reports bad conditions."""
         policy = SafetyPolicy(name="test", level=SafetyLevel.STRICT)
-        with pytest.raises(NotImplementedError):
+        assert policy.validate() is True
+        for conditions in (
+            {"keyword": ["typo"]},
+            {"keywords": "not a list"},
+            {"patterns": ["("]},
+            {"min_age": 12, "max_age": 10},
+            {"action": "warn"},
+        ):
+            policy.rules = [SafetyRule(name="bad", description="d", conditions=conditions)]
+            with pytest.raises(ValueError):
+                policy.validate()
+            with pytest.raises(ValueError):
+                policy.enforce("anything")
+        rule = SafetyRule(name="dup", description="d")
+        policy.rules = [rule, rule]
+        with pytest.raises(ValueError):
             policy.validate()
 
-    def test_enforce_not_implemented(self) -> None:
-        """Test that enforce() raises NotImplementedError."""
-        policy = SafetyPolicy(name="test", level=SafetyLevel.STRICT)
-        with pytest.raises(NotImplementedError):
-            policy.enforce("test content")
+    def test_policy_enforcement(self) -> None:
+        """Test keyword, pattern, length and age conditions."""
+        policy = SafetyPolicy(
+            name="test",
+            rules=[
+                SafetyRule(name="no_weapons", description="d", conditions={"keywords": ["Sword"]}),
+                SafetyRule(
+                    name="no_urls", description="d", conditions={"patterns": [r"https?://"]}
+                ),
+                SafetyRule(name="too_long", description="d", conditions={"min_length": 20}),
+                SafetyRule(
+                    name="under_ten",
+                    description="d",
+                    conditions={"max_age": 9, "keywords": ["horror"]},
+                ),
+            ],
+        )
+        assert policy.enforce("hello") is True
+        assert policy.enforce("a sword") is False
+        assert policy.enforce("see http://x") is False
+        assert policy.enforce("x" * 20) is False
+        assert policy.enforce("horror", {"age": 8}) is False
+        assert policy.enforce("horror", {"age": 12}) is True
+        assert policy.enforce("horror") is True
+
+    def test_rule_conflicts(self) -> None:
+        """Test priority resolution between allow and block rules."""
+        block = SafetyRule(
+            name="block_games", description="d", priority=1, conditions={"keywords": ["game"]}
+        )
+        allow = SafetyRule(
+            name="allow_teens",
+            description="d",
+            priority=5,
+            conditions={"min_age": 13, "action": "allow"},
+        )
+        policy = SafetyPolicy(name="test", rules=[block, allow])
+        assert policy.enforce("a game", {"age": 14}) is True
+        assert policy.enforce("a game", {"age": 10}) is False
+
+        # Equal priority: block wins.
+        allow.priority = 1
+        assert policy.enforce("a game", {"age": 14}) is False
+
+        # Disabled rules are ignored.
+        block.enabled = False
+        assert policy.enforce("a game", {"age": 10}) is True
+
+    def test_compiled_plan(self) -> None:
+        """Test plan caching, short-circuiting and invalidation."""
+        policy = SafetyPolicy(
+            name="test",
+            rules=[
+                SafetyRule(name="catch_all", description="d", priority=5),
+                SafetyRule(name="unreachable", description="d", conditions={"min_length": 1}),
+                SafetyRule(
+                    name="allow_teens",
+                    description="d",
+                    priority=9,
+                    conditions={"min_age": 13, "action": "allow"},
+                ),
+            ],
+        )
+        plan = policy.compiled()
+        assert [step.name for step in plan.steps] == ["allow_teens", "catch_all"]
+        assert policy.compiled() is plan
+        assert policy.enforce("hi", {"age": 14}) is True
+        assert policy.enforce("hi", {"age": 8}) is False
+
+        policy.rules[0].enabled = False
+        assert policy.compiled() is not plan
+        assert [step.name for step in policy.compiled().steps] == ["allow_teens", "unreachable"]
+
+    def test_evaluation_stops_at_first_decisive_step(self) -> None:
+        """Test that later steps' keywords and patterns are not searched."""
+        searched = []
+
+        class RecordingPattern:
+            def search(self, content: str) -> None:
+                searched.append(content)
+
+        policy = SafetyPolicy(
+            name="test",
+            rules=[
+                SafetyRule(name="short", description="d", priority=5, conditions={"max_length": 5}),
+                SafetyRule(name="urls", description="d", conditions={"patterns": ["https?://"]}),
+            ],
+        )
+        plan = policy.compiled()
+        plan.steps[1].patterns = (RecordingPattern(),)  # type: ignore[assignment]
+        assert policy.enforce("hi") is False
+        assert searched == []
+        assert policy.enforce("a longer text") is True
+        assert searched == ["a longer text"]
+
+    def test_rule_edits_invalidate_owning_policies_only(self) -> None:
+        """Test that editing a rule bumps the version of the policies holding it."""
+        rule = SafetyRule(name="a", description="d", conditions={"keywords": ["x"]})
+        owner = SafetyPolicy(name="owner", rules=[rule])
+        other = SafetyPolicy(
+            name="other",
+            rules=[SafetyRule(name="b", description="d", conditions={"keywords": ["y"]})],
+        )
+        merged = owner.merge(other)
+        versions = (owner.version, other.version, merged.version)
+
+        rule.enabled = False
+        assert owner.version != versions[0]
+        assert (other.version, merged.version) == versions[1:]
+        assert owner.enforce("x") is True
+        assert merged.enforce("x") is False
+
+        owner_version = owner.version
+        merged.rules[0].priority = 3
+        assert merged.version != versions[2]
+        assert owner.version == owner_version
 
 
 # TODO: Add tests when implementation is complete
-# - test_policy_validation
-# - test_policy_enforcement
-# - test_rule_conflicts
 # - test_policy_merging
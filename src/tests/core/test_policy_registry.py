@@ -0,0 +1,107 @@
+"""Tests for layered policies and the policy registry."""
+
+import pytest
+
+from parent_ai_safety.core.policy import SafetyLevel, SafetyPolicy, SafetyRule
+from parent_ai_safety.core.policy_registry import PolicyRegistry
+
+
+def _rule(name: str, keyword: str, **kwargs: object) -> SafetyRule:
+    return SafetyRule(name=name, description="d", conditions={"keywords": [keyword]}, **kwargs)
+
+
+@pytest.fixture
+def registry() -> PolicyRegistry:
+    """Platform -> family -> child layers."""
+    registry = PolicyRegistry()
+    registry.add("platform", SafetyPolicy(name="platform", rules=[_rule("weapons", "sword")]))
+    registry.add(
+        "family",
+        SafetyPolicy(name="family", rules=[_rule("games", "game")], metadata={"tz": "UTC"}),
+        parent="platform",
+    )
+    registry.add(
+        "teen",
+        SafetyPolicy(
+            name="teen",
+            level=SafetyLevel.PERMISSIVE,
+            rules=[_rule("games", "game", enabled=False)],
+        ),
+        parent="family",
+    )
+    return registry
+
+
+class TestPolicyMerge:
+    """Tests for SafetyPolicy.merge()."""
+
+    def test_override_replaces_rules_by_name(self) -> None:
+        """Test rule, level and metadata precedence."""
+        base = SafetyPolicy(
+            name="base", rules=[_rule("a", "x"), _rule("b", "y")], metadata={"k": 1, "j": 2}
+        )
+        override = SafetyPolicy(
+            name="child",
+            level=SafetyLevel.STRICT,
+            rules=[_rule("b", "z")],
+            metadata={"k": 3},
+        )
+        merged = base.merge(override)
+        assert merged.name == "child" and merged.level == SafetyLevel.STRICT
+        assert [rule.name for rule in merged.rules] == ["a", "b"]
+        assert merged.rules[1].conditions == {"keywords": ["z"]}
+        assert merged.metadata == {"k": 3, "j": 2}
+        assert merged.rules[0] is not base.rules[0]
+
+
+class TestPolicyRegistry:
+    """Tests for PolicyRegistry."""
+
+    def test_effective_policies(self, registry: PolicyRegistry) -> None:
+        """Test inheritance down the tree."""
+        registry.assign("kid", "family")
+        registry.assign("older", "teen")
+        assert registry.policy_for("kid").enforce("a game") is False
+        assert registry.policy_for("older").enforce("a game") is True
+        assert registry.policy_for("older").enforce("a sword") is False
+        assert registry.policy_for("older").level == SafetyLevel.PERMISSIVE
+
+    def test_cached_and_shared(self, registry: PolicyRegistry) -> None:
+        """Test that users of one layer share its effective policy without re-merging."""
+        for index in range(100):
+            registry.assign(f"kid{index}", "family")
+        policies = {id(registry.policy_for(f"kid{index}")) for index in range(100)}
+        assert len(policies) == 1
+        assert registry.merges == 2
+
+    def test_ancestor_change_propagates(self, registry: PolicyRegistry) -> None:
+        """Test incremental rebuilds after ancestors are replaced or edited in place."""
+        teen = registry.effective("teen")
+        merges = registry.merges
+        registry.update("platform", SafetyPolicy(name="platform", rules=[_rule("drugs", "pill")]))
+        assert registry.effective("teen") is teen
+        assert teen.enforce("a pill") is False
+        assert teen.enforce("a sword") is True
+        assert registry.merges == merges + 3
+
+        family = SafetyPolicy(name="family")
+        registry.update("family", family)
+        registry.refresh("family")
+        family.add_rule(_rule("chat", "dm"))
+        registry.refresh("family")
+        assert teen.enforce("send a dm") is False
+        assert registry.merges == merges + 7
+
+    def test_graph_maintenance(self, registry: PolicyRegistry) -> None:
+        """Test dependents, removal rules and unknown layers."""
+        assert registry.dependents("platform") == ["family", "teen"]
+        with pytest.raises(ValueError):
+            registry.remove("family")
+        with pytest.raises(ValueError):
+            registry.add("family", SafetyPolicy(name="dup"))
+        registry.assign("older", "teen")
+        registry.remove("teen")
+        with pytest.raises(KeyError):
+            registry.policy_for("older")
+        with pytest.raises(KeyError):
+            registry.add("orphan", SafetyPolicy(name="orphan"), parent="missing")
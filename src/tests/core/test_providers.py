@@ -0,0 +1,209 @@
+"""Tests for AI provider adapters and routing."""
+
+import asyncio
+from typing import List
+
+import pytest
+
+from parent_ai_safety.core.ai_wrapper import (
+    BLOCKED_REQUEST_MESSAGE,
+    BLOCKED_RESPONSE_MESSAGE,
+    AIRequest,
+    AISafetyWrapper,
+)
+from parent_ai_safety.core.async_wrapper import AsyncAISafetyWrapper
+from parent_ai_safety.core.filter import ContentCategory, ContentFilter, FilterAction, FilterRule
+from parent_ai_safety.core.policy import SafetyPolicy
+from parent_ai_safety.core.providers import (
+    ConnectionPool,
+    MockProviderServer,
+    OpenAIChatProvider,
+    Provider,
+    ProviderError,
+    ProviderRouter,
+)
+
+
+class FakeProvider(Provider):
+    """Provider answering after a delay, or failing."""
+
+    def __init__(
+        self, name: str, answer: str = "ok", delay: float = 0.0, fail: bool = False
+    ) -> None:
+        super().__init__(name, max_concurrency=1, timeout=1.0)
+        self.answer = answer
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.cancelled = 0
+
+    async def _complete(self, prompt: str) -> str:
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise ProviderError(f"{self.name} failed")
+        return self.answer
+
+
+def _filter() -> ContentFilter:
+    return ContentFilter(
+        rules=[
+            FilterRule(
+                name="violence",
+                category=ContentCategory.VIOLENCE,
+                action=FilterAction.BLOCK,
+                keywords={"fight"},
+            )
+        ]
+    )
+
+
+class TestProviderRouter:
+    """Tests for hedging and fallback."""
+
+    def test_fallback_on_failure(self) -> None:
+        """Test that a failed provider falls back to the next one."""
+        router = ProviderRouter([FakeProvider("a", fail=True), FakeProvider("b", answer="hi")])
+        completion = asyncio.run(router.complete("hello"))
+        assert (completion.provider, completion.text) == ("b", "hi")
+        assert router.fallbacks == 1
+
+    def test_all_failed(self) -> None:
+        """Test that an error is raised when every provider fails."""
+        router = ProviderRouter([FakeProvider("a", fail=True), FakeProvider("b", fail=True)])
+        with pytest.raises(ProviderError, match="a failed; b failed"):
+            asyncio.run(router.complete("hello"))
+        with pytest.raises(ValueError):
+            ProviderRouter([])
+
+    def test_hedge_slow_primary(self) -> None:
+        """Test that a slow primary is hedged and cancelled once the hedge answers."""
+        slow = FakeProvider("slow", delay=1.0)
+        fast = FakeProvider("fast")
+        router = ProviderRouter([slow, fast], hedge_after=0.01)
+        assert asyncio.run(router.complete("hello")).provider == "fast"
+        assert router.hedges == 1
+        assert slow.cancelled == 1
+
+    def test_timeout(self) -> None:
+        """Test that a call exceeding the provider timeout fails."""
+        slow = FakeProvider("slow", delay=1.0)
+        slow.timeout = 0.01
+        with pytest.raises(ProviderError, match="timed out"):
+            asyncio.run(ProviderRouter([slow]).complete("hello"))
+
+    def test_rejected_answers_fall_back(self) -> None:
+        """Test that rejected answers try the next provider, keeping the last one."""
+        router = ProviderRouter([FakeProvider("a", answer="bad"), FakeProvider("b", answer="bad")])
+        seen: List[str] = []
+
+        def accept(text: str) -> bool:
+            seen.append(text)
+            return False
+
+        assert asyncio.run(router.complete("hello", accept)).provider == "b"
+        assert seen == ["bad", "bad"]
+
+    def test_concurrency_limit(self) -> None:
+        """Test that concurrent calls beyond max_concurrency wait."""
+        provider = FakeProvider("a", delay=0.02)
+        provider.max_concurrency = 2
+        active: List[int] = []
+        original = provider._complete
+
+        async def tracked(prompt: str) -> str:
+            active.append(1)
+            assert len(active) <= 2
+            try:
+                return await original(prompt)
+            finally:
+                active.pop()
+
+        provider._complete = tracked  # type: ignore[method-assign]
+
+        async def run() -> None:
+            await asyncio.gather(*(provider.complete(str(i)) for i in range(6)))
+
+        asyncio.run(run())
+        assert provider.calls == 6
+
+
+class TestHTTPProviders:
+    """Tests against the local mock provider server."""
+
+    def test_connections_reused(self) -> None:
+        """Test that sequential calls share one keep-alive connection."""
+        pool = ConnectionPool()
+        with MockProviderServer(reply=str.upper) as server:
+            provider = OpenAIChatProvider(pool, model="mock", url=server.url)
+
+            async def run() -> List[str]:
+                return [(await provider.complete(f"hi {i}")).text for i in range(5)]
+
+            assert asyncio.run(run()) == [f"HI {i}" for i in range(5)]
+            assert server.requests == 5
+            assert server.connections == pool.connections_opened == 1
+        pool.close()
+
+    def test_http_error(self) -> None:
+        """Test that HTTP errors and unreachable servers raise ProviderError."""
+        pool = ConnectionPool()
+        with MockProviderServer(failure_rate=1.0) as server:
+            provider = OpenAIChatProvider(pool, model="mock", url=server.url)
+            with pytest.raises(ProviderError, match="HTTP 503"):
+                asyncio.run(provider.complete("hi"))
+            url = server.url
+        provider = OpenAIChatProvider(ConnectionPool(), model="mock", url=url, timeout=1.0)
+        with pytest.raises(ProviderError, match="request failed"):
+            asyncio.run(provider.complete("hi"))
+
+
+class TestWrapperCompletion:
+    """Tests for end-to-end completions through the wrappers."""
+
+    def test_blocked_answer_falls_back(self) -> None:
+        """Test that a blocked answer is replaced by the next provider's answer."""
+        router = ProviderRouter(
+            [FakeProvider("a", answer="let's fight"), FakeProvider("b", answer="let's read")]
+        )
+        wrapper = AISafetyWrapper(SafetyPolicy(name="test"), _filter(), router=router)
+        response = asyncio.run(wrapper.acomplete(AIRequest(prompt="hello", user_id="child")))
+        assert response.content == "let's read"
+        assert response.metadata["provider"] == "b"
+
+        only_bad = ProviderRouter([FakeProvider("a", answer="a fight")])
+        wrapper = AISafetyWrapper(SafetyPolicy(name="test"), _filter(), router=only_bad)
+        response = asyncio.run(wrapper.acomplete(AIRequest(prompt="hello", user_id="child")))
+        assert response.content == BLOCKED_RESPONSE_MESSAGE
+
+    def test_blocked_prompt_not_sent(self) -> None:
+        """Test that blocked prompts never reach a provider."""
+        provider = FakeProvider("a")
+        wrapper = AsyncAISafetyWrapper(
+            SafetyPolicy(name="test"), _filter(), router=ProviderRouter([provider])
+        )
+        response = asyncio.run(wrapper.complete(AIRequest(prompt="a fight", user_id="child")))
+        assert response.content == BLOCKED_REQUEST_MESSAGE
+        assert response.metadata["denied_by"] == ["content"]
+        assert provider.calls == 0
+
+    def test_mock_server_round_trip(self) -> None:
+        """Test the whole async path against the mock server."""
+        pool = ConnectionPool()
+        with MockProviderServer() as server:
+            router = ProviderRouter([OpenAIChatProvider(pool, model="mock", url=server.url)])
+            wrapper = AsyncAISafetyWrapper(SafetyPolicy(name="test"), _filter(), router=router)
+            response = asyncio.run(wrapper.complete(AIRequest(prompt="hello", user_id="child")))
+        assert response.content == "Mock answer to: hello"
+        assert response.filtered is False
+        with pytest.raises(RuntimeError):
+            asyncio.run(
+                AISafetyWrapper(SafetyPolicy(name="t"), _filter()).generate(
+                    AIRequest(prompt="hello", user_id="child")
+                )
+            )
+        pool.close()
@@ -0,0 +1,210 @@
+"""Tests for streaming response filtering."""
+
+import asyncio
+from typing import AsyncIterator, List, Tuple
+
+from parent_ai_safety.core.ai_wrapper import (
+    BLOCKED_RESPONSE_MESSAGE,
+    AIRequest,
+    AISafetyWrapper,
+)
+from parent_ai_safety.core.filter import (
+    AgeBracket,
+    ContentCategory,
+    ContentFilter,
+    FilterAction,
+    FilterRule,
+)
+from parent_ai_safety.core.normalize import TextNormalizer
+from parent_ai_safety.core.policy import SafetyPolicy, SafetyRule
+from parent_ai_safety.core.streaming import StreamingFilter, filter_stream
+
+
+def _filter() -> ContentFilter:
+    return ContentFilter(
+        rules=[
+            FilterRule(
+                name="violence",
+                category=ContentCategory.VIOLENCE,
+                action=FilterAction.BLOCK,
+                keywords={"attack"},
+            ),
+            FilterRule(
+                name="mild",
+                category=ContentCategory.PROFANITY,
+                action=FilterAction.SANITIZE,
+                keywords={"darn"},
+            ),
+        ]
+    )
+
+
+class TestStreamingFilter:
+    """Tests for StreamingFilter."""
+
+    def test_safe_stream_is_passed_through(self) -> None:
+        """Test that a clean stream is emitted unchanged and early."""
+        stream = StreamingFilter(_filter(), window=8)
+        first = stream.feed("Once upon a time there was a ")
+        assert first  # emitted before the stream finished
+        rest = stream.feed("friendly dragon.") + stream.close()
+        assert first + rest == "Once upon a time there was a friendly dragon."
+        assert stream.result().passed is True
+
+    def test_block_across_chunk_boundary(self) -> None:
+        """Test that a keyword split over chunks still cuts the stream."""
+        chunks = ["The army will at", "tack at dawn and more text follows"]
+        output = list(filter_stream(_filter(), chunks, window=8))
+        assert "attack" not in "".join(output)
+        assert "at dawn" not in "".join(output)
+
+    def test_sanitize_across_chunk_boundary(self) -> None:
+        """Test that SANITIZE spans split over chunks are masked."""
+        chunks = ["oh da", "rn, ", "that is a darn shame"]
+        stream = StreamingFilter(_filter(), window=4)
+        output = "".join(stream.feed(chunk) for chunk in chunks) + stream.close()
+        assert output == "oh ***, that is a *** shame"
+        assert stream.result().matched_rules == ["mild"]
+
+    def test_keyword_inside_longer_word(self) -> None:
+        """Test that a chunk ending in a keyword prefix of a longer word passes."""
+        chunks = ["the team will counter", "attack", "ers"]
+        stream = StreamingFilter(_filter(), window=1)
+        output = "".join(stream.feed(chunk) for chunk in chunks) + stream.close()
+        assert stream.blocked is False
+        assert output == "the team will counterattackers"
+
+    def test_normalized_evasions_char_by_char(self) -> None:
+        """Test that padded and stretched keywords are caught when fed one character at a time."""
+        content_filter = ContentFilter(
+            rules=[
+                FilterRule(
+                    name="threat",
+                    category=ContentCategory.VIOLENCE,
+                    action=FilterAction.BLOCK,
+                    keywords={"kill"},
+                ),
+                FilterRule(
+                    name="mild",
+                    category=ContentCategory.PROFANITY,
+                    action=FilterAction.SANITIZE,
+                    keywords={"bad"},
+                ),
+            ],
+            normalizer=TextNormalizer(),
+        )
+
+        def stream(text: str, window: int) -> Tuple[str, bool]:
+            streaming = StreamingFilter(content_filter, window=window)
+            output = "".join(streaming.feed(char) for char in text) + streaming.close()
+            return output, streaming.blocked
+
+        padded = "k" + "\u200b" * 80 + "ill you"
+        assert content_filter.filter(padded).passed is False
+        output, blocked = stream(padded, 8)
+        assert blocked is True
+        assert "ill" not in output
+
+        assert stream("i will k i l l you", 3)[1] is True
+        assert stream("so b" + "a" * 16 + "d today", 3) == ("so *** today", False)
+
+    def test_buffer_stays_bounded(self) -> None:
+        """Test that only the carry-over window is retained between chunks."""
+        stream = StreamingFilter(_filter(), window=16)
+        for _ in range(100):
+            stream.feed("lorem ipsum dolor sit amet ")
+        assert len(stream._buffer) <= 17
+
+
+class TestAISafetyWrapperStreaming:
+    """Tests for AISafetyWrapper response processing."""
+
+    def _wrapper(self) -> AISafetyWrapper:
+        return AISafetyWrapper(SafetyPolicy(name="test"), _filter(), stream_window=8)
+
+    def test_process_response(self) -> None:
+        """Test whole-response filtering."""
+        request = AIRequest(prompt="hi", user_id="child")
+        wrapper = self._wrapper()
+        assert wrapper.process_response("hello", request).content == "hello"
+        blocked = wrapper.process_response("attack now", request)
+        assert blocked.filtered is True
+        assert blocked.content == BLOCKED_RESPONSE_MESSAGE
+        assert wrapper.process_response("darn", request).content == "***"
+
+    def test_stream_response_cuts_on_block(self) -> None:
+        """Test that the wrapper appends the blocked message when cut."""
+        request = AIRequest(prompt="hi", user_id="child")
+        output = list(
+            self._wrapper().stream_response(["a quiet story. ", "then an attack ", "x"], request)
+        )
+        assert output[-1] == BLOCKED_RESPONSE_MESSAGE
+        assert "attack" not in "".join(output[:-1])
+
+    def test_astream_response(self) -> None:
+        """Test the async streaming API."""
+
+        async def chunks() -> AsyncIterator[str]:
+            for chunk in ["so da", "rn ", "good"]:
+                yield chunk
+
+        async def collect() -> List[str]:
+            request = AIRequest(prompt="hi", user_id="child")
+            return [text async for text in self._wrapper().astream_response(chunks(), request)]
+
+        assert "".join(asyncio.run(collect())) == "so *** good"
+
+    def test_stream_uses_request_context(self) -> None:
+        """Test that age-profile and policy-only rules cut a streamed response."""
+        content_filter = _filter()
+        content_filter.add_rule(
+            FilterRule(
+                name="scary",
+                category=ContentCategory.VIOLENCE,
+                action=FilterAction.BLOCK,
+                keywords={"monster"},
+                age_brackets={AgeBracket.AGES_5_8},
+            )
+        )
+        policy = SafetyPolicy(
+            name="family",
+            rules=[
+                SafetyRule(
+                    name="no_casino",
+                    description="Keep gambling out",
+                    conditions={"keywords": ["casino"]},
+                )
+            ],
+        )
+        wrapper = AISafetyWrapper(policy, content_filter, stream_window=8)
+        chunks = ["a friendly mon", "ster story. ", "the end"]
+
+        def stream(chunks: List[str], age: int) -> List[str]:
+            request = AIRequest(prompt="hi", user_id="child", metadata={"age": age})
+            return list(wrapper.stream_response(chunks, request))
+
+        assert "".join(stream(chunks, 14)) == "a friendly monster story. the end"
+        young = stream(chunks, 7)
+        assert young[-1] == BLOCKED_RESPONSE_MESSAGE
+        assert "monster" not in "".join(young[:-1])
+
+        output = stream(["a trip to the cas", "ino tonight and ", "more text after it"], 14)
+        assert output[-1] == BLOCKED_RESPONSE_MESSAGE
+        assert "casino" not in "".join(output[:-1])
+
+    def test_stream_length_conditions(self) -> None:
+        """Test that policy length conditions see the total streamed length."""
+        policy = SafetyPolicy(
+            name="short_answers",
+            rules=[SafetyRule(name="too_long", description="d", conditions={"min_length": 200})],
+        )
+        wrapper = AISafetyWrapper(policy, _filter(), stream_window=8)
+        request = AIRequest(prompt="hi", user_id="child")
+        text = "lorem ipsum dolor sit amet " * 20
+        assert wrapper.process_response(text, request).content == BLOCKED_RESPONSE_MESSAGE
+
+        chunks = [text[index : index + 10] for index in range(0, len(text), 10)]
+        output = list(wrapper.stream_response(chunks, request))
+        assert output[-1] == BLOCKED_RESPONSE_MESSAGE
+        assert len("".join(output[:-1])) < 200
+        assert "".join(wrapper.stream_response(chunks[:5], request)) == text[:50]
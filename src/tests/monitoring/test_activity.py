@@ -0,0 +1,90 @@
+"""Tests for activity monitoring."""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from parent_ai_safety.monitoring.activity import (
+    Activity,
+    ActivityMonitor,
+    ActivitySeverity,
+    ActivityType,
+)
+from parent_ai_safety.monitoring.activity_store import ColumnarActivityStore
+from parent_ai_safety.monitoring.rollups import ActivityRollups
+
+BASE = datetime(2025, 11, 20, 0, 0)
+
+
+def check_summary(monitor: ActivityMonitor) -> None:
+    """Shared assertions for get_summary() over the sample_activities fixture."""
+    summary = monitor.get_summary("kid", BASE + timedelta(hours=24), BASE + timedelta(hours=47))
+    assert summary.total_activities == 24 + 30
+    assert summary.by_type[ActivityType.AI_REQUEST.value] == 24
+    assert summary.by_type[ActivityType.BLOCKED_CONTENT.value] == 30
+    assert summary.by_type[ActivityType.LOGIN.value] == 0
+    assert summary.by_severity[ActivitySeverity.WARNING.value] == 29
+    assert [a.activity_id for a in summary.concerning_activities] == ["burst0"]
+
+
+def check_anomalies(monitor: ActivityMonitor) -> None:
+    """Shared assertions for detect_anomalies() over the sample_activities fixture."""
+    anomalies = monitor.detect_anomalies("kid")
+    assert len(anomalies) == 31
+    assert {a.timestamp.hour for a in anomalies} == {6}
+    assert monitor.detect_anomalies("sibling") == []
+
+
+@pytest.fixture(params=["memory", "columnar", "rollups"])
+def monitor(
+    request: pytest.FixtureRequest, tmp_path: Path, sample_activities: List[Activity]
+) -> ActivityMonitor:
+    """ActivityMonitor over sample_activities, in memory, on a store or with rollups."""
+    store = ColumnarActivityStore(tmp_path) if request.param == "columnar" else None
+    rollups = ActivityRollups() if request.param == "rollups" else None
+    monitor = ActivityMonitor(store=store, rollups=rollups)
+    for activity in sample_activities:
+        monitor.log_activity(activity)
+    return monitor
+
+
+class TestActivityMonitor:
+    """Tests for ActivityMonitor with both storage backends."""
+
+    def test_get_summary(self, monitor: ActivityMonitor) -> None:
+        """Test counts by type and severity and concerning activities."""
+        check_summary(monitor)
+
+    def test_detect_anomalies(self, monitor: ActivityMonitor) -> None:
+        """Test that an hourly burst is flagged against the baseline."""
+        check_anomalies(monitor)
+
+    def test_detect_anomalies_all(self, monitor: ActivityMonitor) -> None:
+        """Test that the platform-wide sweep matches per-user detection."""
+        flagged = monitor.detect_anomalies_all()
+        assert list(flagged) == ["kid"]
+        assert flagged["kid"] == monitor.detect_anomalies("kid")
+
+    def test_get_summaries(self, monitor: ActivityMonitor) -> None:
+        """Test that bulk summaries match per-user summaries."""
+        start, end = BASE, BASE + timedelta(hours=47)
+        summaries = monitor.get_summaries(["kid", "sibling", "nobody"], start, end)
+        assert summaries["kid"] == monitor.get_summary("kid", start, end)
+        assert summaries["sibling"].by_type[ActivityType.LOGIN.value] == 1
+        assert summaries["nobody"].total_activities == 0
+        assert set(monitor.get_summaries(None, start, end)) == {"kid", "sibling"}
+
+    def test_store_replaces_memory_list(self, monitor: ActivityMonitor) -> None:
+        """Test that activities are not kept in memory when a store is used."""
+        assert (monitor.activities == []) == (monitor.store is not None)
+
+    def test_short_history_has_no_baseline(self) -> None:
+        """Test that users with little history are not flagged."""
+        monitor = ActivityMonitor()
+        for i in range(10):
+            monitor.log_activity(
+                Activity(activity_id=str(i), user_id="new", activity_type=ActivityType.LOGIN)
+            )
+        assert monitor.detect_anomalies("new") == []
@@ -0,0 +1,98 @@
+"""Tests for the columnar activity store."""
+
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from parent_ai_safety.monitoring import activity_store
+from parent_ai_safety.monitoring.activity import Activity
+from parent_ai_safety.monitoring.activity_store import ColumnarActivityStore
+
+
+def _store(path: Path, activities: List[Activity]) -> ColumnarActivityStore:
+    store = ColumnarActivityStore(path)
+    for activity in activities:
+        store.append(activity)
+    return store
+
+
+class TestColumnarActivityStore:
+    """Tests for ColumnarActivityStore."""
+
+    def test_round_trip(self, tmp_path: Path, sample_activities: List[Activity]) -> None:
+        """Test that rows materialize back into identical activities."""
+        store = _store(tmp_path, sample_activities)
+        activities = sample_activities
+        assert len(store) == len(activities)
+        assert store.activity(0) == activities[0]
+        assert store.activity(len(activities) - 1) == activities[-1]
+        columns = store.columns()
+        assert columns.rows == len(activities)
+        assert columns.types.itemsize == 1
+
+    def test_persistence(self, tmp_path: Path, sample_activities: List[Activity]) -> None:
+        """Test that a reopened store sees previous activities."""
+        _store(tmp_path, sample_activities).close()
+        reopened = ColumnarActivityStore(tmp_path)
+        assert len(reopened) == len(sample_activities)
+        assert reopened.user_code("sibling") is not None
+        assert reopened.activity(3).activity_id == "h3"
+
+    def test_recovers_from_torn_append(
+        self, tmp_path: Path, sample_activities: List[Activity]
+    ) -> None:
+        """Test that a partially written last row is discarded on open."""
+        _store(tmp_path, sample_activities).close()
+        with open(tmp_path / "timestamps.col", "ab") as handle:
+            handle.write(b"\0" * 3)
+        with open(tmp_path / "users.col", "ab") as handle:
+            handle.write(b"\0" * 4)
+        reopened = ColumnarActivityStore(tmp_path)
+        assert len(reopened) == len(sample_activities)
+        assert (tmp_path / "users.col").stat().st_size == 4 * len(sample_activities)
+
+    def test_recovers_from_torn_heap(
+        self, tmp_path: Path, sample_activities: List[Activity]
+    ) -> None:
+        """Test that rows whose details record is incomplete are discarded on open."""
+        _store(tmp_path, sample_activities).close()
+        heap = tmp_path / "details.heap"
+        size = heap.stat().st_size
+        with open(heap, "r+b") as handle:
+            handle.truncate(size - 5)
+        reopened = ColumnarActivityStore(tmp_path)
+        assert len(reopened) == len(sample_activities) - 1
+        assert reopened.activity(len(reopened) - 1) == sample_activities[-2]
+        assert heap.stat().st_size < size - 5
+        start, end = datetime(2025, 1, 1), datetime(2026, 1, 1)
+        assert sum(
+            sum(row[0].values()) for row in reopened.summarize_many(None, start, end).values()
+        ) == len(reopened)
+        reopened.append(sample_activities[-1])
+        assert reopened.activity(len(sample_activities) - 1) == sample_activities[-1]
+        reopened.close()
+
+    def test_columns_grow_after_append(
+        self, tmp_path: Path, sample_activities: List[Activity]
+    ) -> None:
+        """Test that new appends are visible in later column views."""
+        store = ColumnarActivityStore(tmp_path)
+        activities = sample_activities
+        store.append(activities[0])
+        assert store.columns().rows == 1
+        store.append(activities[1])
+        assert list(store.columns().users) == [0, 0]
+
+    def test_numpy_and_python_grouping_agree(
+        self, tmp_path: Path, sample_activities: List[Activity], monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that the vectorized and pure-Python grouped passes agree."""
+        pytest.importorskip("numpy")
+        store = _store(tmp_path, sample_activities)
+        start, end = datetime(2025, 11, 20, 1), datetime(2025, 11, 21, 6, 10)
+        vectorized = store.summarize_many(None, start, end)
+        monkeypatch.setattr(activity_store, "np", None)
+        assert store.summarize_many(None, start, end) == vectorized
+        assert vectorized["sibling"][0] and len(vectorized["kid"][2]) == 1
@@ -0,0 +1,226 @@
+"""Tests for the coalescing alert bus."""
+
+import asyncio
+import json
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+from parent_ai_safety.monitoring.activity import (
+    Activity,
+    ActivityMonitor,
+    ActivitySeverity,
+    ActivityType,
+)
+from parent_ai_safety.monitoring.alerts import (
+    Alert,
+    AlertBus,
+    AlertSink,
+    CallbackSink,
+    EmailSink,
+    WebhookSink,
+)
+
+BASE = datetime(2025, 11, 20, 12, 0)
+
+
+def _activity(
+    index: int,
+    user_id: str = "kid",
+    activity_type: ActivityType = ActivityType.BLOCKED_CONTENT,
+    severity: ActivitySeverity = ActivitySeverity.ALERT,
+) -> Activity:
+    return Activity(
+        activity_id=f"{user_id}-{index}",
+        user_id=user_id,
+        activity_type=activity_type,
+        severity=severity,
+        timestamp=BASE + timedelta(seconds=index),
+        details={"rule": "violence"},
+    )
+
+
+class FailingSink(AlertSink):
+    """Sink whose deliveries always fail."""
+
+    name = "failing"
+
+    async def send(self, alert: Alert) -> None:
+        raise ConnectionError("down")
+
+
+class TestAlertBus:
+    """Tests for AlertBus."""
+
+    def test_flood_becomes_one_digest(self) -> None:
+        """Test that 500 blocked prompts produce one immediate alert and one digest."""
+        alerts: List[Alert] = []
+        bus = AlertBus([CallbackSink(alerts.append)], window=0.05)
+        monitor = ActivityMonitor(alerts=bus)
+
+        async def run() -> None:
+            bus.start()
+            for index in range(500):
+                monitor.log_activity(_activity(index))
+            monitor.log_activity(_activity(0))
+            monitor.log_activity(_activity(1, severity=ActivitySeverity.INFO))
+            await asyncio.sleep(0.2)
+            await bus.aclose()
+
+        asyncio.run(run())
+        assert len(alerts) == 2
+        assert (alerts[0].count, alerts[0].activity_ids) == (1, ["kid-0"])
+        assert alerts[0].summary == "ALERT: blocked content for kid"
+        assert alerts[1].count == 499
+        assert alerts[1].first_seen == BASE + timedelta(seconds=1)
+        assert alerts[1].last_seen == BASE + timedelta(seconds=499)
+        assert alerts[1].summary == "ALERT: 499 x blocked content for kid"
+        metrics = bus.metrics()
+        assert (metrics.published, metrics.duplicates, metrics.coalesced) == (501, 1, 499)
+        assert (metrics.alerts, metrics.delivered, metrics.open_windows) == (2, 2, 0)
+
+    def test_first_alert_not_delayed(self) -> None:
+        """Test that the first alert of a key is delivered without waiting for its window."""
+        alerts: List[Alert] = []
+
+        async def run() -> float:
+            delivered = asyncio.Event()
+
+            def receive(alert: Alert) -> None:
+                alerts.append(alert)
+                delivered.set()
+
+            async with AlertBus([CallbackSink(receive)], window=60.0) as bus:
+                loop = asyncio.get_running_loop()
+                started = loop.time()
+                await bus.publish(_activity(1))
+                # Fails (times out) if the alert waited for its 60 s window.
+                await asyncio.wait_for(delivered.wait(), 1.0)
+                return loop.time() - started
+
+        latency = asyncio.run(run())
+        assert latency < 0.5
+        assert [alert.activity_ids for alert in alerts] == [["kid-1"]]
+
+    def test_keys_and_severity(self) -> None:
+        """Test that users and types get separate windows and CRITICAL is never held."""
+        alerts: List[Alert] = []
+
+        async def run() -> None:
+            async with AlertBus([CallbackSink(alerts.append)], window=60.0) as bus:
+                await bus.publish(_activity(1))
+                await bus.publish(_activity(2))
+                await bus.publish(_activity(3, severity=ActivitySeverity.CRITICAL))
+                await bus.publish(_activity(4, user_id="sibling"))
+                await bus.publish(_activity(5, activity_type=ActivityType.LIMIT_EXCEEDED))
+                await asyncio.sleep(0.01)
+                assert [alert.activity_ids for alert in alerts] == [
+                    ["kid-1"],
+                    ["kid-3"],
+                    ["sibling-4"],
+                    ["kid-5"],
+                ]
+                assert bus.metrics().open_windows == 3
+
+        # Closing sends open digests without waiting for their window.
+        asyncio.run(run())
+        assert len(alerts) == 5
+        digest = alerts[-1]
+        assert (digest.activity_ids, digest.severity) == (["kid-2"], ActivitySeverity.ALERT)
+
+    def test_backpressure_and_drops(self) -> None:
+        """Test that publish() waits on a full queue and publish_nowait() drops."""
+        bus = AlertBus([], max_queue=2)
+        assert bus.publish_nowait(_activity(0)) is False
+
+        async def run() -> None:
+            bus.start()
+            assert bus.publish_nowait(_activity(1)) is True
+            assert bus.publish_nowait(_activity(2)) is True
+            assert bus.publish_nowait(_activity(3)) is False
+            # Waits until the worker takes an activity off the queue.
+            await asyncio.wait_for(bus.publish(_activity(4)), 1.0)
+            await bus.aclose()
+
+        asyncio.run(run())
+        metrics = bus.metrics()
+        assert (metrics.published, metrics.dropped, metrics.alerts) == (3, 2, 2)
+
+    def test_publish_from_other_thread(self) -> None:
+        """Test that activities logged on worker threads reach the bus."""
+        alerts: List[Alert] = []
+        bus = AlertBus([CallbackSink(alerts.append)], window=60.0)
+
+        async def run() -> None:
+            bus.start()
+            await asyncio.get_running_loop().run_in_executor(
+                None, lambda: [bus.publish_nowait(_activity(i)) for i in range(10)]
+            )
+            await asyncio.sleep(0.1)
+            await bus.aclose()
+
+        asyncio.run(run())
+        assert [alert.count for alert in alerts] == [1, 9]
+
+    def test_failing_sink_isolated(self) -> None:
+        """Test that a failing sink is counted and does not stop the others."""
+        email = EmailSink("parent@example.com")
+        bus = AlertBus([FailingSink(), email], window=0.0)
+
+        async def run() -> None:
+            async with bus:
+                await bus.publish(_activity(1))
+
+        asyncio.run(run())
+        metrics = bus.metrics()
+        assert (metrics.delivered, metrics.failed) == (1, 1)
+        assert bus.sink_failures == {"failing": 1}
+        recipient, subject, body = email.outbox[0]
+        assert recipient == "parent@example.com"
+        assert subject == "[Parent AI Safety] ALERT: blocked content for kid"
+        assert "kid-1" in body
+
+
+class TestWebhookSink:
+    """Tests for WebhookSink."""
+
+    def test_posts_json(self) -> None:
+        """Test that alerts are POSTed as JSON and HTTP errors fail delivery."""
+        received: List[Dict[str, Any]] = []
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self) -> None:  # noqa: N802 (http.server naming)
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                received.append(json.loads(body))
+                status = 500 if len(received) > 1 else 204
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args: object) -> None:
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            sink = WebhookSink(f"http://127.0.0.1:{server.server_address[1]}/alerts")
+            bus = AlertBus([sink], window=0.0)
+
+            async def run() -> None:
+                async with bus:
+                    await bus.publish(_activity(1))
+                    await asyncio.sleep(0.05)
+                    await bus.publish(_activity(2, user_id="sibling"))
+
+            asyncio.run(run())
+            sink.pool.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert [payload["user_id"] for payload in received] == ["kid", "sibling"]
+        assert received[0]["activity_ids"] == ["kid-1"]
+        assert (bus.metrics().delivered, bus.metrics().failed) == (1, 1)
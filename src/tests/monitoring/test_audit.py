@@ -0,0 +1,155 @@
+"""Tests for audit logging."""
+
+from datetime import datetime, timedelta
+
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+
+from parent_ai_safety.monitoring.audit import (
+    GENESIS_HASH,
+    AuditEntry,
+    AuditEventType,
+    AuditLogger,
+    entry_digest,
+)
+from parent_ai_safety.monitoring.audit_index import AuditIndex
+
+
+def _logger(entries: int, segment_size: int = 4) -> AuditLogger:
+    logger = AuditLogger(segment_size=segment_size, segment_interval=timedelta(hours=1))
+    for i in range(entries):
+        logger.log(AuditEventType.USER_ACTION, f"action_{i}", user_id="child", details={"i": i})
+    return logger
+
+
+class TestAuditLogger:
+    """Tests for the hash-chained audit log."""
+
+    def test_entries_are_chained(self) -> None:
+        """Test that each entry links to its predecessor."""
+        logger = _logger(3)
+        assert logger.entries[0].previous_hash == GENESIS_HASH
+        assert logger.entries[1].previous_hash == logger.entries[0].entry_hash
+        assert logger.entries[2].previous_hash == logger.entries[1].entry_hash
+
+    def test_segments_are_sealed_in_batches(self) -> None:
+        """Test that only segment checkpoints are signed."""
+        logger = _logger(10)
+        assert [(c.start, c.end) for c in logger.checkpoints] == [(0, 4), (4, 8)]
+        signed = [entry for entry in logger.entries if entry.signature]
+        assert signed == [logger.entries[3], logger.entries[7]]
+
+        checkpoint = logger.seal()
+        assert checkpoint is not None and (checkpoint.start, checkpoint.end) == (8, 10)
+        assert logger.seal() is None
+
+    def test_segment_interval(self) -> None:
+        """Test that a segment older than the interval is sealed."""
+        logger = AuditLogger(segment_size=1000, segment_interval=timedelta(0))
+        logger.log(AuditEventType.SYSTEM_EVENT, "start")
+        assert len(logger.checkpoints) == 1
+
+    def test_verify_intact_log(self) -> None:
+        """Test verification of an untouched log, sequentially and in parallel."""
+        logger = _logger(18)
+        assert logger.verify_integrity() is True
+        assert logger.verify_integrity(workers=2) is True
+
+    def test_detect_modified_entry(self) -> None:
+        """Test that editing a sealed entry is detected."""
+        logger = _logger(10)
+        logger.entries[2].details = {"i": 99}
+        assert logger.verify_integrity() is False
+
+    def test_detect_removed_entry(self) -> None:
+        """Test that deleting an entry is detected."""
+        logger = _logger(10)
+        del logger.entries[5]
+        assert logger.verify_integrity() is False
+
+    def test_detect_rewritten_chain(self) -> None:
+        """Test that recomputing hashes cannot forge a checkpoint signature."""
+        logger = _logger(8)
+        logger.entries[1].action = "forged"
+        for index in range(1, 8):
+            entry = logger.entries[index]
+            entry.previous_hash = logger.entries[index - 1].entry_hash
+            entry.entry_hash = entry_digest(entry)
+        assert logger.verify_integrity() is False
+
+    def test_untrusted_key(self) -> None:
+        """Test that checkpoints signed by another key are rejected."""
+        logger = _logger(8)
+        other = Ed25519PrivateKey.generate().public_key()
+        assert logger.verify_integrity(public_key=other) is False
+
+
+class TestAuditQueries:
+    """Tests for indexed audit log queries."""
+
+    def _index(self) -> AuditIndex:
+        index = AuditIndex()
+        base = datetime(2025, 11, 20, 12, 0)
+        for day in range(5):
+            for hour in range(3):
+                for user_id, event_type in (
+                    ("alice", AuditEventType.USER_ACTION),
+                    ("bob", AuditEventType.DATA_ACCESS),
+                    (None, AuditEventType.SYSTEM_EVENT),
+                ):
+                    index.add(
+                        AuditEntry(
+                            entry_id=f"{day}-{hour}-{user_id}",
+                            timestamp=base + timedelta(days=day, hours=hour),
+                            event_type=event_type,
+                            user_id=user_id,
+                            action="a",
+                        )
+                    )
+        return index
+
+    def test_filters(self) -> None:
+        """Test time range, user and event type filters."""
+        index = self._index()
+        assert len(list(index.query())) == 45
+        assert len(list(index.query(user_id="alice"))) == 15
+        assert len(list(index.query(event_type=AuditEventType.SYSTEM_EVENT))) == 15
+        assert list(index.query(user_id="alice", event_type=AuditEventType.DATA_ACCESS)) == []
+
+        start = datetime(2025, 11, 21, 13, 0)
+        end = datetime(2025, 11, 23, 12, 0)
+        entries = index.query(start_time=start, end_time=end, user_id="bob")
+        assert [entry.timestamp for entry in entries] == [
+            datetime(2025, 11, 21, 13, 0),
+            datetime(2025, 11, 21, 14, 0),
+            datetime(2025, 11, 22, 12, 0),
+            datetime(2025, 11, 22, 13, 0),
+            datetime(2025, 11, 22, 14, 0),
+            datetime(2025, 11, 23, 12, 0),
+        ]
+
+    def test_out_of_order_entries(self) -> None:
+        """Test that late entries are inserted in timestamp order."""
+        index = AuditIndex()
+        now = datetime(2025, 11, 20, 12, 0)
+        for action, timestamp in (("late", now), ("early", now - timedelta(minutes=1))):
+            index.add(
+                AuditEntry(
+                    entry_id=action,
+                    timestamp=timestamp,
+                    event_type=AuditEventType.USER_ACTION,
+                    user_id="alice",
+                    action=action,
+                )
+            )
+        assert [entry.action for entry in index.query(user_id="alice")] == ["early", "late"]
+        assert len(index) == 2
+
+    def test_logger_queries(self) -> None:
+        """Test get_logs() and the lazy iter_logs() on the logger."""
+        logger = _logger(6)
+        logger.log(AuditEventType.SECURITY_EVENT, "login_failed", user_id="parent")
+        assert len(logger.get_logs(user_id="child")) == 6
+        iterator = logger.iter_logs(event_type=AuditEventType.SECURITY_EVENT)
+        assert not isinstance(iterator, list)
+        assert [entry.action for entry in iterator] == ["login_failed"]
+        assert logger.get_logs(end_time=datetime(2000, 1, 1)) == []
@@ -0,0 +1,135 @@
+"""Tests for online activity baselines and streaming anomaly detection."""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+from parent_ai_safety.monitoring.activity import Activity, ActivityMonitor, ActivityType
+from parent_ai_safety.monitoring.activity_store import ColumnarActivityStore
+from parent_ai_safety.monitoring.baselines import (
+    ActivityBaselines,
+    AnomalyDetector,
+    RunningStats,
+)
+
+BASE = datetime(2025, 11, 20, 0, 0)
+
+
+def _activities(
+    counts: List[int], activity_type: ActivityType = ActivityType.AI_REQUEST
+) -> List[Activity]:
+    """Activities of "kid": counts[h] activities spread over hour h, in time order."""
+    activities: List[Activity] = []
+    for hour, count in enumerate(counts):
+        for index in range(count):
+            activities.append(
+                Activity(
+                    activity_id=f"{hour}-{index}",
+                    user_id="kid",
+                    activity_type=activity_type,
+                    timestamp=BASE + timedelta(hours=hour, minutes=index),
+                )
+            )
+    return activities
+
+
+def _detectors(baselines: ActivityBaselines) -> List[AnomalyDetector]:
+    return [anomaly.detector for anomaly in baselines.flagged("kid")]
+
+
+class TestRunningStats:
+    """Tests for RunningStats."""
+
+    def test_repeat_matches_sequential_adds(self) -> None:
+        """Test that adding a value n times at once equals n single adds."""
+        batched, sequential = RunningStats(0.2), RunningStats(0.2)
+        for stats in (batched, sequential):
+            stats.add(3.0)
+            stats.add(5.0)
+        batched.add(1.0, 7)
+        for _ in range(7):
+            sequential.add(1.0)
+        for name in ("count", "mean", "m2", "ewma", "ewvar"):
+            assert abs(getattr(batched, name) - getattr(sequential, name)) < 1e-9
+
+
+class TestActivityBaselines:
+    """Tests for the streaming detectors."""
+
+    def test_rate_spike(self) -> None:
+        """Test that a burst over a steady hourly rate is flagged as it arrives."""
+        baselines = ActivityBaselines()
+        for activity in _activities([1] * 48):
+            assert baselines.observe(activity) == []
+        burst = _activities([0] * 48 + [5])
+        assert baselines.observe(burst[0]) == []
+        flagged = baselines.observe(burst[1])
+        assert AnomalyDetector.RATE_ZSCORE in [anomaly.detector for anomaly in flagged]
+
+    def test_short_history_not_flagged(self) -> None:
+        """Test that nothing is flagged before the baseline has enough hours."""
+        baselines = ActivityBaselines()
+        for activity in _activities([1] * 5 + [20]):
+            baselines.observe(activity)
+        assert baselines.flagged("kid") == []
+
+    def test_cusum_sustained_increase(self) -> None:
+        """Test that a moderate but sustained increase is caught by CUSUM only."""
+        baselines = ActivityBaselines()
+        for activity in _activities([1, 3] * 24 + [4] * 8):
+            baselines.observe(activity)
+        detectors = _detectors(baselines)
+        assert AnomalyDetector.RATE_CUSUM in detectors
+        assert AnomalyDetector.RATE_ZSCORE not in detectors
+
+    def test_unusual_hour_and_gaps(self) -> None:
+        """Test activity at an hour the user is never active, after idle days."""
+        counts = ([0] * 8 + [10] * 12 + [0] * 4) * 3 + [0] * 3 + [1]
+        baselines = ActivityBaselines()
+        for activity in _activities(counts):
+            baselines.observe(activity)
+        # Only the first day, while the histogram was still filling, and 3am.
+        flagged = baselines.flagged("kid")
+        assert {anomaly.detector for anomaly in flagged} == {AnomalyDetector.UNUSUAL_HOUR}
+        assert {anomaly.activity.timestamp.day for anomaly in flagged[:-1]} == {BASE.day}
+        assert flagged[-1].activity.timestamp.hour == 3
+        snapshot = baselines.snapshot("kid")
+        assert snapshot is not None
+        # Completed hours since the first activity (hour 8), idle ones included.
+        assert snapshot.hours == len(counts) - 1 - 8
+        assert snapshot.hour_of_day[3] == 1
+        assert abs(snapshot.rate_mean - 360 / 67) < 1e-9
+        assert baselines.snapshot("nobody") is None
+
+    def test_blocked_ratio(self) -> None:
+        """Test that a run of blocked prompts after normal use is flagged."""
+        baselines = ActivityBaselines()
+        for activity in _activities([60]):
+            baselines.observe(activity)
+        blocked = _activities([0, 3], ActivityType.BLOCKED_CONTENT)
+        results = [baselines.observe(activity) for activity in blocked]
+        assert results[0] == []
+        assert results[1][0].detector == AnomalyDetector.BLOCKED_RATIO
+
+
+class TestMonitorIntegration:
+    """Tests for ActivityMonitor with baselines."""
+
+    def test_detect_anomalies_from_baselines(self) -> None:
+        """Test that detect_anomalies() returns streamed detections."""
+        monitor = ActivityMonitor(baselines=ActivityBaselines())
+        for activity in _activities([1] * 30 + [6]):
+            monitor.log_activity(activity)
+        anomalies = monitor.detect_anomalies("kid")
+        assert [activity.activity_id for activity in anomalies] == [f"30-{i}" for i in range(1, 6)]
+        assert monitor.detect_anomalies_all() == {"kid": anomalies}
+
+    def test_backfill_from_store(self, tmp_path: Path) -> None:
+        """Test that baselines are rebuilt from a store's history."""
+        store = ColumnarActivityStore(tmp_path)
+        writer = ActivityMonitor(store=store)
+        for activity in _activities([1] * 30 + [6]):
+            writer.log_activity(activity)
+        monitor = ActivityMonitor(store=store, baselines=ActivityBaselines())
+        assert len(monitor.detect_anomalies("kid")) == 5
+        store.close()
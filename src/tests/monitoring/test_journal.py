@@ -0,0 +1,227 @@
+"""Tests for the group-commit write-ahead journal and its replay."""
+
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional
+
+import pytest
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+
+from parent_ai_safety.monitoring.activity import Activity, ActivityMonitor, ActivityType
+from parent_ai_safety.monitoring.activity_store import ColumnarActivityStore
+from parent_ai_safety.monitoring.audit import AuditEventType, AuditLogger
+from parent_ai_safety.monitoring.journal import Journal, decode_record, encode_record
+from parent_ai_safety.monitoring.rollups import ActivityRollups
+
+BASE = datetime(2025, 11, 20, 12, 0)
+
+
+def _failing_fsync(fd: int) -> None:
+    raise OSError("disk full")
+
+
+def _activity(index: int) -> Activity:
+    return Activity(
+        activity_id=f"a{index}",
+        user_id="kid",
+        activity_type=ActivityType.AI_REQUEST,
+        timestamp=BASE + timedelta(minutes=index),
+        details={"i": index},
+    )
+
+
+class TestJournal:
+    """Tests for Journal."""
+
+    def test_framing(self) -> None:
+        """Test that lines round-trip and corrupt or torn lines are rejected."""
+        line = encode_record("kind", {"text": "multi\nline"})
+        assert line.count(b"\n") == 1
+        assert decode_record(line) == ("kind", {"text": "multi\nline"})
+        assert decode_record(line[:-1]) is None
+        assert decode_record(line.replace(b"multi", b"multx")) is None
+        assert decode_record(b"garbage\n") is None
+
+    def test_group_commit(self, tmp_path: Path) -> None:
+        """Test that concurrent appends share commits and all become durable."""
+        journal = Journal(tmp_path / "wal", commit_interval=0.01)
+
+        def write(thread: int) -> None:
+            futures = [journal.append("n", {"t": thread, "i": i}) for i in range(100)]
+            futures[-1].result(5)
+
+        threads = [threading.Thread(target=write, args=(t,)) for t in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        journal.close()
+        assert journal.records == 800
+        assert journal.commits < 100
+
+        reopened = Journal(tmp_path / "wal")
+        records = [record for _, record in reopened.replay()]
+        assert reopened.recovered == len(records) == 800
+        for writer in range(8):
+            assert [r["i"] for r in records if r["t"] == writer] == list(range(100))
+        reopened.close()
+
+    def test_torn_tail_truncated(self, tmp_path: Path) -> None:
+        """Test that a torn last record is cut off and appends follow intact records."""
+        with Journal(tmp_path / "wal") as journal:
+            journal.append("n", {"i": 0})
+            journal.append("n", {"i": 1})
+        data = (tmp_path / "wal").read_bytes()
+        (tmp_path / "wal").write_bytes(data[:-5])
+
+        with Journal(tmp_path / "wal") as journal:
+            assert (journal.recovered, journal.truncated_bytes) == (1, len(data) // 2 - 5)
+            journal.append("n", {"i": 2})
+            journal.sync()
+            # Only records recovered on open are replayed.
+            assert [r["i"] for _, r in journal.replay()] == [0]
+        with Journal(tmp_path / "wal") as journal:
+            assert [r["i"] for _, r in journal.replay(["n"])] == [0, 2]
+            assert list(journal.replay(["other"])) == []
+
+    def test_failed_commit_stops_journal(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a failed commit rejects its records, is cut off and stops appends."""
+        journal = Journal(tmp_path / "wal")
+        journal.append("n", {"i": 0}).result(5)
+        monkeypatch.setattr("parent_ai_safety.monitoring.journal.os.fsync", _failing_fsync)
+        failed: List[Optional[BaseException]] = []
+        future = journal.append("n", {"i": 1}, lambda f: failed.append(f.exception()))
+        with pytest.raises(OSError, match="disk full"):
+            future.result(5)
+        assert failed == [journal.error]
+        with pytest.raises(OSError, match="failed earlier"):
+            journal.append("n", {"i": 2})
+        journal.close()
+        monkeypatch.undo()
+
+        with Journal(tmp_path / "wal") as reopened:
+            assert [r["i"] for _, r in reopened.replay()] == [0]
+
+    def test_closed(self, tmp_path: Path) -> None:
+        """Test that appending to a closed journal fails."""
+        journal = Journal(tmp_path / "wal")
+        journal.sync()
+        journal.close()
+        journal.close()
+        with pytest.raises(RuntimeError):
+            journal.append("n", {})
+
+
+class TestReplay:
+    """Tests for rebuilding AuditLogger and ActivityMonitor state."""
+
+    def test_audit_logger(self, tmp_path: Path) -> None:
+        """Test that entries and checkpoints survive a restart with a valid chain."""
+        key = Ed25519PrivateKey.generate()
+        journal = Journal(tmp_path / "wal")
+        logger = AuditLogger(
+            key, segment_size=3, segment_interval=timedelta(hours=1), journal=journal
+        )
+        for i in range(7):
+            logger.log(AuditEventType.USER_ACTION, f"action_{i}", user_id="kid", durable=i == 6)
+        journal.close()
+
+        journal = Journal(tmp_path / "wal")
+        restored = AuditLogger(
+            key, segment_size=3, segment_interval=timedelta(hours=1), journal=journal
+        )
+        assert [e.entry_hash for e in restored.entries] == [e.entry_hash for e in logger.entries]
+        assert restored.checkpoints == logger.checkpoints
+        assert restored.verify_integrity()
+        assert len(restored.get_logs(user_id="kid")) == 7
+        for i in range(7, 9):
+            restored.log(AuditEventType.USER_ACTION, f"action_{i}", user_id="kid")
+        assert [(c.start, c.end) for c in restored.checkpoints] == [(0, 3), (3, 6), (6, 9)]
+        assert restored.verify_integrity()
+        journal.close()
+
+    def test_audit_logger_failed_commit(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that entries and checkpoints lost by a failed commit leave memory too."""
+        key = Ed25519PrivateKey.generate()
+        journal = Journal(tmp_path / "wal", commit_interval=0.2)
+        logger = AuditLogger(key, segment_size=3, journal=journal)
+        for i in range(4):
+            logger.log(AuditEventType.USER_ACTION, f"action_{i}", user_id="kid", durable=i == 3)
+        monkeypatch.setattr("parent_ai_safety.monitoring.journal.os.fsync", _failing_fsync)
+        # One failing batch: two entries and the checkpoint sealing them.
+        logger.log(AuditEventType.USER_ACTION, "action_4", user_id="kid")
+        with pytest.raises(OSError):
+            logger.log(AuditEventType.USER_ACTION, "action_5", user_id="kid", durable=True)
+        assert logger.journal_error is not None
+        with pytest.raises(OSError):
+            logger.log(AuditEventType.USER_ACTION, "action_6", user_id="kid")
+        journal.close()
+        monkeypatch.undo()
+
+        assert [e.action for e in logger.entries] == [f"action_{i}" for i in range(4)]
+        assert [(c.start, c.end) for c in logger.checkpoints] == [(0, 3)]
+        assert len(logger.get_logs(user_id="kid")) == 4
+        assert logger.verify_integrity()
+        with Journal(tmp_path / "wal") as journal:
+            restored = AuditLogger(key, segment_size=3, journal=journal)
+            assert [e.entry_hash for e in restored.entries] == [
+                e.entry_hash for e in logger.entries
+            ]
+            assert restored.checkpoints == logger.checkpoints
+
+    def test_activity_monitor(self, tmp_path: Path) -> None:
+        """Test that journaled activities rebuild the history and rollups."""
+        journal = Journal(tmp_path / "wal")
+        monitor = ActivityMonitor(journal=journal)
+        for index in range(5):
+            monitor.log_activity(_activity(index), durable=index == 4)
+        journal.close()
+
+        journal = Journal(tmp_path / "wal")
+        restored = ActivityMonitor(rollups=ActivityRollups(), journal=journal)
+        assert restored.activities == monitor.activities
+        summary = restored.get_summary("kid", BASE, BASE + timedelta(hours=1))
+        assert summary.total_activities == 5
+        journal.close()
+
+    def test_activity_monitor_failed_commit(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a failed commit is reported and stops further logging."""
+        journal = Journal(tmp_path / "wal")
+        monitor = ActivityMonitor(journal=journal)
+        monitor.log_activity(_activity(0), durable=True)
+        monkeypatch.setattr("parent_ai_safety.monitoring.journal.os.fsync", _failing_fsync)
+        with pytest.raises(OSError):
+            monitor.log_activity(_activity(1), durable=True)
+        assert isinstance(monitor.journal_error, OSError)
+        with pytest.raises(OSError):
+            monitor.log_activity(_activity(2))
+        assert len(monitor.activities) == 2
+        journal.close()
+
+    def test_activity_monitor_with_store(self, tmp_path: Path) -> None:
+        """Test that only activities the store lost are replayed into it."""
+        journal = Journal(tmp_path / "wal")
+        store = ColumnarActivityStore(tmp_path / "store")
+        monitor = ActivityMonitor(store=store, journal=journal)
+        for index in range(3):
+            monitor.log_activity(_activity(index))
+        store.close()
+        # Two more activities reach the journal but not the store files.
+        for index in range(3, 5):
+            journal.append("activity", _activity(index).model_dump(mode="json"))
+        journal.close()
+
+        journal = Journal(tmp_path / "wal")
+        store = ColumnarActivityStore(tmp_path / "store")
+        ActivityMonitor(store=store, journal=journal)
+        ids: List[str] = [store.activity(row).activity_id for row in range(len(store))]
+        assert ids == [f"a{index}" for index in range(5)]
+        store.close()
+        journal.close()
@@ -0,0 +1,110 @@
+"""Tests for incremental activity rollups."""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+from parent_ai_safety.monitoring.activity import (
+    Activity,
+    ActivityMonitor,
+    ActivitySeverity,
+    ActivityType,
+)
+from parent_ai_safety.monitoring.activity_store import ColumnarActivityStore
+from parent_ai_safety.monitoring.rollups import ActivityRollups
+
+BASE = datetime(2025, 11, 20, 0, 0)
+
+
+def _rollups(activities: List[Activity], **kwargs: timedelta) -> ActivityRollups:
+    rollups = ActivityRollups(**kwargs)
+    for activity in activities:
+        rollups.add(activity)
+    return rollups
+
+
+class TestActivityRollups:
+    """Tests for ActivityRollups."""
+
+    def test_unaligned_range_matches_scan(self, sample_activities: List[Activity]) -> None:
+        """Test that buckets plus raw edges give the same counts as a full scan."""
+        scanned = ActivityMonitor()
+        for activity in sample_activities:
+            scanned.log_activity(activity)
+        rollups = _rollups(sample_activities)
+        start = BASE + timedelta(hours=5, minutes=59, seconds=30)
+        end = BASE + timedelta(hours=30, minutes=12, seconds=1)
+        counts = rollups.summarize("kid", start, end)
+        assert counts is not None
+        by_type, by_severity, concerning = counts
+        summary = scanned.get_summary("kid", start, end)
+        assert {t.value: n for t, n in by_type.items()} == {
+            k: v for k, v in summary.by_type.items() if v
+        }
+        assert sum(by_severity.values()) == summary.total_activities
+        assert concerning == summary.concerning_activities
+
+    def test_end_is_inclusive(self, sample_activities: List[Activity]) -> None:
+        """Test that an activity exactly at the end of the range is counted."""
+        rollups = _rollups(sample_activities)
+        counts = rollups.summarize("kid", BASE + timedelta(hours=2), BASE + timedelta(hours=3))
+        assert counts is not None
+        assert counts[0] == {ActivityType.AI_REQUEST: 2}
+
+    def test_compaction_limits_answerable_ranges(self, sample_activities: List[Activity]) -> None:
+        """Test that compacted detail makes fine-grained old ranges unanswerable."""
+        rollups = _rollups(sample_activities, minute_retention=timedelta(hours=6))
+        rollups.compact(BASE + timedelta(days=2))
+        assert (
+            rollups.summarize("kid", BASE + timedelta(minutes=1), BASE + timedelta(hours=3)) is None
+        )
+        whole_day = rollups.summarize("kid", BASE, BASE + timedelta(days=1, microseconds=-1))
+        assert whole_day is not None
+        assert whole_day[0] == {ActivityType.AI_REQUEST: 24}
+
+    def test_compacts_on_schedule(self) -> None:
+        """Test that compaction runs automatically as activity time advances."""
+        rollups = ActivityRollups(
+            minute_retention=timedelta(hours=1), compact_interval=timedelta(hours=1)
+        )
+        for minute in range(0, 180, 10):
+            rollups.add(
+                Activity(
+                    activity_id=str(minute),
+                    user_id="kid",
+                    activity_type=ActivityType.LOGIN,
+                    timestamp=BASE + timedelta(minutes=minute),
+                )
+            )
+        assert (
+            rollups.summarize("kid", BASE + timedelta(minutes=5), BASE + timedelta(hours=3)) is None
+        )
+        recent = rollups.summarize(
+            "kid", BASE + timedelta(hours=2, minutes=5), BASE + timedelta(hours=3)
+        )
+        assert recent is not None
+        assert recent[1] == {ActivitySeverity.INFO: 5}
+
+    def test_monitor_falls_back_to_scan(self, sample_activities: List[Activity]) -> None:
+        """Test that the monitor scans when the rollups cannot answer."""
+        rollups = ActivityRollups(minute_retention=timedelta(hours=1))
+        monitor = ActivityMonitor(rollups=rollups)
+        for activity in sample_activities:
+            monitor.log_activity(activity)
+        rollups.compact(BASE + timedelta(days=3))
+        summary = monitor.get_summary(
+            "kid", BASE + timedelta(minutes=30), BASE + timedelta(hours=3)
+        )
+        assert summary.total_activities == 3
+
+    def test_backfills_from_store(self, tmp_path: Path, sample_activities: List[Activity]) -> None:
+        """Test that a monitor with an existing store backfills its rollups."""
+        store = ColumnarActivityStore(tmp_path)
+        for activity in sample_activities:
+            store.append(activity)
+        rollups = ActivityRollups()
+        ActivityMonitor(store=store, rollups=rollups)
+        counts = rollups.summarize("kid", BASE, BASE + timedelta(days=2))
+        assert counts is not None
+        assert counts[1][ActivitySeverity.ALERT] == 1
+        assert [a.activity_id for a in counts[2]] == ["burst0"]